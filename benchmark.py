@@ -0,0 +1,353 @@
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+
+WIDTH, HEIGHT = 1920, 1080
+SEED = 1234
+THRESHOLD = 0.2
+
+BENCHMARKS = {}
+
+
+def benchmark(name: str, repeat: int, warmup: int = 1, reuse: bool = False):
+    """Registers ``func`` as a benchmark.
+
+    ``func`` sets up its scenario and returns the operation to time. Before
+    each of the ``repeat`` timed runs the scenario is set up afresh and the
+    operation run ``warmup`` times untimed, so every run times the same state.
+    With ``reuse``, one setup serves every run; only for operations that leave
+    the world as they found it.
+    """
+
+    def register(func):
+        BENCHMARKS[name] = (func, repeat, warmup, reuse)
+        return func
+
+    return register
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Time fixed, seeded scenarios and compare them to a baseline."
+    )
+    parser.add_argument(
+        "--only", action="append", default=[], help="run benchmarks containing NAME"
+    )
+    parser.add_argument("--list", action="store_true", help="list benchmarks and exit")
+    parser.add_argument(
+        "--repeat-scale",
+        type=float,
+        default=1.0,
+        help="multiply every benchmark's repeat count",
+    )
+    parser.add_argument("--output", metavar="JSON", help="write results to JSON")
+    parser.add_argument("--baseline", metavar="JSON", help="compare against JSON")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=THRESHOLD,
+        help="allowed slowdown against the baseline before failing (0.2 = 20%%)",
+    )
+    return parser.parse_args(argv)
+
+
+# Must be set before settings is imported
+os.environ["ANT_SIM_WIDTH"] = str(WIDTH)
+os.environ["ANT_SIM_HEIGHT"] = str(HEIGHT)
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np  # noqa: E402
+import pygame  # noqa: E402
+
+import settings  # noqa: E402
+from core import chunks, collision, logging, perlin  # noqa: E402
+from core import simulation as sim  # noqa: E402
+from entities import enemy_soldier  # noqa: E402
+
+
+def scenario(
+    workers: int,
+    engine: str = "objects",
+    soldiers: int = 10,
+    food: int = 0,
+    enemies: int = 0,
+    seed: int = SEED,
+) -> sim.Simulation:
+    """A freshly generated, seeded colony on the default map."""
+    random.seed(seed)
+    settings.enemies = []
+    settings.pheromones.clear()
+    settings.camera_x, settings.camera_y = 0, 0
+    settings.zoom = settings.ZOOM_LEVELS[0]
+
+    simulation = sim.Simulation(engine=engine)
+    settings.food_locations.clear()
+    perlin.regenerate(seed, perlin.perlin_settings.threshold)
+    # Rebuilt even when the seed is unchanged, so no dug dirt or loaded chunk
+    # carries over from an earlier scenario
+    chunks.store.reset()
+    simulation.scatter_food(food)
+    simulation.populate(workers, soldiers, 1, 0.5)
+    settings.ui_visible = False
+
+    for _ in range(enemies):
+        settings.enemies.append(
+            enemy_soldier.EnemySoldier(
+                random.randrange(settings.MAP_WIDTH),
+                random.randrange(1, settings.MAP_HEIGHT),
+                settings.nest_location,
+                0.5,
+            )
+        )
+    return simulation
+
+
+def dense_food(x0: int, y0: int, size: int):
+    """Fills a ``size`` square of open cells at ``(x0, y0)`` with food."""
+    terrain = perlin.perlin_settings.map_data
+    cells = [
+        (x, y)
+        for x in range(x0, x0 + size)
+        for y in range(y0, y0 + size)
+        if not terrain[x, y]
+    ]
+    settings.food_locations.update(cells)
+    settings.total_food = len(settings.food_locations)
+
+
+@benchmark("ant_move_1k", repeat=30)
+def bench_ant_move():
+    scenario(1000)
+
+    def run():
+        for ant in settings.ants:
+            ant.move()
+
+    return run
+
+
+@benchmark("generate_map", repeat=10, reuse=True)
+def bench_generate_map():
+    seeds = iter(range(SEED, SEED + 1000))
+
+    def run():
+        # A new seed every run so the noise cache never answers
+        perlin.perlin_settings.seed = next(seeds)
+        perlin.perlin_settings.generate_map()
+
+    return run
+
+
+@benchmark("check_collision_10k", repeat=20, reuse=True)
+def bench_check_collision():
+    scenario(0, soldiers=0)
+    rng = random.Random(SEED)
+    points = [
+        (rng.uniform(-5, settings.MAP_WIDTH + 5), rng.uniform(-5, settings.MAP_HEIGHT))
+        for _ in range(10_000)
+    ]
+
+    def run():
+        for x, y in points:
+            collision.check_collision(x, y)
+
+    return run
+
+
+@benchmark("check_collision_many_100k", repeat=30, reuse=True)
+def bench_check_collision_many():
+    scenario(0, soldiers=0)
+    rng = np.random.default_rng(SEED)
+    xs = rng.uniform(-5, settings.MAP_WIDTH + 5, 100_000)
+    ys = rng.uniform(-5, settings.MAP_HEIGHT, 100_000)
+
+    def run():
+        collision.check_collision_many(xs, ys, collision.WORKER)
+
+    return run
+
+
+@benchmark("render_1k", repeat=30, warmup=2, reuse=True)
+def bench_render():
+    from gui import entity_layer, pheromone_layer, terrain_layer
+
+    simulation = scenario(1000, food=500)
+    simulation.step(50)
+    surface = pygame.Surface((settings.MONITOR_WIDTH, settings.MONITOR_HEIGHT))
+    terrain = terrain_layer.TerrainLayer()
+    pheromones = pheromone_layer.PheromoneLayer()
+    entities = entity_layer.EntityLayer()
+
+    def run():
+        surface.fill("#87CEEB")
+        terrain.draw(surface)
+        entities.draw_food(surface)
+        pheromones.draw(surface, settings.pheromones.food)
+        entities.draw(surface)
+
+    return run
+
+
+@benchmark("render_entities_50k", repeat=20, warmup=2, reuse=True)
+def bench_render_entities():
+    from gui import entity_layer
+
+    simulation = scenario(50_000, engine="vector", food=500)
+    simulation.step(20)
+    surface = pygame.Surface((settings.MONITOR_WIDTH, settings.MONITOR_HEIGHT))
+    entities = entity_layer.EntityLayer()
+    return lambda: entities.draw(surface)
+
+
+@benchmark("render_overview_100k", repeat=30, warmup=2, reuse=True)
+def bench_render_overview():
+    from gui import overview_layer
+
+    simulation = scenario(100_000, engine="vector", food=500)
+    simulation.step(20)
+    settings.zoom = settings.ZOOM_LEVELS[-1]
+    surface = pygame.Surface((settings.MONITOR_WIDTH, settings.MONITOR_HEIGHT))
+    overview = overview_layer.OverviewLayer()
+
+    def run():
+        surface.fill("#87CEEB")
+        overview.draw(surface, settings.pheromones.food)
+
+    return run
+
+
+@benchmark("tick_1k_objects", repeat=20)
+def bench_tick_1k():
+    return scenario(1000, food=500).step
+
+
+@benchmark("tick_10k_vector", repeat=20)
+def bench_tick_10k():
+    return scenario(10_000, engine="vector", food=500).step
+
+
+@benchmark("tick_100k_vector", repeat=5)
+def bench_tick_100k():
+    return scenario(100_000, engine="vector", food=500).step
+
+
+@benchmark("tick_100k_vector_foraging", repeat=5)
+def bench_tick_100k_foraging():
+    # A seed whose nest is not walled in by stone, so the crowd around it
+    # spreads out and tens of thousands of workers have food in sight
+    simulation = scenario(100_000, engine="vector", food=500, seed=1)
+    simulation.step(20)
+    return simulation.step
+
+
+@benchmark("tick_dense_food", repeat=20)
+def bench_tick_dense_food():
+    simulation = scenario(1000)
+    dense_food(settings.MAP_WIDTH // 2 - 30, 5, 60)
+    return simulation.step
+
+
+@benchmark("tick_enemies_hunting", repeat=20)
+def bench_tick_enemies():
+    return scenario(1000, enemies=100).step
+
+
+def run_benchmark(name: str, repeat_scale: float = 1.0) -> dict:
+    func, repeat, warmup, reuse = BENCHMARKS[name]
+    repeat = max(1, round(repeat * repeat_scale))
+    run = None
+
+    times = []
+    for _ in range(repeat):
+        if run is None or not reuse:
+            run = func()
+            for _ in range(warmup):
+                run()
+        start = time.perf_counter()
+        run()
+        times.append((time.perf_counter() - start) * 1000)
+    return {
+        "repeat": repeat,
+        "median_ms": statistics.median(times),
+        "mean_ms": statistics.fmean(times),
+        "min_ms": min(times),
+        "max_ms": max(times),
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Names of benchmarks whose median slowed by more than ``threshold``."""
+    regressions = []
+    print(f"\n{'benchmark':<28}{'baseline':>12}{'current':>12}{'change':>10}")
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"{name:<28}{'-':>12}{result['median_ms']:>10.3f}ms{'new':>10}")
+            continue
+        before = baseline[name]["median_ms"]
+        change = result["median_ms"] / before - 1 if before > 0 else 0.0
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(
+            f"{name:<28}{before:>10.3f}ms{result['median_ms']:>10.3f}ms"
+            f"{change:>+10.1%}{flag}"
+        )
+    return regressions
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.list:
+        print("\n".join(BENCHMARKS))
+        return 0
+
+    logging.setup("WARN")
+    names = [
+        name
+        for name in BENCHMARKS
+        if not args.only or any(part in name for part in args.only)
+    ]
+
+    results = {}
+    for name in names:
+        results[name] = run_benchmark(name, args.repeat_scale)
+        result = results[name]
+        print(
+            f"{name:<28} median {result['median_ms']:9.3f}ms  "
+            f"min {result['min_ms']:9.3f}ms  ({result['repeat']} runs)"
+        )
+
+    if args.output:
+        report = {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pygame": pygame.version.ver,
+            "machine": platform.machine(),
+            "map": [settings.MAP_WIDTH, settings.MAP_HEIGHT],
+            "seed": SEED,
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,294 @@
+import atexit
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+import settings
+from core import logging, map, mirror, perlin, pheromone, savefile, shared
+
+UNGENERATED = 0
+RESIDENT = 1
+EVICTED = 2
+
+# Most ticks between checks for chunks entities have walked into; with fast
+# entities the checks come sooner, so none can cross a whole chunk in between
+CHECK_INTERVAL = 4
+
+
+class ChunkStore:
+    """The world as vertical strips of ``chunk_width`` map columns.
+
+    Terrain, dirt, food and pheromones stay in the whole-map arrays everything
+    else indexes, but only chunks near the nest, the camera or an entity are
+    ever filled in. A chunk's terrain is generated from the Perlin seed the
+    first time it is needed. Once more than ``max_resident`` chunks are in
+    memory, the least recently used ones that nothing is near are written to
+    ``directory`` and their columns released with ``shared.release``, so they
+    cost no memory until they are loaded back.
+
+    Entities and the camera keep the chunk they are in and both neighbours
+    resident, so nothing ever steps into or sees a chunk that is not loaded.
+    Food placed on a chunk that is later regenerated away is dropped with it.
+    """
+
+    def __init__(
+        self,
+        width: int = settings.MAP_WIDTH,
+        chunk_width: int = settings.CHUNK_WIDTH,
+        max_resident: int = settings.MAX_RESIDENT_CHUNKS,
+        directory: str = settings.CHUNK_DIR,
+    ):
+        if chunk_width % pheromone.TILE_SIZE:
+            raise ValueError(
+                f"Chunk width must be a multiple of {pheromone.TILE_SIZE} columns"
+            )
+        self.width = width
+        self.chunk_width = chunk_width
+        self.max_resident = max_resident
+        self.directory = directory
+        self.count = -(-width // chunk_width)
+        self.state = np.zeros(self.count, dtype=np.int8)
+        self.last_used = np.zeros(self.count, dtype=np.int64)
+        self.resident_columns = np.zeros(width, dtype=bool)
+        self.clock = 0
+        self.next_check = CHECK_INTERVAL
+        self.view = None
+        self._temporary = None
+
+    def columns(self, chunk: int):
+        """First and end map column of ``chunk``."""
+        x0 = chunk * self.chunk_width
+        return x0, min(x0 + self.chunk_width, self.width)
+
+    def chunk_of(self, x):
+        return np.clip(np.floor_divide(x, self.chunk_width), 0, self.count - 1)
+
+    @property
+    def resident(self) -> int:
+        return int((self.state == RESIDENT).sum())
+
+    def _path(self, chunk: int) -> str:
+        if self.directory is None:
+            if self._temporary is None:
+                self._temporary = tempfile.mkdtemp(prefix="antsim-chunks-")
+                atexit.register(shutil.rmtree, self._temporary, True)
+            directory = self._temporary
+        else:
+            directory = self.directory
+            os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, f"chunk-{chunk}.antsim")
+
+    # Keeping chunks loaded
+
+    def touch(self, x0: int, x1: int):
+        """Loads the chunks over columns ``[x0, x1)`` and their neighbours."""
+        first = int(self.chunk_of(x0)) - 1
+        last = int(self.chunk_of(max(x0, x1 - 1))) + 1
+        hot = np.zeros(self.count, dtype=bool)
+        hot[max(0, first) : last + 1] = True
+        self._use(hot)
+
+    def set_view(self, x0: int, x1: int):
+        """Keeps map columns ``[x0, x1)``, the ones on screen, loaded."""
+        self.view = (x0, x1)
+        self.touch(x0, x1)
+
+    def _use(self, hot: np.ndarray):
+        self.last_used[hot] = self.clock
+        wanted = np.flatnonzero(hot & (self.state != RESIDENT))
+        if len(wanted):
+            self._load(wanted)
+
+    def refresh(self):
+        """Loads everything in use: the nest, the view and every entity."""
+        nest_x = settings.nest_location[0]
+        self.touch(nest_x, nest_x + 1)
+        if self.view is not None:
+            self.touch(*self.view)
+
+        xs = [x for x, _, _ in mirror.entities()]
+        if xs:
+            chunks = self.chunk_of(np.floor(np.concatenate(xs)).astype(np.int64))
+            occupied = np.bincount(chunks, minlength=self.count) > 0
+            hot = occupied.copy()
+            hot[1:] |= occupied[:-1]
+            hot[:-1] |= occupied[1:]
+            self._use(hot)
+
+    def update(self):
+        """Call once per tick; loads newly reached chunks and evicts cold ones."""
+        self.clock += 1
+        if self.clock < self.next_check:
+            return
+        self.next_check = self.clock + CHECK_INTERVAL
+        if self.resident == self.count and self.count <= self.max_resident:
+            # Everything is loaded and may stay loaded
+            return
+        # Entities keep the chunks either side of theirs loaded, so the next
+        # check comes before the fastest one could walk out of them
+        fastest = _fastest_speed()
+        if fastest * CHECK_INTERVAL > self.chunk_width:
+            self.next_check = self.clock + max(1, int(self.chunk_width // fastest))
+        self.refresh()
+        self.evict()
+
+    def evict(self):
+        excess = self.resident - self.max_resident
+        if excess <= 0:
+            return
+        cold = np.flatnonzero(
+            (self.state == RESIDENT) & (self.last_used < self.clock)
+        )
+        coldest = cold[np.argsort(self.last_used[cold], kind="stable")][:excess]
+        for chunk in coldest:
+            self._evict(int(chunk))
+        if len(coldest):
+            self._changed(coldest)
+            logging.debug("Evicted %s chunks to disk", len(coldest))
+
+    # Moving chunks in and out
+
+    def _arrays(self, x0: int, x1: int) -> dict:
+        return {
+            "terrain": perlin.perlin_settings.map_data[x0:x1],
+            "dirt": map.data[x0:x1],
+            "food": settings.food_locations.grid[x0:x1],
+            "pheromones": settings.pheromones.data[:, x0:x1],
+        }
+
+    def _load(self, chunks):
+        for chunk in chunks:
+            x0, x1 = self.columns(chunk)
+            if self.state[chunk] == EVICTED:
+                self._read(chunk, x0, x1)
+            else:
+                perlin.perlin_settings.map_data[x0:x1] = (
+                    perlin.perlin_settings.generate_columns(x0, x1)
+                )
+                map.data[x0:x1] = 1
+            self.state[chunk] = RESIDENT
+            self.resident_columns[x0:x1] = True
+        self._changed(chunks)
+
+    def _read(self, chunk: int, x0: int, x1: int):
+        path = self._path(chunk)
+        _, saved = savefile.read(path)
+        for name, array in self._arrays(x0, x1).items():
+            if name != "food":
+                np.copyto(array, saved[name])
+        xs, ys = np.nonzero(saved["food"])
+        settings.food_locations.update(zip(x0 + xs, ys))
+        del saved
+        os.remove(path)
+        _mark_pheromone_tiles(x0, x1)
+
+    def _evict(self, chunk: int):
+        x0, x1 = self.columns(chunk)
+        arrays = self._arrays(x0, x1)
+        savefile.write(self._path(chunk), {"chunk": chunk}, arrays)
+
+        food = settings.food_locations
+        xs, ys = np.nonzero(arrays["food"])
+        food.difference_update(zip(x0 + xs, ys))
+        for name in ("terrain", "dirt", "food"):
+            shared.release(arrays[name])
+        for channel in settings.pheromones.data:
+            shared.release(channel[x0:x1])
+        tile = pheromone.TILE_SIZE
+        settings.pheromones.active[:, x0 // tile : -(-x1 // tile)] = False
+
+        self.state[chunk] = EVICTED
+        self.resident_columns[x0:x1] = False
+
+    def _changed(self, chunks):
+        xs = np.concatenate([np.arange(*self.columns(chunk)) for chunk in chunks])
+        xs, ys = np.meshgrid(xs, np.arange(settings.MAP_HEIGHT), indexing="ij")
+        map.changed(xs.ravel(), ys.ravel())
+
+    def reset(self):
+        """Forgets every chunk, e.g. for a new seed, and regenerates those in
+        use."""
+        for chunk in np.flatnonzero(self.state == EVICTED):
+            os.remove(self._path(int(chunk)))
+        shared.release(perlin.perlin_settings.map_data)
+        shared.release(map.data)
+        self.state[:] = UNGENERATED
+        self.resident_columns[:] = False
+        self.refresh()
+        map.changed()
+
+    # Saving
+
+    def world_arrays(self) -> dict:
+        """Whole-map terrain, dirt, food and pheromones with evicted chunks
+        read back in; copies only when something is evicted."""
+        arrays = self._arrays(0, self.width)
+        arrays["pheromones"] = settings.pheromones.data
+        arrays["pheromone_tiles"] = settings.pheromones.active
+        evicted = np.flatnonzero(self.state == EVICTED)
+        if not len(evicted):
+            return arrays
+
+        arrays = {name: array.copy() for name, array in arrays.items()}
+        tile = pheromone.TILE_SIZE
+        for chunk in evicted:
+            x0, x1 = self.columns(int(chunk))
+            _, saved = savefile.read(self._path(int(chunk)))
+            for name, array in saved.items():
+                if name == "pheromones":
+                    arrays[name][:, x0:x1] = array
+                else:
+                    arrays[name][x0:x1] = array
+            del saved
+            tiles = arrays["pheromones"][:, x0:x1]
+            arrays["pheromone_tiles"][:, x0 // tile : -(-x1 // tile)] = (
+                _tiles_in_use(tiles)
+            )
+        return arrays
+
+    def restore(self, state: np.ndarray = None):
+        """Takes on a restored world: chunks from ``state`` (or every chunk)
+        are resident, the rest ungenerated."""
+        for chunk in np.flatnonzero(self.state == EVICTED):
+            os.remove(self._path(int(chunk)))
+        if state is None or len(state) != self.count:
+            state = np.full(self.count, RESIDENT, dtype=np.int8)
+        self.state[:] = np.where(state == UNGENERATED, UNGENERATED, RESIDENT)
+        self.resident_columns[:] = np.repeat(
+            self.state == RESIDENT, self.chunk_width
+        )[: self.width]
+        self.last_used[:] = self.clock
+        self.refresh()
+
+
+def _fastest_speed() -> float:
+    """The highest entity speed, in cells per tick."""
+    swarm = settings.worker_swarm
+    fastest = float(swarm.speed.max()) if swarm is not None and len(swarm) else 0.0
+    for group in (settings.ants, settings.soldiers, settings.queen, settings.enemies):
+        fastest = max(fastest, max((entity.speed for entity in group), default=0.0))
+    return fastest
+
+
+def _tiles_in_use(data: np.ndarray) -> np.ndarray:
+    """Which pheromone tiles of ``data`` (channels, columns, rows) hold any."""
+    tile = pheromone.TILE_SIZE
+    channels, width, height = data.shape
+    padded = np.zeros(
+        (channels, -(-width // tile) * tile, -(-height // tile) * tile), dtype=bool
+    )
+    padded[:, :width, :height] = data > 0
+    return padded.reshape(
+        channels, padded.shape[1] // tile, tile, padded.shape[2] // tile, tile
+    ).any(axis=(2, 4))
+
+
+def _mark_pheromone_tiles(x0: int, x1: int):
+    tile = pheromone.TILE_SIZE
+    field = settings.pheromones
+    field.active[:, x0 // tile : -(-x1 // tile)] = _tiles_in_use(field.data[:, x0:x1])
+
+
+store = ChunkStore()
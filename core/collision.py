@@ -1,17 +1,184 @@
+import math
+
+import numpy as np
+
 import settings
-from core import logging, map, perlin
+from core import map, perlin
+
+# Passability modes: plain workers, soldiers and queens are stopped by stone
+# and undug dirt, digging workers only by stone, enemies like plain workers.
+WORKER = 0
+DIGGER = 1
+ENEMY = 2
+
+# Rows of open sky kept above the map; anything higher is out of bounds
+SKY_ROWS = 4
+
+_blocked = {}
+
+
+def mode_for(enemy=False, assignment=0):
+    return WORKER if enemy or assignment == 0 else DIGGER
+
+
+def _rebuild():
+    stone = perlin.perlin_settings.map_data == 1
+    solid = stone | (map.data == 1)
+    sky = np.zeros((settings.MAP_WIDTH, SKY_ROWS), dtype=bool)
+    _blocked[WORKER] = np.concatenate([sky, solid], axis=1)
+    _blocked[DIGGER] = np.concatenate([sky, stone], axis=1)
+    _blocked[ENEMY] = _blocked[WORKER]
+
+
+def _on_terrain_changed(xs, ys):
+    if xs is None or not _blocked:
+        _blocked.clear()
+        return
+
+    stone = perlin.perlin_settings.map_data[xs, ys] == 1
+    _blocked[WORKER][xs, ys + SKY_ROWS] = stone | (map.data[xs, ys] == 1)
+    _blocked[DIGGER][xs, ys + SKY_ROWS] = stone
+
+
+map.subscribe(_on_terrain_changed)
+
+
+def attach(worker: np.ndarray, digger: np.ndarray):
+    """Uses ``worker``/``digger`` as the ``WORKER``/``DIGGER`` masks as they
+    are, e.g. shared ones another process keeps current."""
+    _blocked[WORKER] = worker
+    _blocked[DIGGER] = digger
+    _blocked[ENEMY] = worker
+
+
+def passability(mode=WORKER) -> np.ndarray:
+    """Blocked-cell bitmap for ``mode``, indexed ``[x, y + SKY_ROWS]``."""
+    if not _blocked:
+        _rebuild()
+    return _blocked[mode]
 
 
 def check_collision(x, y, enemy=False, assignment=0):
     grid_x, grid_y = int(x), int(y)
-    collision = (
+    if (
         grid_x < 0
         or grid_x >= settings.MAP_WIDTH
-        or grid_y < -4.5
+        or grid_y < -SKY_ROWS
         or grid_y >= settings.MAP_HEIGHT
-        or (grid_y >= 0 and perlin.perlin_settings.map_data[grid_x][grid_y] == 1)
-        or (enemy and (grid_y >= 0 and map.data[grid_x][grid_y] == 1))
-        or (assignment == 0 and (grid_y >= 0 and map.data[grid_x][grid_y] == 1))
+    ):
+        return True
+    return bool(passability(mode_for(enemy, assignment))[grid_x, grid_y + SKY_ROWS])
+
+
+def check_collision_many(xs, ys, mode=WORKER) -> np.ndarray:
+    """Vectorized ``check_collision`` over arrays of positions.
+
+    ``mode`` is one of ``WORKER``/``DIGGER``/``ENEMY`` or an array of them, one
+    per position.
+    """
+    return _cells_blocked(
+        np.trunc(xs).astype(np.int64), np.trunc(ys).astype(np.int64), mode
+    )
+
+
+def _cells_blocked(grid_x, grid_y, mode):
+    inside = (
+        (grid_x >= 0)
+        & (grid_x < settings.MAP_WIDTH)
+        & (grid_y >= -SKY_ROWS)
+        & (grid_y < settings.MAP_HEIGHT)
     )
-    logging.debug(f"Collision at ({grid_x}, {grid_y}): {collision}")
-    return collision
+    blocked = ~inside
+    cx, cy = grid_x[inside], grid_y[inside] + SKY_ROWS
+
+    if np.ndim(mode) == 0:
+        blocked[inside] = passability(mode)[cx, cy]
+    else:
+        digging = np.asarray(mode)[inside] == DIGGER
+        blocked[inside] = np.where(
+            digging, passability(DIGGER)[cx, cy], passability(WORKER)[cx, cy]
+        )
+    return blocked
+
+
+def line_blocked(x0, y0, x1, y1, mode=WORKER) -> bool:
+    """Whether any cell strictly between the start and end cells is blocked.
+
+    Walks the exact set of grid cells the segment crosses (Amanatides-Woo
+    traversal), looking each one up once.
+    """
+    cell_x, cell_y = math.floor(x0), math.floor(y0)
+    end_x, end_y = math.floor(x1), math.floor(y1)
+    remaining = abs(end_x - cell_x) + abs(end_y - cell_y)
+    if remaining < 2:
+        return False
+
+    dx, dy = x1 - x0, y1 - y0
+    step_x = 1 if dx > 0 else -1
+    step_y = 1 if dy > 0 else -1
+    delta_x = abs(1 / dx) if dx else math.inf
+    delta_y = abs(1 / dy) if dy else math.inf
+    next_x = (cell_x + (step_x > 0) - x0) / dx if dx else math.inf
+    next_y = (cell_y + (step_y > 0) - y0) / dy if dy else math.inf
+
+    blocked = passability(mode)
+    for _ in range(remaining - 1):
+        if cell_y == end_y or (cell_x != end_x and next_x < next_y):
+            cell_x += step_x
+            next_x += delta_x
+        else:
+            cell_y += step_y
+            next_y += delta_y
+        if (
+            cell_x < 0
+            or cell_x >= settings.MAP_WIDTH
+            or cell_y < -SKY_ROWS
+            or cell_y >= settings.MAP_HEIGHT
+            or blocked[cell_x, cell_y + SKY_ROWS]
+        ):
+            return True
+    return False
+
+
+def line_blocked_many(x0, y0, x1, y1, mode=WORKER) -> np.ndarray:
+    """``line_blocked`` for arrays of segments, all traversed in lockstep.
+
+    ``mode`` is a single mode or an array of them, one per segment.
+    """
+    x0, y0 = np.asarray(x0, dtype=float), np.asarray(y0, dtype=float)
+    x1, y1 = np.asarray(x1, dtype=float), np.asarray(y1, dtype=float)
+    modes = np.broadcast_to(mode, x0.shape)
+    cell_x = np.floor(x0).astype(np.int64)
+    cell_y = np.floor(y0).astype(np.int64)
+    end_x = np.floor(x1).astype(np.int64)
+    end_y = np.floor(y1).astype(np.int64)
+    remaining = np.abs(end_x - cell_x) + np.abs(end_y - cell_y)
+
+    dx, dy = x1 - x0, y1 - y0
+    step_x = np.where(dx > 0, 1, -1)
+    step_y = np.where(dy > 0, 1, -1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        delta_x = np.where(dx != 0, np.abs(1 / dx), np.inf)
+        delta_y = np.where(dy != 0, np.abs(1 / dy), np.inf)
+        next_x = np.where(dx != 0, (cell_x + (step_x > 0) - x0) / dx, np.inf)
+        next_y = np.where(dy != 0, (cell_y + (step_y > 0) - y0) / dy, np.inf)
+
+    blocked = np.zeros(x0.shape, dtype=bool)
+    active = np.flatnonzero(remaining >= 2)
+    for step in range(int(remaining.max(initial=0)) - 1):
+        active = active[(step < remaining[active] - 1) & ~blocked[active]]
+        if not len(active):
+            break
+
+        along_x = (cell_y[active] == end_y[active]) | (
+            (cell_x[active] != end_x[active])
+            & (next_x[active] < next_y[active])
+        )
+        moved_x, moved_y = active[along_x], active[~along_x]
+        cell_x[moved_x] += step_x[moved_x]
+        next_x[moved_x] += delta_x[moved_x]
+        cell_y[moved_y] += step_y[moved_y]
+        next_y[moved_y] += delta_y[moved_y]
+
+        blocked[active] = _cells_blocked(cell_x[active], cell_y[active], modes[active])
+    return blocked
@@ -0,0 +1,162 @@
+import math
+from collections.abc import MutableSet
+
+import numpy as np
+
+from core import shared
+
+BUCKET_SIZE = 8
+
+
+class FoodIndex(MutableSet):
+    """Set of food cells bucketed by grid region.
+
+    Behaves like the ``set`` of ``(x, y)`` tuples it replaces, and also keeps a
+    boolean occupancy grid plus per-bucket counts so radius and vision-cone
+    queries only look at the buckets they overlap instead of every food cell.
+    """
+
+    def __init__(self, width: int, height: int, cells=()):
+        self.width = width
+        self.height = height
+        self.grid = shared.releasable((width, height), bool)
+        self.bucket_counts = np.zeros(
+            (-(-width // BUCKET_SIZE), -(-height // BUCKET_SIZE)), dtype=np.int32
+        )
+        self._buckets = {}
+        self._count = 0
+        self._listeners = []
+        self.update(cells)
+
+    def subscribe(self, listener):
+        """Registers ``listener(x, y)`` to be told which cell gained or lost
+        food; both are ``None`` when every cell was cleared."""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _changed(self, x=None, y=None):
+        for listener in self._listeners:
+            listener(x, y)
+
+    def __contains__(self, cell) -> bool:
+        x, y = cell
+        return 0 <= x < self.width and 0 <= y < self.height and self.grid[x, y]
+
+    def __iter__(self):
+        for cells in list(self._buckets.values()):
+            yield from list(cells)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __repr__(self) -> str:
+        return f"FoodIndex({self._count} cells)"
+
+    def add(self, cell):
+        self.insert(cell)
+
+    def insert(self, cell) -> bool:
+        """Adds ``cell``; returns whether it was new."""
+        x, y = int(cell[0]), int(cell[1])
+        if not (0 <= x < self.width and 0 <= y < self.height) or self.grid[x, y]:
+            return False
+
+        self.grid[x, y] = True
+        bucket = (x // BUCKET_SIZE, y // BUCKET_SIZE)
+        self._buckets.setdefault(bucket, set()).add((x, y))
+        self.bucket_counts[bucket] += 1
+        self._count += 1
+        self._changed(x, y)
+        return True
+
+    def discard(self, cell) -> bool:
+        x, y = int(cell[0]), int(cell[1])
+        if (x, y) not in self:
+            return False
+
+        self.grid[x, y] = False
+        bucket = (x // BUCKET_SIZE, y // BUCKET_SIZE)
+        cells = self._buckets[bucket]
+        cells.discard((x, y))
+        if not cells:
+            del self._buckets[bucket]
+        self.bucket_counts[bucket] -= 1
+        self._count -= 1
+        self._changed(x, y)
+        return True
+
+    def update(self, cells) -> int:
+        """Adds every cell in ``cells`` at once and returns how many were new.
+
+        Listeners hear about all the new cells in one call, as arrays.
+        """
+        cells = np.array(list(cells), dtype=np.int64).reshape(-1, 2)
+        xs, ys = cells[:, 0], cells[:, 1]
+        inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+        xs, ys = xs[inside], ys[inside]
+        new = ~self.grid[xs, ys]
+        _, first = np.unique(xs[new] * self.height + ys[new], return_index=True)
+        xs, ys = xs[new][first], ys[new][first]
+        if not len(xs):
+            return 0
+
+        self.grid[xs, ys] = True
+        bx, by = xs // BUCKET_SIZE, ys // BUCKET_SIZE
+        np.add.at(self.bucket_counts, (bx, by), 1)
+        for x, y in zip(xs.tolist(), ys.tolist()):
+            bucket = (x // BUCKET_SIZE, y // BUCKET_SIZE)
+            self._buckets.setdefault(bucket, set()).add((x, y))
+        self._count += len(xs)
+        self._changed(xs, ys)
+        return len(xs)
+
+    def difference_update(self, cells) -> int:
+        return sum(self.discard(cell) for cell in cells)
+
+    def clear(self):
+        self.grid[:] = False
+        self.bucket_counts[:] = 0
+        self._buckets.clear()
+        self._count = 0
+        self._changed()
+
+    def _cells_near(self, x: float, y: float, radius: float):
+        bx0 = max(0, int(math.floor((x - radius) / BUCKET_SIZE)))
+        by0 = max(0, int(math.floor((y - radius) / BUCKET_SIZE)))
+        bx1 = min(self.bucket_counts.shape[0] - 1, int((x + radius) // BUCKET_SIZE))
+        by1 = min(self.bucket_counts.shape[1] - 1, int((y + radius) // BUCKET_SIZE))
+        for bx in range(bx0, bx1 + 1):
+            for by in range(by0, by1 + 1):
+                if self.bucket_counts[bx, by]:
+                    yield from self._buckets[(bx, by)]
+
+    def in_radius(self, x: float, y: float, radius: float):
+        """Food cells within ``radius`` of ``(x, y)``, nearest first."""
+        found = []
+        for cell in self._cells_near(x, y, radius):
+            distance = math.hypot(cell[0] - x, cell[1] - y)
+            if distance <= radius:
+                found.append((distance, cell))
+        found.sort()
+        return [cell for _, cell in found]
+
+    def in_vision(
+        self, x: float, y: float, angle: float, vision_range: float, vision_angle: float
+    ):
+        """Food cells inside a vision cone, nearest first."""
+        found = []
+        for cell in self._cells_near(x, y, vision_range):
+            dx = cell[0] - x
+            dy = cell[1] - y
+            distance = math.hypot(dx, dy)
+            if distance <= vision_range:
+                angle_diff = (math.atan2(dy, dx) - angle + math.pi) % (
+                    2 * math.pi
+                ) - math.pi
+                if abs(angle_diff) <= vision_angle / 2:
+                    found.append((distance, cell))
+        found.sort()
+        return [cell for _, cell in found]
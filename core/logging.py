@@ -1,41 +1,139 @@
+import atexit
+import os
+import sys
+import threading
+import time
+from collections import deque
 from datetime import datetime
 
 from colorama import Fore, Style, init
 
-import settings
-
 LOG_LEVELS = ["DEBUG", "INFO", "WARN", "ERROR"]
+# Records waiting for the writer thread; the oldest are dropped when full
+BUFFER_SIZE = 10000
+
+_buffer = deque()
+_dropped = 0
+_lock = threading.Condition()
+_output_lock = threading.Lock()
+_writer = None
+_threshold = LOG_LEVELS.index("INFO")
 
 
 def setup(log_level: str):
+    global _threshold
     init(autoreset=True)
     if log_level not in LOG_LEVELS:
         raise ValueError(f"Invalid log level: {log_level}")
-    settings.view_log_level = log_level
+    _threshold = LOG_LEVELS.index(log_level)
 
 
 def get_current_time():
     return datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
 
 
-def _log_message(level: str, message: str, color: str, level_order: int):
-    timestamp = get_current_time()
-    log_message = f"{color}{level}: {Style.RESET_ALL}{message}"
-    if LOG_LEVELS.index(settings.view_log_level) <= level_order:
-        print(f"{timestamp} - {log_message}")
+def _format_time(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+
+
+def _format(record) -> str:
+    timestamp, level, color, message, args = record
+    if args:
+        try:
+            message = message % args
+        except (TypeError, ValueError):
+            message = " ".join([str(message), *map(str, args)])
+    return f"{_format_time(timestamp)} - {color}{level}: {Style.RESET_ALL}{message}"
+
+
+def _drain():
+    global _dropped
+    # Held across take-and-write so batches reach stdout in order
+    with _output_lock:
+        with _lock:
+            records = list(_buffer)
+            _buffer.clear()
+            dropped, _dropped = _dropped, 0
+
+        lines = [_format(record) for record in records]
+        if dropped:
+            lines.insert(
+                0, f"{get_current_time()} - WARNING: {dropped} log messages dropped"
+            )
+        if lines:
+            sys.stdout.write("\n".join(lines) + "\n")
+            sys.stdout.flush()
+
+
+def _write_forever():
+    while True:
+        with _lock:
+            while not _buffer:
+                _lock.wait()
+        _drain()
+
+
+def _start_writer():
+    global _writer
+    if _writer is None:
+        _writer = threading.Thread(
+            target=_write_forever, name="log-writer", daemon=True
+        )
+        _writer.start()
+
+
+def flush():
+    """Writes out everything logged so far."""
+    _drain()
+
+
+atexit.register(flush)
+
+
+def _reset_after_fork():
+    # A forked child gets copies of locks that may be held by the parent's
+    # writer thread, and no writer thread of its own
+    global _buffer, _dropped, _lock, _output_lock, _writer
+    _buffer = deque()
+    _dropped = 0
+    _lock = threading.Condition()
+    _output_lock = threading.Lock()
+    _writer = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _log_message(level: str, message, color: str, level_order: int, args=()):
+    global _dropped
+    if level_order < _threshold:
+        return
+
+    with _lock:
+        if len(_buffer) >= BUFFER_SIZE:
+            _buffer.popleft()
+            _dropped += 1
+        _buffer.append((time.time(), level, color, message, args))
+        _start_writer()
+        _lock.notify()
 
 
-def debug(message: str):
-    _log_message("DEBUG", message, Fore.LIGHTBLACK_EX, 0)
+def debug(message: str, *args):
+    if _threshold <= 0:
+        _log_message("DEBUG", message, Fore.LIGHTBLACK_EX, 0, args)
 
 
-def info(message: str):
-    _log_message("INFO", message, Style.RESET_ALL, 1)
+def info(message: str, *args):
+    if _threshold <= 1:
+        _log_message("INFO", message, Style.RESET_ALL, 1, args)
 
 
-def warn(message: str):
-    _log_message("WARNING", message, Fore.YELLOW, 2)
+def warn(message: str, *args):
+    if _threshold <= 2:
+        _log_message("WARNING", message, Fore.YELLOW, 2, args)
 
 
-def error(message: str):
-    _log_message("ERROR", message, Fore.RED, 3)
+def error(message: str, *args):
+    if _threshold <= 3:
+        _log_message("ERROR", message, Fore.RED, 3, args)
@@ -1,5 +1,41 @@
-import numpy as np
-
 import settings
+from core import shared
+
+# 1 is undug dirt; filled a chunk at a time by ``chunks.ChunkStore``
+data = shared.releasable((settings.MAP_WIDTH, settings.MAP_HEIGHT), int)
+
+_listeners = []
+
+
+def subscribe(listener):
+    """Registers ``listener(xs, ys)`` to be told which terrain cells changed.
+
+    ``xs``/``ys`` are cell coordinates (scalars or arrays) covering both
+    ``data`` and ``perlin_settings.map_data``; both are ``None`` when the whole
+    map changed.
+    """
+    _listeners.append(listener)
+
+
+def unsubscribe(listener):
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+def changed(xs=None, ys=None):
+    for listener in _listeners:
+        listener(xs, ys)
+
+
+def dig(x, y):
+    if data[x, y]:
+        data[x, y] = 0
+        changed(x, y)
+
 
-data = np.ones((settings.MAP_WIDTH, settings.MAP_HEIGHT), dtype=int)
+def dig_many(xs, ys):
+    solid = data[xs, ys] == 1
+    if solid.any():
+        xs, ys = xs[solid], ys[solid]
+        data[xs, ys] = 0
+        changed(xs, ys)
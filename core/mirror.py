@@ -0,0 +1,98 @@
+import numpy as np
+
+import settings
+from core import map, perlin
+
+WORKER = 0
+WORKER_WITH_FOOD = 1
+SOLDIER = 2
+QUEEN = 3
+ENEMY = 4
+
+
+class Workers:
+    """Worker positions in the shape the render loop reads from a swarm."""
+
+    def __init__(self, x, y, has_food):
+        self.x = x
+        self.y = y
+        self.has_food = has_food
+
+    def __len__(self):
+        return len(self.x)
+
+
+class Marker:
+    __slots__ = ("x", "y")
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+def _markers(x, y, mask):
+    return [Marker(px, py) for px, py in zip(x[mask], y[mask])]
+
+
+def entities():
+    """``(x, y, kind)`` arrays for every entity group in this process."""
+    swarm = settings.worker_swarm
+    if swarm is not None:
+        yield swarm.x, swarm.y, np.where(swarm.has_food, WORKER_WITH_FOOD, WORKER)
+    for group, kind in (
+        (settings.ants, None),
+        (settings.soldiers, SOLDIER),
+        (settings.queen, QUEEN),
+        (settings.enemies, ENEMY),
+    ):
+        if not group:
+            continue
+        x = np.fromiter((entity.x for entity in group), float, len(group))
+        y = np.fromiter((entity.y for entity in group), float, len(group))
+        if kind is None:
+            has_food = np.fromiter((ant.has_food for ant in group), bool, len(group))
+            yield x, y, np.where(has_food, WORKER_WITH_FOOD, WORKER)
+        else:
+            yield x, y, np.full(len(group), kind)
+
+
+def show_grids(terrain, dirt, food, columns=None):
+    """Copies terrain, dirt and food grids into this process's world.
+
+    Only cells that differ are touched, so the terrain layer and food index
+    do no more work than the change needs. ``columns`` limits the comparison
+    to those map columns, for callers that know the others are unchanged.
+    """
+    if columns is None:
+        columns = np.arange(settings.MAP_WIDTH)
+    terrain, dirt, food = terrain[columns], dirt[columns], food[columns]
+    changed = (perlin.perlin_settings.map_data[columns] != terrain) | (
+        map.data[columns] != dirt
+    )
+    xs, ys = np.nonzero(changed)
+    if len(xs):
+        perlin.perlin_settings.map_data[columns] = terrain
+        map.data[columns] = dirt
+        map.changed(columns[xs], ys)
+
+    food_locations = settings.food_locations
+    shown = food_locations.grid[columns]
+    xs, ys = np.nonzero(shown & ~food)
+    food_locations.difference_update(zip(columns[xs], ys))
+    xs, ys = np.nonzero(food & ~shown)
+    food_locations.update(zip(columns[xs], ys))
+
+
+def show_entities(x, y, kind):
+    """Replaces every entity group with stand-ins at ``(x, y)``.
+
+    The stand-ins only carry what drawing needs; nothing here can be stepped.
+    """
+    workers = kind <= WORKER_WITH_FOOD
+    settings.ants = []
+    settings.worker_swarm = Workers(
+        x[workers], y[workers], kind[workers] == WORKER_WITH_FOOD
+    )
+    settings.soldiers = _markers(x, y, kind == SOLDIER)
+    settings.queen = _markers(x, y, kind == QUEEN)
+    settings.enemies = _markers(x, y, kind == ENEMY)
@@ -1,63 +1,188 @@
 import random
+from collections import OrderedDict
 
 import numpy as np
-from perlin_noise import PerlinNoise
 
 import settings
-from core import logging, map
+from core import logging, shared, spatial_hash
+
+# Noise fields are cached per chunk, so this covers several seeds' worth
+NOISE_CACHE_SIZE = 64
+_noise_cache = OrderedDict()
+
+
+def _fade(t: np.ndarray) -> np.ndarray:
+    return 6 * t**5 - 15 * t**4 + 10 * t**3
+
+
+def _gradients(seed: int, x0: int, x1: int, y0: int, y1: int) -> np.ndarray:
+    # Same per-corner vectors as the perlin-noise package: Python's RNG seeded
+    # with seed * hash(corner). There are only a handful of lattice corners per
+    # map, so these stay scalar and everything per-cell is vectorized.
+    state = random.getstate()
+    grads = np.empty((x1 - x0 + 1, y1 - y0 + 1, 2))
+    for i in range(x0, x1 + 1):
+        for j in range(y0, y1 + 1):
+            random.seed(seed * max(1, abs(i + 10 * j + 1)))
+            grads[i - x0, j - y0] = random.uniform(-1, 1), random.uniform(-1, 1)
+    random.setstate(state)
+    return grads
+
+
+def gradient_noise(xs: np.ndarray, ys: np.ndarray, seed: int) -> np.ndarray:
+    """Single layer of gradient noise at every ``(xs, ys)`` sample.
+
+    Matches ``perlin_noise.PerlinNoise(octaves=1, seed=seed)`` sample for
+    sample, but evaluates the whole field in one batched pass.
+    """
+    xs = np.asarray(xs, dtype=float)
+    ys = np.asarray(ys, dtype=float)
+    ix = np.floor(xs).astype(np.int64)
+    iy = np.floor(ys).astype(np.int64)
+    x0, y0 = int(ix.min(initial=0)), int(iy.min(initial=0))
+    grads = _gradients(
+        seed, x0, int(ix.max(initial=0)) + 1, y0, int(iy.max(initial=0)) + 1
+    )
+
+    value = np.zeros(np.broadcast(xs, ys).shape)
+    for cx in (0, 1):
+        for cy in (0, 1):
+            dx = xs - (ix + cx)
+            dy = ys - (iy + cy)
+            grad = grads[ix + cx - x0, iy + cy - y0]
+            weight = _fade(1 - np.abs(dx)) * _fade(1 - np.abs(dy))
+            value += weight * (grad[..., 0] * dx + grad[..., 1] * dy)
+    return value
+
+
+def fractal_noise(
+    xs: np.ndarray,
+    ys: np.ndarray,
+    seed: int,
+    octaves: int = 1,
+    persistence: float = 0.5,
+    lacunarity: float = 2.0,
+) -> np.ndarray:
+    """Sums ``octaves`` layers of ``gradient_noise``, each ``lacunarity`` times
+    finer and ``persistence`` times weaker than the last."""
+    value = np.zeros(np.broadcast(xs, ys).shape)
+    frequency, amplitude = 1.0, 1.0
+    for _ in range(octaves):
+        value += amplitude * gradient_noise(xs * frequency, ys * frequency, seed)
+        frequency *= lacunarity
+        amplitude *= persistence
+    return value
+
+
+def noise_field(
+    seed: int, scale: float, octaves: int, width: int, height: int, x0: int = 0
+) -> np.ndarray:
+    """Raw noise for map columns ``x0`` to ``x0 + width``, cached for the most
+    recent seeds.
+
+    The field does not depend on the threshold, so dragging the threshold only
+    re-runs the comparison in ``generate_columns`` rather than the noise
+    itself. Any slice of columns matches the same columns of a wider field.
+    """
+    key = (seed, scale, octaves, width, height, x0)
+    if key in _noise_cache:
+        _noise_cache.move_to_end(key)
+        return _noise_cache[key]
+
+    xs, ys = np.meshgrid(
+        np.arange(x0, x0 + width) / scale, np.arange(height) / scale, indexing="ij"
+    )
+    field = fractal_noise(xs, ys, seed, octaves)
+    field.flags.writeable = False
+    _noise_cache[key] = field
+    if len(_noise_cache) > NOISE_CACHE_SIZE:
+        _noise_cache.popitem(last=False)
+    logging.debug("Noise field generated for seed %s, scale %s", seed, scale)
+    return field
 
 
 class PerlinNoiseSettings:
-    def __init__(self, scale: float = 40.0, threshold: float = 0.1, seed: int = None):
+    def __init__(
+        self,
+        scale: float = 40.0,
+        threshold: float = 0.1,
+        seed: int = None,
+        octaves: int = 1,
+    ):
         self.seed = (
             seed if seed is not None else random.randint(-2147483647, 2147483647)
         )
         self.scale = scale
         self.threshold = threshold
-        self.noise_generator = PerlinNoise(octaves=1, seed=self.seed)
-        self.map_data = self.generate_map()
+        self.octaves = octaves
+        # Filled a chunk at a time by ``chunks.ChunkStore``
+        self.map_data = shared.releasable(
+            (settings.MAP_WIDTH, settings.MAP_HEIGHT), int
+        )
 
         logging.info(
-            f"Perlin noise initialized with seed {self.seed}, scale {self.scale}, threshold {self.threshold}"
+            "Perlin noise initialized with seed %s, scale %s, threshold %s",
+            self.seed,
+            self.scale,
+            self.threshold,
         )
 
     def generate_map(self) -> np.ndarray:
-        map_data = np.zeros((settings.MAP_WIDTH, settings.MAP_HEIGHT), dtype=int)
-
-        for X in range(settings.MAP_WIDTH):
-            for Y in range(settings.MAP_HEIGHT):
-                noise_value = self.noise_generator([X / self.scale, Y / self.scale])
-                map_data[X, Y] = 1 if noise_value > self.threshold else 0
+        return self.generate_columns(0, settings.MAP_WIDTH)
 
-        return map_data
+    def generate_columns(self, x0: int, x1: int) -> np.ndarray:
+        """Terrain for map columns ``x0`` to ``x1``; 1 is stone."""
+        noise = noise_field(
+            self.seed, self.scale, self.octaves, x1 - x0, settings.MAP_HEIGHT, x0
+        )
+        return (noise > self.threshold).astype(int)
 
 
 perlin_settings = PerlinNoiseSettings()
 
 
-def regenerate(seed_button_value, threshold_slider):
-    new_threshold = threshold_slider.value
-    new_seed = int(seed_button_value)
-
-    if perlin_settings.threshold != new_threshold or perlin_settings.seed != new_seed:
-        perlin_settings.threshold = new_threshold
-        perlin_settings.seed = new_seed
-        perlin_settings.noise_generator = PerlinNoise(octaves=1, seed=new_seed)
-        perlin_settings.map_data = perlin_settings.generate_map()
-
-        if not settings.ui_visible:
-            nest_x, nest_y = settings.nest_location
+def regenerate(seed_button_value, threshold) -> bool:
+    """Switches to a new seed/threshold; returns whether either changed.
 
-            for entity_group in (settings.ants, settings.soldiers, settings.queen):
-                for entity in entity_group:
-                    entity.x, entity.y = nest_x, nest_y
-
-            for enemy in settings.enemies:
-                enemy.x, enemy.y = (
-                    settings.MONITOR_WIDTH // 2,
-                    settings.MONITOR_HEIGHT // 2,
-                )
+    The terrain itself is regenerated by ``chunks.store.reset``.
+    """
+    new_threshold = threshold
+    new_seed = int(seed_button_value)
 
-        for x in range(settings.MAP_WIDTH):
-            for y in range(settings.MAP_HEIGHT):
-                map.data[x, y] = 1
+    if (
+        perlin_settings.threshold == new_threshold
+        and perlin_settings.seed == new_seed
+    ):
+        return False
+
+    perlin_settings.threshold = new_threshold
+    perlin_settings.seed = new_seed
+
+    if not settings.ui_visible:
+        nest_x, nest_y = settings.nest_location
+        index = spatial_hash.index
+
+        for kind, entity_group in (
+            (spatial_hash.ANT, settings.ants),
+            (spatial_hash.SOLDIER, settings.soldiers),
+            (spatial_hash.QUEEN, settings.queen),
+        ):
+            for entity in entity_group:
+                x, y = entity.x, entity.y
+                entity.x, entity.y = nest_x, nest_y
+                index.move(kind, entity, x, y)
+
+        swarm = settings.worker_swarm
+        if swarm is not None:
+            swarm.x[:] = nest_x
+            swarm.y[:] = nest_y
+            index.swarm_moved()
+
+        for enemy in settings.enemies:
+            x, y = enemy.x, enemy.y
+            enemy.x, enemy.y = (
+                settings.MONITOR_WIDTH // 2,
+                settings.MONITOR_HEIGHT // 2,
+            )
+            index.move(spatial_hash.ENEMY, enemy, x, y)
+    return True
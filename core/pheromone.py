@@ -0,0 +1,91 @@
+import numpy as np
+
+from core import shared
+
+# Only workers' food trails so far; more kinds of pheromone become channels
+FOOD_TRAIL = 0
+CHANNELS = ("food",)
+
+DECAY = 0.99
+# Strengths below this are cleared so faded trails stop costing decay work
+CLAMP_THRESHOLD = 1e-3
+TILE_SIZE = 16
+
+
+class PheromoneField:
+    """Pheromone strengths for every channel, stored as float32.
+
+    The grid is split into ``TILE_SIZE`` tiles and each channel tracks which
+    tiles hold any pheromone. ``decay`` only touches those tiles, and tiles
+    whose strengths have all faded below ``clamp_threshold`` are cleared and
+    dropped from the active set.
+    """
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        decay: float = DECAY,
+        clamp_threshold: float = CLAMP_THRESHOLD,
+    ):
+        self.width = width
+        self.height = height
+        self.decay_rate = np.float32(decay)
+        self.clamp_threshold = np.float32(clamp_threshold)
+        tiles_x = -(-width // TILE_SIZE)
+        tiles_y = -(-height // TILE_SIZE)
+        self.data = shared.releasable(
+            (len(CHANNELS), tiles_x * TILE_SIZE, tiles_y * TILE_SIZE), np.float32
+        )
+        self.active = np.zeros((len(CHANNELS), tiles_x, tiles_y), dtype=bool)
+
+    def channel(self, channel: int) -> np.ndarray:
+        """Writable ``(width, height)`` view of one channel."""
+        return self.data[channel, : self.width, : self.height]
+
+    @property
+    def food(self) -> np.ndarray:
+        return self.channel(FOOD_TRAIL)
+
+    def attach(self, data: np.ndarray, active: np.ndarray, copy: bool = True):
+        """Moves the field onto caller-owned arrays, e.g. shared memory.
+
+        ``data``/``active`` must match the current shapes; with ``copy`` the
+        current strengths are carried over. Views taken earlier still point at
+        the old arrays, so read channels through the field, e.g. ``food``.
+        """
+        if copy:
+            np.copyto(data, self.data)
+            np.copyto(active, self.active)
+        self.data = data
+        self.active = active
+
+    def strength(self, channel: int, x, y):
+        return self.data[channel, x, y]
+
+    def deposit(self, channel: int, x, y, strength: float = 1.0):
+        """Sets the strength at cell(s) ``(x, y)``; accepts scalars or arrays."""
+        self.data[channel, x, y] = strength
+        self.active[channel, x // TILE_SIZE, y // TILE_SIZE] = True
+
+    def decay(self):
+        for channel in range(len(CHANNELS)):
+            tx, ty = np.nonzero(self.active[channel])
+            if not len(tx):
+                continue
+
+            tiles = self.data[channel].reshape(
+                self.active.shape[1], TILE_SIZE, self.active.shape[2], TILE_SIZE
+            )
+            block = tiles[tx, :, ty, :]
+            block *= self.decay_rate
+            block[block < self.clamp_threshold] = 0
+            tiles[tx, :, ty, :] = block
+            self.active[channel, tx, ty] = block.reshape(len(tx), -1).any(axis=1)
+
+    def active_cells(self, channel: int) -> int:
+        return int(self.active[channel].sum()) * TILE_SIZE * TILE_SIZE
+
+    def clear(self):
+        self.data[:] = 0
+        self.active[:] = False
@@ -0,0 +1,119 @@
+import atexit
+import csv
+import os
+import time
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+
+PHASES = (
+    "events",
+    "sync",
+    "chunks",
+    "workers",
+    "colony",
+    "enemies",
+    "pheromone_decay",
+    "recording",
+    "terrain_draw",
+    "pheromone_draw",
+    "overview_draw",
+    "entity_draw",
+    "ui_draw",
+    "flip",
+)
+# Frames kept for the rolling averages and percentiles
+WINDOW = 240
+
+
+def run_csv_path(directory: str) -> str:
+    """A fresh ``frames-<timestamp>.csv`` path under ``directory``."""
+    os.makedirs(directory, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    return os.path.join(directory, f"frames-{stamp}.csv")
+
+
+class FrameProfiler:
+    """Splits each frame's time between named phases.
+
+    ``begin_frame`` starts the clock and each ``lap(phase)`` charges the time
+    since the previous lap to ``phase``, so timing a phase costs one
+    ``perf_counter`` call. A phase may be lapped several times per frame and
+    its times add up. ``end_frame`` files the frame into a rolling window and,
+    when ``csv_path`` is given, appends it as a row in milliseconds.
+    """
+
+    def __init__(self, phases=PHASES, window: int = WINDOW, csv_path: str = None):
+        self.phases = tuple(phases)
+        self.history = {name: deque(maxlen=window) for name in self.phases + ("frame",)}
+        self.current = dict.fromkeys(self.phases, 0.0)
+        self.frames = 0
+        self.csv_path = csv_path
+        self._frame_start = self._mark = time.perf_counter()
+        self._csv_file = None
+        self._csv = None
+        if csv_path:
+            self._csv_file = open(csv_path, "w", newline="")
+            self._csv = csv.writer(self._csv_file)
+            self._csv.writerow(["frame", "frame_ms", *(f"{p}_ms" for p in self.phases)])
+            atexit.register(self.close)
+
+    def begin_frame(self):
+        self._frame_start = self._mark = time.perf_counter()
+
+    def lap(self, phase: str):
+        now = time.perf_counter()
+        self.current[phase] += now - self._mark
+        self._mark = now
+
+    def end_frame(self):
+        frame = (time.perf_counter() - self._frame_start) * 1000
+        self.history["frame"].append(frame)
+        for phase in self.phases:
+            self.history[phase].append(self.current[phase] * 1000)
+            self.current[phase] = 0.0
+        self.frames += 1
+
+        if self._csv is not None:
+            self._csv.writerow(
+                [
+                    self.frames,
+                    f"{frame:.3f}",
+                    *(f"{self.history[p][-1]:.3f}" for p in self.phases),
+                ]
+            )
+
+    def stats(self) -> dict:
+        """``{phase: (mean, p95, p99)}`` in milliseconds over the window."""
+        stats = {}
+        for name, samples in self.history.items():
+            if samples:
+                values = np.fromiter(samples, dtype=float, count=len(samples))
+                p95, p99 = np.percentile(values, (95, 99))
+                stats[name] = (values.mean(), p95, p99)
+            else:
+                stats[name] = (0.0, 0.0, 0.0)
+        return stats
+
+    def close(self):
+        if self._csv_file is not None:
+            self._csv_file.close()
+            self._csv_file = None
+            self._csv = None
+
+
+class NullProfiler:
+    """Stand-in used when nothing is being profiled."""
+
+    def begin_frame(self):
+        pass
+
+    def lap(self, phase: str):
+        pass
+
+    def end_frame(self):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
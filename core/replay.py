@@ -0,0 +1,406 @@
+import json
+import struct
+import zlib
+
+import numpy as np
+
+import settings
+from core import logging, map, mirror, perlin, pheromone
+
+MAGIC = b"ANTRPLY\x00"
+VERSION = 1
+# magic, format version, JSON header length
+PREAMBLE = struct.Struct("<8sII")
+# record kind, tick, compressed payload length
+RECORD = struct.Struct("<BqI")
+KEYFRAME = 1
+DELTA = 2
+# Positions are stored in 1/POSITION_SCALE cell steps
+POSITION_SCALE = 64
+# zlib level; higher barely shrinks per-tick deltas and costs tick time
+COMPRESSION = 1
+
+HEADER_FIELDS = ("collected_food", "total_food", "seed", "threshold")
+DELTA_TYPES = (np.int8, np.int16)
+
+
+def _pack(arrays: dict) -> bytes:
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+    directory = json.dumps(
+        {name: [array.dtype.str, list(array.shape)] for name, array in arrays.items()}
+    ).encode()
+    chunks = [struct.pack("<I", len(directory)), directory]
+    chunks.extend(memoryview(array).cast("B") for array in arrays.values())
+    return zlib.compress(b"".join(chunks), COMPRESSION)
+
+
+def _unpack(payload: bytes) -> dict:
+    data = zlib.decompress(payload)
+    (length,) = struct.unpack_from("<I", data)
+    offset = 4 + length
+    arrays = {}
+    for name, (dtype, shape) in json.loads(data[4:offset]).items():
+        dtype = np.dtype(dtype)
+        count = int(np.prod(shape, dtype=np.int64))
+        arrays[name] = np.frombuffer(data, dtype, count, offset).reshape(shape)
+        offset += count * dtype.itemsize
+    return arrays
+
+
+def _smallest(values: np.ndarray) -> np.ndarray:
+    """``values`` in the narrowest integer type that holds them."""
+    if not len(values):
+        return values.astype(DELTA_TYPES[0])
+    low, high = values.min(), values.max()
+    for dtype in DELTA_TYPES:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return values.astype(dtype)
+    return values
+
+
+def _header() -> np.ndarray:
+    return np.array(
+        (
+            settings.collected_food,
+            settings.total_food,
+            perlin.perlin_settings.seed,
+            perlin.perlin_settings.threshold,
+        ),
+        dtype=np.float64,
+    )
+
+
+def _positions():
+    """Quantized ``(x, y)`` and ``kind`` of every entity in this process."""
+    groups = list(mirror.entities())
+    if not groups:
+        return np.zeros(0, np.int32), np.zeros(0, np.int32), np.zeros(0, np.uint8)
+    x, y, kind = (np.concatenate(column) for column in zip(*groups))
+    return (
+        np.round(x * POSITION_SCALE).astype(np.int32),
+        np.round(y * POSITION_SCALE).astype(np.int32),
+        kind.astype(np.uint8),
+    )
+
+
+def _set_pheromones(field: pheromone.PheromoneField, cells, values):
+    field.data.flat[cells] = values
+    channels, xs, ys = np.unravel_index(cells, field.data.shape)
+    field.active[channels, xs // pheromone.TILE_SIZE, ys // pheromone.TILE_SIZE] = True
+
+
+class Recorder:
+    """Streams a run to ``path`` as one record per tick.
+
+    Every ``keyframe_interval`` ticks the record is a keyframe holding the
+    whole picture: terrain, dirt, food, pheromones and entity positions. The
+    ticks between hold only what changed since the tick before: the terrain,
+    dirt and food cells that differ (digging, pickups, tool edits), entity
+    moves as small integer steps, and kind changes such as a worker picking
+    up food. When the entity count changes, from spawns or deaths, the
+    positions are written out in full instead.
+
+    Pheromones decay by the same rule every tick, so the recorder decays a
+    shadow copy and stores only the cells where the real field differs from
+    it; playback decays its own copy the same way and lands on the same
+    values. Records are compressed and written as they are made, and the
+    file is flushed at every keyframe, so memory stays flat however long the
+    run is and a crash loses at most one keyframe interval.
+    """
+
+    def __init__(self, path: str, tick: int, keyframe_interval: int = None):
+        self.path = path
+        self.keyframe_interval = keyframe_interval or settings.REPLAY_KEYFRAME_INTERVAL
+        field = settings.pheromones
+        self._pheromones = pheromone.PheromoneField(
+            field.width, field.height, field.decay_rate, field.clamp_threshold
+        )
+        self._since_keyframe = None
+        self.file = open(path, "wb")
+        meta = json.dumps(
+            {
+                "map": [settings.MAP_WIDTH, settings.MAP_HEIGHT],
+                "keyframe_interval": self.keyframe_interval,
+                "position_scale": POSITION_SCALE,
+                "tick_rate": settings.TICK_RATE,
+            }
+        ).encode()
+        self.file.write(PREAMBLE.pack(MAGIC, VERSION, len(meta)))
+        self.file.write(meta)
+        self.record(tick)
+        logging.info("Recording replay to %s", path)
+
+    def record(self, tick: int):
+        """Appends the world as it is after ``tick``."""
+        if (
+            self._since_keyframe is None
+            or self._since_keyframe >= self.keyframe_interval
+        ):
+            kind, arrays = KEYFRAME, self._keyframe()
+            self._since_keyframe = 0
+        else:
+            kind, arrays = DELTA, self._delta()
+        self._since_keyframe += 1
+
+        payload = _pack(arrays)
+        self.file.write(RECORD.pack(kind, tick, len(payload)))
+        self.file.write(payload)
+        if kind == KEYFRAME:
+            self.file.flush()
+
+    def _keyframe(self) -> dict:
+        field = settings.pheromones
+        self._terrain = perlin.perlin_settings.map_data.copy()
+        self._dirt = map.data.copy()
+        self._food = settings.food_locations.grid.copy()
+        np.copyto(self._pheromones.data, field.data)
+        np.copyto(self._pheromones.active, field.active)
+        self._x, self._y, self._kind = _positions()
+        return {
+            "header": _header(),
+            "terrain": self._terrain,
+            "dirt": self._dirt,
+            "food": self._food,
+            "pheromones": field.data,
+            "pheromone_tiles": field.active,
+            "x": self._x,
+            "y": self._y,
+            "kind": self._kind,
+        }
+
+    def _delta(self) -> dict:
+        arrays = {"header": _header()}
+        grids = (
+            ("terrain", self._terrain, perlin.perlin_settings.map_data),
+            ("dirt", self._dirt, map.data),
+            ("food", self._food, settings.food_locations.grid),
+        )
+        for name, previous, current in grids:
+            cells = np.flatnonzero(previous != current)
+            values = np.ravel(current)[cells]
+            previous.flat[cells] = values
+            arrays[f"{name}.cells"] = cells.astype(np.int32)
+            arrays[f"{name}.values"] = values
+
+        shadow = self._pheromones
+        shadow.decay()
+        current = settings.pheromones.data
+        cells = np.flatnonzero(shadow.data != current)
+        values = np.ravel(current)[cells]
+        _set_pheromones(shadow, cells, values)
+        arrays["pheromones.cells"] = cells.astype(np.int32)
+        arrays["pheromones.values"] = values
+
+        x, y, kind = _positions()
+        if len(x) == len(self._x):
+            arrays["dx"] = _smallest(x - self._x)
+            arrays["dy"] = _smallest(y - self._y)
+            changed = np.flatnonzero(kind != self._kind)
+            arrays["kind.cells"] = changed.astype(np.int32)
+            arrays["kind.values"] = kind[changed]
+        else:
+            arrays.update(x=x, y=y, kind=kind)
+        self._x, self._y, self._kind = x, y, kind
+        return arrays
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+            logging.info("Replay saved to %s", self.path)
+
+
+class Player:
+    """Plays a file made by ``Recorder`` back into this process's world.
+
+    Records are applied straight onto the terrain, food and pheromone state
+    the render loop draws, and entities are shown as position-only
+    stand-ins, so no entity code runs. ``step`` plays the next ``n`` ticks,
+    which lets a ``TickScheduler`` drive playback at any multiplier just as it
+    drives a ``Simulation``. ``seek`` jumps to the keyframe at or before the
+    wanted tick and plays forward from there.
+
+    Offers the ``Simulation`` methods ``main.py`` uses; the ones that would
+    edit the colony do nothing.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.queen_enabled = True
+        self.file = open(path, "rb")
+        preamble = self.file.read(PREAMBLE.size)
+        if len(preamble) < PREAMBLE.size:
+            raise ValueError(f"{path} is not a replay")
+        magic, version, meta_length = PREAMBLE.unpack(preamble)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a replay")
+        if version > VERSION:
+            raise ValueError(
+                f"{path} uses replay format {version}; this version reads up to {VERSION}"
+            )
+        self.meta = json.loads(self.file.read(meta_length))
+        if tuple(self.meta["map"]) != (settings.MAP_WIDTH, settings.MAP_HEIGHT):
+            width, height = self.meta["map"]
+            raise ValueError(
+                f"Replay is for a {width}x{height} map, this one is "
+                f"{settings.MAP_WIDTH}x{settings.MAP_HEIGHT}"
+            )
+
+        self._scan(PREAMBLE.size + meta_length)
+        if not len(self.ticks):
+            raise ValueError(f"{path} holds no ticks")
+        self.scale = self.meta["position_scale"]
+        self.position = -1
+        self.seek(int(self.ticks[0]))
+        logging.info(
+            "Playing %s ticks from %s", self.ticks[-1] - self.ticks[0] + 1, path
+        )
+
+    def _scan(self, offset: int):
+        """Indexes every whole record, reading headers only."""
+        ticks, offsets, keyframes = [], [], []
+        size = self.file.seek(0, 2)
+        while offset + RECORD.size <= size:
+            self.file.seek(offset)
+            kind, tick, length = RECORD.unpack(self.file.read(RECORD.size))
+            if offset + RECORD.size + length > size:
+                # Cut off mid-record, e.g. by a crash while recording
+                break
+            if kind == KEYFRAME:
+                keyframes.append(len(ticks))
+            elif not keyframes:
+                break
+            ticks.append(tick)
+            offsets.append(offset)
+            offset += RECORD.size + length
+        self.ticks = np.array(ticks, dtype=np.int64)
+        self.offsets = np.array(offsets, dtype=np.int64)
+        self.keyframes = np.array(keyframes, dtype=np.int64)
+
+    @property
+    def tick(self) -> int:
+        return int(self.ticks[self.position])
+
+    @property
+    def finished(self) -> bool:
+        return self.position >= len(self.ticks) - 1
+
+    def _read(self, index: int):
+        self.file.seek(self.offsets[index])
+        kind, _, length = RECORD.unpack(self.file.read(RECORD.size))
+        return kind, _unpack(self.file.read(length))
+
+    def _apply(self, index: int):
+        kind, arrays = self._read(index)
+        header = dict(zip(HEADER_FIELDS, arrays["header"]))
+        settings.collected_food = int(header["collected_food"])
+        settings.total_food = int(header["total_food"])
+        perlin.perlin_settings.seed = int(header["seed"])
+        perlin.perlin_settings.threshold = header["threshold"]
+
+        if kind == KEYFRAME:
+            mirror.show_grids(arrays["terrain"], arrays["dirt"], arrays["food"])
+            np.copyto(settings.pheromones.data, arrays["pheromones"])
+            np.copyto(settings.pheromones.active, arrays["pheromone_tiles"])
+            self._x, self._y, self._kind = (
+                arrays[key].copy() for key in ("x", "y", "kind")
+            )
+        else:
+            self._apply_delta(arrays)
+        self.position = index
+
+    def _apply_delta(self, arrays: dict):
+        terrain = perlin.perlin_settings.map_data
+        shape = terrain.shape
+        cells = arrays["terrain.cells"]
+        terrain.flat[cells] = arrays["terrain.values"]
+        dug = arrays["dirt.cells"]
+        map.data.flat[dug] = arrays["dirt.values"]
+        changed = np.union1d(cells, dug)
+        if len(changed):
+            map.changed(*np.unravel_index(changed, shape))
+
+        food = settings.food_locations
+        cells = np.unravel_index(arrays["food.cells"], shape)
+        added = arrays["food.values"]
+        food.update(zip(cells[0][added], cells[1][added]))
+        food.difference_update(zip(cells[0][~added], cells[1][~added]))
+
+        settings.pheromones.decay()
+        _set_pheromones(
+            settings.pheromones, arrays["pheromones.cells"], arrays["pheromones.values"]
+        )
+
+        if "dx" in arrays:
+            self._x += arrays["dx"]
+            self._y += arrays["dy"]
+            self._kind[arrays["kind.cells"]] = arrays["kind.values"]
+        else:
+            self._x, self._y, self._kind = (
+                arrays[key].copy() for key in ("x", "y", "kind")
+            )
+
+    def _show(self):
+        mirror.show_entities(self._x / self.scale, self._y / self.scale, self._kind)
+
+    def step(self, n: int = 1):
+        """Plays the next ``n`` ticks; stops at the end of the recording."""
+        end = min(self.position + n, len(self.ticks) - 1)
+        if end <= self.position:
+            return
+        for index in range(self.position + 1, end + 1):
+            self._apply(index)
+        self._show()
+
+    def seek(self, tick: int):
+        """Jumps to ``tick``, clamped to the recording."""
+        target = max(0, int(np.searchsorted(self.ticks, tick, side="right")) - 1)
+        keyframe = self.keyframes[
+            max(0, int(np.searchsorted(self.keyframes, target, side="right")) - 1)
+        ]
+        # Playing on is cheaper than reloading when no keyframe is in between
+        if not keyframe <= self.position <= target:
+            self._apply(int(keyframe))
+        for index in range(self.position + 1, target + 1):
+            self._apply(index)
+        self._show()
+
+    def describe(self) -> str:
+        last = int(self.ticks[-1])
+        return f"Replay: tick {self.tick}/{last}" + (" (end)" if self.finished else "")
+
+    # Simulation methods that would change the colony
+
+    def populate(self, *args):
+        pass
+
+    def generate(self, *args):
+        pass
+
+    def regenerate(self, *args):
+        pass
+
+    def use_tool(self, *args):
+        pass
+
+    def set_view(self, x0: int, x1: int):
+        pass
+
+    def save(self, path: str):
+        raise OSError("A replay cannot be saved as a colony")
+
+    def load(self, path: str):
+        raise OSError("Loading is not available while playing a replay")
+
+    def start_recording(self, path: str):
+        pass
+
+    def stop_recording(self):
+        pass
+
+    @property
+    def recording(self) -> bool:
+        return False
+
+    def close(self):
+        self.file.close()
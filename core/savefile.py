@@ -0,0 +1,85 @@
+import json
+import os
+import struct
+
+import numpy as np
+
+MAGIC = b"ANTSIM\x00\x00"
+VERSION = 1
+# magic, format version, JSON header length
+PREAMBLE = struct.Struct("<8sII")
+# Arrays start on this boundary so they can be memory-mapped in place
+ALIGNMENT = 64
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def write(path: str, meta: dict, arrays: dict):
+    """Writes ``meta`` (JSON-able) and named NumPy ``arrays`` to ``path``.
+
+    The file is a fixed preamble, a JSON header describing every array, then
+    the raw array data, each aligned to ``ALIGNMENT`` bytes. It is written to
+    a temporary file first and moved into place, so a crash mid-save never
+    leaves a half-written file behind.
+    """
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+    directory = {}
+    offset = 0
+    for name, array in arrays.items():
+        directory[name] = {
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "offset": offset,
+        }
+        offset = _align(offset + array.nbytes)
+
+    header = json.dumps({**meta, "arrays": directory}).encode()
+    data_start = _align(PREAMBLE.size + len(header))
+
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(PREAMBLE.pack(MAGIC, VERSION, len(header)))
+        f.write(header)
+        for name, array in arrays.items():
+            if not array.nbytes:
+                # Nothing to write, and memoryview cannot cast empty 2-D views
+                continue
+            f.seek(data_start + directory[name]["offset"])
+            f.write(memoryview(array).cast("B"))
+        f.truncate(data_start + offset)
+    os.replace(temp_path, path)
+
+
+def read(path: str):
+    """Returns ``(meta, arrays)`` from a file made by ``write``.
+
+    Arrays are read-only memory maps onto the file, so nothing is read from
+    disk until it is used.
+    """
+    with open(path, "rb") as f:
+        preamble = f.read(PREAMBLE.size)
+        if len(preamble) < PREAMBLE.size:
+            raise ValueError(f"{path} is not a save file")
+        magic, version, header_length = PREAMBLE.unpack(preamble)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a save file")
+        if version > VERSION:
+            raise ValueError(
+                f"{path} uses save format {version}; this version reads up to {VERSION}"
+            )
+        meta = json.loads(f.read(header_length))
+
+    data_start = _align(PREAMBLE.size + header_length)
+    arrays = {}
+    for name, info in meta.pop("arrays").items():
+        shape = tuple(info["shape"])
+        dtype = np.dtype(info["dtype"])
+        if not np.prod(shape, dtype=np.int64):
+            arrays[name] = np.zeros(shape, dtype)
+            continue
+        arrays[name] = np.memmap(
+            path, dtype, mode="r", offset=data_start + info["offset"], shape=shape
+        )
+    return meta, arrays
@@ -0,0 +1,137 @@
+import time
+
+import settings
+
+MULTIPLIERS = (1, 2, 4, 8, 16, 32, 64, 128)
+# Frames of backlog a slow frame may catch up on before the rest is dropped
+CATCH_UP_FRAMES = 3
+# Seconds between frames drawn while render skip is on
+RENDER_SKIP_INTERVAL = 0.5
+# Weight of the newest sample in the tick/render time averages
+SMOOTHING = 0.1
+
+
+class TickScheduler:
+    """Decides how many fixed-size simulation ticks to run each frame.
+
+    Ticks always advance the colony by the same amount; going faster means
+    running more of them, never taking bigger steps. At ``multiplier`` K the
+    simulation runs ``K * tick_rate`` ticks per second of wall time, however
+    fast frames are drawn. With ``auto`` on, K becomes the largest value whose
+    ticks plus the measured render time still fit in one frame. With
+    ``render_skip`` on, every frame spends its whole budget ticking and only
+    one frame every ``RENDER_SKIP_INTERVAL`` seconds is drawn.
+    """
+
+    def __init__(
+        self,
+        tick_rate: int = settings.TICK_RATE,
+        frame_budget: float = 1 / settings.FPS,
+    ):
+        self.tick_rate = tick_rate
+        self.frame_budget = frame_budget
+        self.multiplier = 1
+        self.auto = False
+        self.render_skip = False
+        self.accumulator = 0.0
+        self.tick_time = 0.0
+        self.render_time = 0.0
+        self.ticks_per_second = 0.0
+        self._sim_end = None
+        self._last_render = 0.0
+        self._rate_start = time.perf_counter()
+        self._rate_ticks = 0
+
+    def faster(self):
+        self.auto = False
+        self.multiplier = next(
+            (m for m in MULTIPLIERS if m > self.multiplier), MULTIPLIERS[-1]
+        )
+
+    def slower(self):
+        self.auto = False
+        self.multiplier = next(
+            (m for m in reversed(MULTIPLIERS) if m < self.multiplier), MULTIPLIERS[0]
+        )
+
+    def toggle_auto(self):
+        self.auto = not self.auto
+
+    def toggle_render_skip(self):
+        self.render_skip = not self.render_skip
+        self.accumulator = 0.0
+
+    def ticks_for(self, dt: float) -> int:
+        """Whole ticks owed for ``dt`` seconds of wall time."""
+        self.accumulator += dt * self.tick_rate * self.multiplier
+        ticks = int(self.accumulator)
+        limit = self.multiplier * CATCH_UP_FRAMES
+        if ticks > limit:
+            ticks = limit
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= ticks
+        return ticks
+
+    def advance(self, simulation, dt: float) -> int:
+        """Steps ``simulation`` for this frame; returns the ticks run."""
+        start = time.perf_counter()
+        if self.render_skip:
+            ticks = 0
+            deadline = start + self.frame_budget
+            while True:
+                simulation.step()
+                ticks += 1
+                if time.perf_counter() >= deadline:
+                    break
+        else:
+            ticks = self.ticks_for(dt)
+            simulation.step(ticks)
+
+        self._sim_end = time.perf_counter()
+        if ticks:
+            per_tick = (self._sim_end - start) / ticks
+            self.tick_time += SMOOTHING * (per_tick - self.tick_time)
+        self._count(ticks)
+        return ticks
+
+    def _count(self, ticks: int):
+        self._rate_ticks += ticks
+        elapsed = time.perf_counter() - self._rate_start
+        if elapsed >= 1:
+            self.ticks_per_second = self._rate_ticks / elapsed
+            self._rate_start += elapsed
+            self._rate_ticks = 0
+
+    def should_render(self) -> bool:
+        if not self.render_skip:
+            return True
+        now = time.perf_counter()
+        if now - self._last_render >= RENDER_SKIP_INTERVAL:
+            self._last_render = now
+            return True
+        return False
+
+    def end_frame(self, drawn: bool = True):
+        """Call at the end of every frame, saying whether it was drawn;
+        re-picks K when ``auto`` is on."""
+        if drawn and self._sim_end is not None:
+            render = time.perf_counter() - self._sim_end
+            self.render_time += SMOOTHING * (render - self.render_time)
+        self._sim_end = None
+
+        if self.auto and self.tick_time > 0:
+            room = self.frame_budget - self.render_time
+            # K runs K * tick_rate ticks a second, so this many per frame
+            ticks_per_k = self.tick_rate * self.frame_budget
+            fit = room / self.tick_time / ticks_per_k
+            self.multiplier = max(
+                (m for m in MULTIPLIERS if m <= fit), default=MULTIPLIERS[0]
+            )
+
+    def describe(self) -> str:
+        if self.render_skip:
+            mode = "max"
+        else:
+            mode = f"x{self.multiplier}" + (" auto" if self.auto else "")
+        return f"Sim: {mode} ({self.ticks_per_second:.0f} ticks/s)"
@@ -0,0 +1,90 @@
+import mmap
+import weakref
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Mappings made by ``releasable``; only these may have pages dropped
+_releasable = weakref.WeakSet()
+
+
+class SharedArray:
+    """NumPy array backed by a named ``multiprocessing.shared_memory`` block.
+
+    Created without ``name`` it allocates a new block; with ``name`` it
+    attaches to one made by another process.
+    """
+
+    def __init__(self, shape, dtype, name: str = None):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        size = max(1, int(np.prod(self.shape)) * self.dtype.itemsize)
+        if name is None:
+            self.memory = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+        self.array = np.ndarray(self.shape, dtype=self.dtype, buffer=self.memory.buf)
+
+    @property
+    def spec(self):
+        return self.memory.name, self.shape, self.dtype.str
+
+    def close(self, unlink: bool = False):
+        self.array = None
+        self.memory.close()
+        if unlink:
+            self.memory.unlink()
+
+
+def releasable(shape, dtype) -> np.ndarray:
+    """Zeroed array in its own private memory mapping.
+
+    Pages are only committed once written, and ``release`` can hand them back
+    to the OS. Falls back to ``np.zeros`` where anonymous mappings are not
+    available.
+    """
+    dtype = np.dtype(dtype)
+    count = int(np.prod(shape))
+    if not hasattr(mmap, "MAP_ANONYMOUS"):
+        return np.zeros(shape, dtype)
+    buffer = mmap.mmap(
+        -1,
+        max(1, count * dtype.itemsize),
+        flags=mmap.MAP_PRIVATE | mmap.MAP_ANONYMOUS,
+    )
+    _releasable.add(buffer)
+    return np.frombuffer(buffer, dtype, count).reshape(shape)
+
+
+def _mapping(array: np.ndarray):
+    base = array
+    while isinstance(base, np.ndarray):
+        base = base.base
+    if isinstance(base, memoryview):
+        base = base.obj
+    return base if base in _releasable else None
+
+
+def release(region: np.ndarray):
+    """Zeroes ``region``, returning whole pages of it to the OS if it lies in
+    a ``releasable`` array; they read back as zeros when next touched."""
+    buffer = _mapping(region)
+    if (
+        buffer is None
+        or not region.flags.c_contiguous
+        or not hasattr(buffer, "madvise")
+    ):
+        region[...] = 0
+        return
+
+    memory = np.frombuffer(buffer, np.uint8)
+    start = region.ctypes.data - memory.ctypes.data
+    end = start + region.nbytes
+    first = -(-start // mmap.PAGESIZE) * mmap.PAGESIZE
+    last = end // mmap.PAGESIZE * mmap.PAGESIZE
+    if last <= first:
+        memory[start:end] = 0
+        return
+    memory[start:first] = 0
+    memory[last:end] = 0
+    buffer.madvise(mmap.MADV_DONTNEED, first, last - first)
@@ -0,0 +1,416 @@
+import random
+
+import numpy as np
+
+import settings
+from core import (
+    chunks,
+    logging,
+    map,
+    perlin,
+    profiling,
+    replay,
+    savefile,
+    spatial_hash,
+)
+from entities import (
+    enemy_soldier,
+    parallel_swarm,
+    queen,
+    soldier,
+    worker,
+    worker_swarm,
+)
+
+
+ENGINES = ("objects", "vector", "parallel")
+
+WORKER_FIELDS = ("x", "y", "angle", "speed", "has_food", "assignment")
+COLONY_FIELDS = ("x", "y", "angle", "speed", "has_food")
+ENEMY_FIELDS = ("x", "y", "angle", "speed")
+FIELD_TYPES = {"has_food": bool, "assignment": np.int8}
+
+
+def _columns(entities, fields) -> dict:
+    return {
+        field: np.fromiter(
+            (getattr(entity, field) for entity in entities),
+            FIELD_TYPES.get(field, float),
+            len(entities),
+        )
+        for field in fields
+    }
+
+
+def _entities(cls, columns: dict, extra_args) -> list:
+    """Rebuilds entity objects from saved ``columns``.
+
+    ``extra_args(row)`` gives the constructor arguments after the position and
+    nest.
+    """
+    entities = []
+    for row in (dict(zip(columns, values)) for values in zip(*columns.values())):
+        row = {field: value.item() for field, value in row.items()}
+        entity = cls(
+            row["x"],
+            row["y"],
+            settings.nest_location,
+            *extra_args(row),
+        )
+        for field, value in row.items():
+            setattr(entity, field, value)
+        entities.append(entity)
+    return entities
+
+
+class Simulation:
+    """Owns the colony state and advances it one tick at a time.
+
+    The state itself still lives in the ``settings``/``map``/``perlin`` module
+    globals that the entities and tools read, so the properties below are views
+    onto those rather than copies. Nothing in here touches pygame's display, so
+    it can be driven from ``main.py`` or from the headless runner alike.
+
+    ``engine`` picks how workers are stored: ``"objects"`` keeps one
+    ``worker.Ant`` per worker in ``settings.ants``, ``"vector"`` keeps them all
+    in a single ``worker_swarm.WorkerSwarm`` at ``settings.worker_swarm``, and
+    ``"parallel"`` splits that swarm across processes with
+    ``parallel_swarm.ParallelSwarm``.
+
+    ``profiler`` is lapped after each update phase of a tick; see
+    ``profiling.FrameProfiler``. While recording, every tick is appended to a
+    ``replay.Recorder``.
+    """
+
+    def __init__(
+        self,
+        queen_enabled: bool = True,
+        engine: str = None,
+        profiler=None,
+    ):
+        self.queen_enabled = queen_enabled
+        self.profiler = profiler or profiling.NULL_PROFILER
+        self.engine = engine or settings.WORKER_ENGINE
+        if self.engine not in ENGINES:
+            raise ValueError(f"Invalid worker engine: {self.engine}")
+        self.tick = 0
+        self.recorder = None
+        # Generates the chunks around the nest
+        chunks.store.refresh()
+
+    @property
+    def terrain(self):
+        return perlin.perlin_settings.map_data
+
+    @property
+    def dirt(self):
+        return map.data
+
+    @property
+    def pheromones(self):
+        return settings.pheromones
+
+    @property
+    def food_locations(self):
+        return settings.food_locations
+
+    @property
+    def ants(self):
+        return settings.ants
+
+    @property
+    def worker_swarm(self):
+        return settings.worker_swarm
+
+    @property
+    def worker_count(self):
+        if settings.worker_swarm is not None:
+            return len(settings.worker_swarm)
+        return len(settings.ants)
+
+    @property
+    def soldiers(self):
+        return settings.soldiers
+
+    @property
+    def queen(self):
+        return settings.queen
+
+    @property
+    def enemies(self):
+        return settings.enemies
+
+    def generate(self, seed: int, threshold: float):
+        settings.food_locations.clear()
+        if perlin.regenerate(seed, threshold):
+            chunks.store.reset()
+
+    def regenerate(self, seed: int, threshold: float):
+        """Regenerates the terrain only, keeping food and entities."""
+        if perlin.regenerate(seed, threshold):
+            chunks.store.reset()
+
+    def set_view(self, x0: int, x1: int):
+        """Keeps map columns ``[x0, x1)`` loaded for drawing."""
+        chunks.store.set_view(x0, x1)
+
+    def use_tool(self, tool, pos, *controls):
+        """Applies a ``tools`` module at screen position ``pos``.
+
+        ``controls`` are the UI widgets the tool's ``draw`` takes after ``pos``.
+        """
+        tool.draw(pos, *controls)
+
+    @property
+    def recording(self) -> bool:
+        return self.recorder is not None
+
+    def start_recording(self, path: str, keyframe_interval: int = None):
+        self.stop_recording()
+        self.recorder = replay.Recorder(path, self.tick, keyframe_interval)
+
+    def stop_recording(self):
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+    def close(self):
+        self.stop_recording()
+        if isinstance(settings.worker_swarm, parallel_swarm.ParallelSwarm):
+            settings.worker_swarm.close()
+
+    def _new_swarm(self):
+        """A fresh swarm for this engine, or ``None`` for ``"objects"``."""
+        self.close()
+        if self.engine == "vector":
+            return worker_swarm.WorkerSwarm(settings.nest_location)
+        if self.engine == "parallel":
+            return parallel_swarm.ParallelSwarm(settings.nest_location)
+        return None
+
+    def populate(self, workers: int, soldiers: int, queens: int, speed: float):
+        nest_x, nest_y = settings.nest_location
+        settings.worker_swarm = self._new_swarm()
+        if settings.worker_swarm is not None:
+            settings.ants = []
+            settings.worker_swarm.spawn(workers, nest_x, nest_y, speed)
+        else:
+            settings.ants = [
+                worker.Ant(
+                    nest_x,
+                    nest_y,
+                    settings.nest_location,
+                    speed,
+                    random.choices([0, 1, 2], weights=[4, 2, 1])[0],
+                )
+                for _ in range(workers)
+            ]
+        settings.soldiers = [
+            soldier.Soldier(nest_x, nest_y, settings.nest_location, speed)
+            for _ in range(soldiers)
+        ]
+        settings.queen = [
+            queen.Queen(nest_x, nest_y, settings.nest_location, speed)
+            for _ in range(queens)
+        ]
+        settings.total_food = len(settings.food_locations)
+        settings.collected_food = 0
+        self.tick = 0
+
+    # Saving
+
+    def save(self, path: str):
+        meta, arrays = self.state()
+        savefile.write(path, meta, arrays)
+        logging.info("Saved tick %s to %s", self.tick, path)
+
+    def load(self, path: str):
+        meta, arrays = savefile.read(path)
+        self.restore(meta, arrays)
+        logging.info("Loaded tick %s from %s", self.tick, path)
+
+    def state(self):
+        """The whole colony as ``(meta, arrays)`` for ``savefile.write``."""
+        terrain = perlin.perlin_settings
+        swarm = settings.worker_swarm
+        meta = {
+            "map": [settings.MAP_WIDTH, settings.MAP_HEIGHT],
+            "engine": self.engine,
+            "tick": self.tick,
+            "queen_enabled": self.queen_enabled,
+            "collected_food": settings.collected_food,
+            "total_food": settings.total_food,
+            "nest_location": list(settings.nest_location),
+            "terrain": {
+                "seed": terrain.seed,
+                "threshold": terrain.threshold,
+                "scale": terrain.scale,
+                "octaves": terrain.octaves,
+            },
+            "random_state": random.getstate(),
+            "swarm_rng": swarm.rng.bit_generator.state if swarm is not None else None,
+        }
+        arrays = chunks.store.world_arrays()
+        arrays["chunks"] = chunks.store.state
+        if swarm is not None:
+            workers = {field: getattr(swarm, field) for field in WORKER_FIELDS}
+        else:
+            workers = _columns(settings.ants, WORKER_FIELDS)
+        groups = (
+            ("workers", workers),
+            ("soldiers", _columns(settings.soldiers, COLONY_FIELDS)),
+            ("queens", _columns(settings.queen, COLONY_FIELDS)),
+            ("enemies", _columns(settings.enemies, ENEMY_FIELDS)),
+        )
+        for group, columns in groups:
+            for field, values in columns.items():
+                arrays[f"{group}.{field}"] = values
+        return meta, arrays
+
+    def restore(self, meta: dict, arrays: dict):
+        """Replaces the colony with one from ``state``/``savefile.read``."""
+        if tuple(meta["map"]) != (settings.MAP_WIDTH, settings.MAP_HEIGHT):
+            width, height = meta["map"]
+            raise ValueError(
+                f"Save is for a {width}x{height} map, this one is "
+                f"{settings.MAP_WIDTH}x{settings.MAP_HEIGHT}"
+            )
+
+        terrain = perlin.perlin_settings
+        for key, value in meta["terrain"].items():
+            setattr(terrain, key, value)
+        np.copyto(terrain.map_data, arrays["terrain"])
+        np.copyto(map.data, arrays["dirt"])
+        np.copyto(settings.pheromones.data, arrays["pheromones"])
+        np.copyto(settings.pheromones.active, arrays["pheromone_tiles"])
+        settings.food_locations.clear()
+        settings.food_locations.update(zip(*np.nonzero(arrays["food"])))
+
+        self.tick = meta["tick"]
+        self.queen_enabled = meta["queen_enabled"]
+        settings.collected_food = meta["collected_food"]
+        settings.total_food = meta["total_food"]
+        settings.nest_location = tuple(meta["nest_location"])
+
+        def columns(group, fields):
+            return {field: np.array(arrays[f"{group}.{field}"]) for field in fields}
+
+        workers = columns("workers", WORKER_FIELDS)
+        settings.worker_swarm = self._new_swarm()
+        if settings.worker_swarm is not None:
+            settings.ants = []
+            for field, values in workers.items():
+                setattr(settings.worker_swarm, field, values)
+            if meta["swarm_rng"] is not None:
+                settings.worker_swarm.rng.bit_generator.state = meta["swarm_rng"]
+        else:
+            settings.ants = _entities(
+                worker.Ant, workers, lambda w: (w["speed"], w["assignment"])
+            )
+        settings.soldiers = _entities(
+            soldier.Soldier, columns("soldiers", COLONY_FIELDS), lambda s: (s["speed"],)
+        )
+        settings.queen = _entities(
+            queen.Queen, columns("queens", COLONY_FIELDS), lambda q: (q["speed"],)
+        )
+        settings.enemies = _entities(
+            enemy_soldier.EnemySoldier,
+            columns("enemies", ENEMY_FIELDS),
+            lambda e: (e["speed"],),
+        )
+
+        chunks.store.restore(arrays.get("chunks"))
+
+        # Rebuilding the entities drew from the RNG; put it back last
+        version, internal, gauss = meta["random_state"]
+        random.setstate((version, tuple(internal), gauss))
+        map.changed()
+
+    def scatter_food(self, count: int):
+        """Drops up to ``count`` food cells on open stone-free floor in the
+        loaded part of the world."""
+        terrain = perlin.perlin_settings.map_data
+        columns = np.flatnonzero(chunks.store.resident_columns)
+        if not len(columns):
+            return
+        placed = 0
+        for _ in range(count * 10):
+            if placed >= count:
+                break
+            x = int(columns[random.randrange(len(columns))])
+            y = random.randrange(1, settings.MAP_HEIGHT)
+            if not terrain[x, y] and settings.food_locations.insert((x, y)):
+                placed += 1
+        settings.total_food += placed
+        logging.info("Scattered %s food cells", placed)
+
+    def seal_surface(self):
+        # The top row is solid except for the tunnel under the nest
+        x = np.arange(settings.MAP_WIDTH)
+        tunnel = (x >= settings.MAP_WIDTH // 2 - 4) & (x <= settings.MAP_WIDTH // 2 + 4)
+        top = perlin.perlin_settings.map_data[:, 0]
+        loaded = chunks.store.resident_columns
+        opened = np.flatnonzero(~tunnel & loaded & (top != 1))
+        if len(opened):
+            top[opened] = 1
+            map.changed(opened, np.zeros_like(opened))
+
+    def step(self, n: int = 1):
+        profiler = self.profiler
+        for _ in range(n):
+            chunks.store.update()
+            profiler.lap("chunks")
+            self._update_workers()
+            profiler.lap("workers")
+            if self.queen_enabled:
+                self._update_colony()
+                profiler.lap("colony")
+            self._update_enemies()
+            profiler.lap("enemies")
+
+            settings.pheromones.decay()
+            self.seal_surface()
+            profiler.lap("pheromone_decay")
+            self.tick += 1
+            if self.recorder is not None:
+                self.recorder.record(self.tick)
+                profiler.lap("recording")
+
+    def _update_workers(self):
+        index = spatial_hash.index
+        if settings.worker_swarm is not None:
+            settings.collected_food += settings.worker_swarm.step(
+                settings.food_locations
+            )
+            index.swarm_moved()
+
+        for ant in settings.ants:
+            x, y = ant.x, ant.y
+            if ant.has_food:
+                if ant.return_to_nest():
+                    settings.collected_food += 1
+            else:
+                ant.move()
+                if ant.find_food(settings.food_locations):
+                    ant.leave_pheromone()
+            index.move(spatial_hash.ANT, ant, x, y)
+
+    def _update_colony(self):
+        index = spatial_hash.index
+        for ant in settings.soldiers:
+            x, y = ant.x, ant.y
+            ant.move()
+            index.move(spatial_hash.SOLDIER, ant, x, y)
+            ant.find_ant()
+        for ant in settings.queen:
+            x, y = ant.x, ant.y
+            ant.move()
+            index.move(spatial_hash.QUEEN, ant, x, y)
+
+    def _update_enemies(self):
+        index = spatial_hash.index
+        for enemy in settings.enemies:
+            x, y = enemy.x, enemy.y
+            enemy.move()
+            index.move(spatial_hash.ENEMY, enemy, x, y)
+            enemy.find_ant()
@@ -0,0 +1,388 @@
+import atexit
+import multiprocessing
+import os
+import queue
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+import settings
+from core import logging, map, mirror, perlin, scheduler, shared
+from core import simulation as sim
+
+# Entities a snapshot can carry; more are left out of the picture
+MAX_ENTITIES = 250_000
+# Seconds between snapshots
+PUBLISH_INTERVAL = 1 / 60
+
+HEADER_FIELDS = (
+    "tick",
+    "collected_food",
+    "total_food",
+    "ticks_per_second",
+    "multiplier",
+    "seed",
+    "threshold",
+    "entities",
+    "ant_slider",
+)
+# Whole-map grids, copied a column at a time as they change
+GRIDS = ("terrain", "dirt", "food")
+
+
+def _snapshot_layout():
+    grid = (settings.MAP_WIDTH, settings.MAP_HEIGHT)
+    return {
+        "header": ((len(HEADER_FIELDS),), np.float64),
+        "terrain": (grid, np.int8),
+        "dirt": (grid, np.int8),
+        "pheromone": (grid, np.float32),
+        "food": (grid, np.bool_),
+        # Publish sequence each map column's grids last changed at
+        "changed_at": ((settings.MAP_WIDTH,), np.int64),
+        "x": ((MAX_ENTITIES,), np.float32),
+        "y": ((MAX_ENTITIES,), np.float32),
+        "kind": ((MAX_ENTITIES,), np.uint8),
+    }
+
+
+class RemoteScheduler(scheduler.TickScheduler):
+    """UI-side stand-in for the simulation process's ``TickScheduler``.
+
+    Speed controls are forwarded to the simulation process; ``advance`` runs
+    nothing here, since ``main.py`` picks up snapshots every frame with
+    ``SimulationProcess.sync``, and frames are always drawn.
+    """
+
+    def __init__(self, process):
+        super().__init__()
+        self.process = process
+
+    def faster(self):
+        super().faster()
+        self.process.send("scheduler", "faster")
+
+    def slower(self):
+        super().slower()
+        self.process.send("scheduler", "slower")
+
+    def toggle_auto(self):
+        super().toggle_auto()
+        self.process.send("scheduler", "toggle_auto")
+
+    def toggle_render_skip(self):
+        super().toggle_render_skip()
+        self.process.send("scheduler", "toggle_render_skip")
+
+    def advance(self, simulation, dt: float) -> int:
+        return 0
+
+    def should_render(self) -> bool:
+        return True
+
+    def end_frame(self, drawn: bool = True):
+        pass
+
+
+class SimulationProcess:
+    """Runs the colony in a child process and mirrors it into this one.
+
+    The child owns the real ``Simulation`` and ticks it as its
+    ``TickScheduler`` allows, publishing a snapshot of terrain, pheromones,
+    food and entity positions at most every ``PUBLISH_INTERVAL`` seconds.
+    Snapshots are double buffered in shared memory: the child fills the back
+    buffer, then swaps under a lock; ``sync`` copies the front buffer under the
+    same lock, so it never sees a half-written one. Terrain, dirt and food only
+    move the map columns that changed: the child stamps each column with the
+    sequence number of the snapshot it last changed in, so a buffer or the UI
+    copy only takes columns stamped after the snapshot it last held. Edits
+    travel the other way as commands on a queue.
+
+    Offers the ``Simulation`` methods ``main.py`` uses, so the game loop drives
+    either one. Forks like ``ParallelSwarm``, so it needs the ``fork`` start
+    method.
+    """
+
+    def __init__(self, engine: str = None):
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise ValueError("A simulation process needs the 'fork' start method")
+
+        context = multiprocessing.get_context("fork")
+        layout = _snapshot_layout()
+        self.buffers = [
+            {
+                key: shared.SharedArray(shape, dtype)
+                for key, (shape, dtype) in layout.items()
+            }
+            for _ in range(2)
+        ]
+        self.local = {
+            key: np.zeros(shape, dtype) for key, (shape, dtype) in layout.items()
+        }
+        self.front = context.Value("i", 0, lock=False)
+        self.sequence = context.Value("q", 0, lock=False)
+        self.lock = context.Lock()
+        self.commands = context.Queue()
+        self.scheduler = RemoteScheduler(self)
+        self._queen_enabled = True
+        self._recording = False
+        self._view = None
+        self._seen = 0
+        self._ant_slider = settings.ant_slider.value
+        self._closed = False
+
+        self.process = context.Process(
+            target=_run, args=(self, engine), name="simulation", daemon=True
+        )
+        self.process.start()
+        atexit.register(self.close)
+        logging.info("Simulation process started (pid %s)", self.process.pid)
+
+    # Commands
+
+    def send(self, command: str, *args):
+        if not self._closed:
+            self.commands.put((command, *args))
+
+    @property
+    def queen_enabled(self) -> bool:
+        return self._queen_enabled
+
+    @queen_enabled.setter
+    def queen_enabled(self, enabled: bool):
+        if enabled != self._queen_enabled:
+            self._queen_enabled = enabled
+            self.send("queen_enabled", enabled)
+
+    def populate(self, workers: int, soldiers: int, queens: int, speed: float):
+        self.send("populate", workers, soldiers, queens, speed)
+
+    def generate(self, seed: int, threshold: float):
+        self.send("generate", seed, threshold)
+
+    def regenerate(self, seed: int, threshold: float):
+        self.send("regenerate", seed, threshold)
+
+    def use_tool(self, tool, pos, threshold_slider, seed_button, speed_slider, *_):
+        self.send(
+            "tool",
+            tool.__name__,
+            pos,
+            (settings.camera_x, settings.camera_y),
+            speed_slider.value,
+        )
+
+    def set_view(self, x0: int, x1: int):
+        if (x0, x1) != self._view:
+            self._view = (x0, x1)
+            self.send("view", x0, x1)
+
+    def save(self, path: str):
+        self.send("save", path)
+
+    def load(self, path: str):
+        # Errors surface in the simulation process's log
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        self.send("load", path)
+
+    def start_recording(self, path: str):
+        self._recording = True
+        self.send("start_recording", path)
+
+    def stop_recording(self):
+        self._recording = False
+        self.send("stop_recording")
+
+    @property
+    def recording(self) -> bool:
+        return self._recording
+
+    # Snapshots
+
+    def sync(self) -> bool:
+        """Copies the newest snapshot into this process's world, if any."""
+        local = self.local
+        with self.lock:
+            if self.sequence.value == self._seen:
+                return False
+            front = self.buffers[self.front.value]
+            front = {key: block.array for key, block in front.items()}
+            columns = np.flatnonzero(front["changed_at"] > self._seen)
+            self._seen = self.sequence.value
+            np.copyto(local["header"], front["header"])
+            count = int(local["header"][HEADER_FIELDS.index("entities")])
+            for key in GRIDS:
+                local[key][columns] = front[key][columns]
+            np.copyto(local["pheromone"], front["pheromone"])
+            for key in ("x", "y", "kind"):
+                local[key][:count] = front[key][:count]
+        self._apply(local, columns)
+        return True
+
+    def _apply(self, snapshot, columns):
+        header = dict(zip(HEADER_FIELDS, snapshot["header"]))
+        settings.collected_food = int(header["collected_food"])
+        settings.total_food = int(header["total_food"])
+        perlin.perlin_settings.seed = int(header["seed"])
+        perlin.perlin_settings.threshold = header["threshold"]
+        self.scheduler.ticks_per_second = header["ticks_per_second"]
+        self.scheduler.multiplier = int(header["multiplier"])
+        # Workers placed with the ant tool bump the slider, as they do in
+        # process
+        settings.ant_slider.value += header["ant_slider"] - self._ant_slider
+        self._ant_slider = header["ant_slider"]
+
+        if len(columns):
+            mirror.show_grids(
+                snapshot["terrain"], snapshot["dirt"], snapshot["food"], columns
+            )
+        np.copyto(settings.pheromones.food, snapshot["pheromone"])
+
+        count = int(header["entities"])
+        mirror.show_entities(*(snapshot[key][:count] for key in ("x", "y", "kind")))
+
+    def _watch(self):
+        """Child side: starts tracking which map columns change."""
+        self._dirty = np.ones(settings.MAP_WIDTH, dtype=bool)
+        self._changed_at = np.zeros(settings.MAP_WIDTH, dtype=np.int64)
+        self._written = [0, 0]
+        map.subscribe(self._mark)
+        settings.food_locations.subscribe(self._mark)
+
+    def _mark(self, xs, ys):
+        if xs is None:
+            self._dirty[:] = True
+        else:
+            self._dirty[xs] = True
+
+    def publish(self, simulation: sim.Simulation, tick_scheduler):
+        """Child side: writes the current world to the back buffer and swaps."""
+        back = 1 - self.front.value
+        sequence = self.sequence.value + 1
+        self._changed_at[self._dirty] = sequence
+        self._dirty[:] = False
+
+        buffer = {key: block.array for key, block in self.buffers[back].items()}
+        columns = np.flatnonzero(self._changed_at > self._written[back])
+        grids = {
+            "terrain": perlin.perlin_settings.map_data,
+            "dirt": map.data,
+            "food": settings.food_locations.grid,
+        }
+        for key, grid in grids.items():
+            buffer[key][columns] = grid[columns]
+        buffer["changed_at"][:] = self._changed_at
+        buffer["pheromone"][:] = settings.pheromones.food
+
+        count = 0
+        for x, y, kind in mirror.entities():
+            added = min(len(x), MAX_ENTITIES - count)
+            buffer["x"][count : count + added] = x[:added]
+            buffer["y"][count : count + added] = y[:added]
+            buffer["kind"][count : count + added] = kind[:added]
+            count += added
+
+        buffer["header"][:] = (
+            simulation.tick,
+            settings.collected_food,
+            settings.total_food,
+            tick_scheduler.ticks_per_second,
+            tick_scheduler.multiplier,
+            perlin.perlin_settings.seed,
+            perlin.perlin_settings.threshold,
+            count,
+            settings.ant_slider.value,
+        )
+        self._written[back] = sequence
+        with self.lock:
+            self.front.value = back
+            self.sequence.value = sequence
+
+    def close(self):
+        if self._closed:
+            return
+        self.send("quit")
+        self._closed = True
+        self.process.join(timeout=2)
+        if self.process.is_alive():
+            self.process.terminate()
+        for buffer in self.buffers:
+            for block in buffer.values():
+                block.close(unlink=True)
+        atexit.unregister(self.close)
+
+
+def _handle(command, args, simulation, tick_scheduler):
+    if command == "populate":
+        settings.ui_visible = False
+        simulation.populate(*args)
+    elif command == "generate":
+        simulation.generate(*args)
+    elif command == "regenerate":
+        simulation.regenerate(*args)
+    elif command == "queen_enabled":
+        simulation.queen_enabled = args[0]
+    elif command == "view":
+        simulation.set_view(*args)
+    elif command == "scheduler":
+        getattr(tick_scheduler, args[0])()
+    elif command == "save":
+        try:
+            simulation.save(*args)
+        except OSError as e:
+            logging.error("Could not save to %s: %s", args[0], e)
+    elif command == "load":
+        try:
+            simulation.load(*args)
+        except (OSError, ValueError) as e:
+            logging.error("Could not load %s: %s", args[0], e)
+        else:
+            settings.ui_visible = False
+    elif command == "start_recording":
+        try:
+            simulation.start_recording(*args)
+        except OSError as e:
+            logging.error("Could not record to %s: %s", args[0], e)
+    elif command == "stop_recording":
+        simulation.stop_recording()
+    elif command == "tool":
+        name, pos, camera, speed = args
+        settings.camera_x, settings.camera_y = camera
+        speed_slider = SimpleNamespace(value=speed)
+        simulation.use_tool(sys.modules[name], pos, None, None, speed_slider, None)
+
+
+def _run(process: SimulationProcess, engine: str):
+    simulation = sim.Simulation(engine=engine)
+    tick_scheduler = scheduler.TickScheduler()
+    process._watch()
+    last = last_publish = time.perf_counter()
+    try:
+        while True:
+            while True:
+                try:
+                    command, *args = process.commands.get_nowait()
+                except queue.Empty:
+                    break
+                if command == "quit":
+                    return
+                _handle(command, args, simulation, tick_scheduler)
+
+            now = time.perf_counter()
+            dt, last = now - last, now
+            ticks = 0
+            if not settings.ui_visible:
+                ticks = tick_scheduler.advance(simulation, dt)
+
+            if now - last_publish >= PUBLISH_INTERVAL:
+                process.publish(simulation, tick_scheduler)
+                last_publish = now
+                tick_scheduler.end_frame()
+            elif not ticks:
+                time.sleep(0.001)
+    finally:
+        simulation.close()
+        logging.flush()
@@ -0,0 +1,276 @@
+import bisect
+import math
+
+import numpy as np
+
+import settings
+
+ANT = 0
+SOLDIER = 1
+QUEEN = 2
+ENEMY = 3
+# Workers of ``settings.worker_swarm``, handed out as ``SwarmWorker``s
+SWARM = 4
+OBJECTS = (ANT, SOLDIER, QUEEN, ENEMY)
+PREY = (ANT, SOLDIER, QUEEN, SWARM)
+ALL = OBJECTS + (SWARM,)
+
+# Map cells per side of a hash cell; about an enemy's vision range, so a
+# vision query looks at no more than 3x3 cells
+CELL_SIZE = 10
+
+
+class SwarmWorker:
+    """One worker of ``settings.worker_swarm``, as queries hand it out.
+
+    It stays valid until the next query, even if other swarm workers are
+    removed through the hash in between.
+    """
+
+    __slots__ = ("_hash", "_row")
+
+    def __init__(self, spatial_hash, row: int):
+        self._hash = spatial_hash
+        self._row = row
+
+    @property
+    def index(self) -> int:
+        """Where this worker is in the swarm's arrays now."""
+        return self._hash._swarm_index(self._row)
+
+    @property
+    def x(self) -> float:
+        return float(settings.worker_swarm.x[self.index])
+
+    @property
+    def y(self) -> float:
+        return float(settings.worker_swarm.y[self.index])
+
+
+class SpatialHash:
+    """Every entity bucketed by kind into a uniform grid of square cells.
+
+    The hash is built from the ``settings`` entity lists the first time it is
+    queried after ``invalidate``, and again whenever one of those lists has
+    been replaced or changed length, so entities added by tools, saves or
+    replays are always found. Anything that moves an entity reports it through
+    ``move``, which shifts just that entity to its new bucket, so moving
+    entities never costs a full rebuild.
+
+    Swarm workers live in arrays rather than objects, so they are bucketed
+    separately: their positions are sorted by cell, again the first time they
+    are queried after ``swarm_moved``, and looked up with a binary search.
+
+    Queries test exact distances against the current positions, so an entity
+    is found as long as it has not left its cell since it was last bucketed.
+    """
+
+    def __init__(self, cell_size: int = CELL_SIZE):
+        self.cell_size = cell_size
+        self.buckets = {}  # (kind, cell x, cell y) -> entities
+        self.stale = True
+        self._lists = None
+        # Swarm rows sorted by cell, and their cells as sorted keys
+        self._swarm_rows = np.zeros(0, dtype=np.int64)
+        self._swarm_keys = np.zeros(0, dtype=np.int64)
+        self._swarm = None
+        self._swarm_stale = True
+        self._swarm_removed = []
+
+    def _groups(self):
+        return (
+            (ANT, settings.ants),
+            (SOLDIER, settings.soldiers),
+            (QUEEN, settings.queen),
+            (ENEMY, settings.enemies),
+        )
+
+    def _key(self, kind: int, entity) -> tuple:
+        size = self.cell_size
+        return kind, math.floor(entity.x / size), math.floor(entity.y / size)
+
+    def invalidate(self):
+        self.stale = True
+        self._swarm_stale = True
+
+    def swarm_moved(self):
+        """Marks the swarm's buckets out of date after its workers moved."""
+        self._swarm_stale = True
+
+    def rebuild(self):
+        buckets = {}
+        for kind, entities in self._groups():
+            for entity in entities:
+                key = self._key(kind, entity)
+                if key in buckets:
+                    buckets[key].append(entity)
+                else:
+                    buckets[key] = [entity]
+        self.buckets = buckets
+        self.stale = False
+        self._lists = self._snapshot()
+
+    def _snapshot(self) -> list:
+        return [(id(entities), len(entities)) for _, entities in self._groups()]
+
+    def _ensure(self):
+        if self.stale or self._lists != self._snapshot():
+            self.rebuild()
+
+    def move(self, kind: int, entity, old_x: float, old_y: float):
+        """Re-buckets ``entity`` after it moved from (``old_x``, ``old_y``)."""
+        if self.stale:
+            return
+        size = self.cell_size
+        old = (kind, math.floor(old_x / size), math.floor(old_y / size))
+        new = self._key(kind, entity)
+        if old == new:
+            return
+        bucket = self.buckets.get(old)
+        if bucket is None or entity not in bucket:
+            self.stale = True
+            return
+        bucket.remove(entity)
+        if not bucket:
+            del self.buckets[old]
+        if new in self.buckets:
+            self.buckets[new].append(entity)
+        else:
+            self.buckets[new] = [entity]
+
+    def remove(self, kind: int, entity):
+        """Removes ``entity`` from its ``settings`` list or the swarm, and
+        from the hash."""
+        if kind == SWARM:
+            if entity._row in self._swarm_removed:
+                return
+            swarm = settings.worker_swarm
+            dead = np.zeros(len(swarm), dtype=bool)
+            dead[entity.index] = True
+            swarm.remove(dead)
+            bisect.insort(self._swarm_removed, entity._row)
+            self._swarm = self._swarm_snapshot()
+            return
+        dict(self._groups())[kind].remove(entity)
+        bucket = self.buckets.get(self._key(kind, entity))
+        if bucket is not None and entity in bucket:
+            bucket.remove(entity)
+            self._lists = self._snapshot()
+        else:
+            self.stale = True
+
+    @staticmethod
+    def _cell_key(cell_x, cell_y):
+        return cell_x * 2**32 + cell_y
+
+    def _swarm_snapshot(self):
+        swarm = settings.worker_swarm
+        if swarm is None:
+            return None
+        return id(swarm), id(swarm.x), len(swarm)
+
+    def _ensure_swarm(self):
+        snapshot = self._swarm_snapshot()
+        if not self._swarm_stale and self._swarm == snapshot:
+            return
+        swarm = settings.worker_swarm
+        if swarm is None:
+            keys = np.zeros(0, dtype=np.int64)
+        else:
+            keys = self._cell_key(
+                np.floor(swarm.x / self.cell_size).astype(np.int64),
+                np.floor(swarm.y / self.cell_size).astype(np.int64),
+            )
+        self._swarm_rows = np.argsort(keys, kind="stable")
+        self._swarm_keys = keys[self._swarm_rows]
+        self._swarm = snapshot
+        self._swarm_stale = False
+        self._swarm_removed = []
+
+    def _swarm_index(self, row: int) -> int:
+        # Rows are numbered as the swarm was when bucketed; workers removed
+        # since then shift the later ones down
+        return row - bisect.bisect_left(self._swarm_removed, row)
+
+    def _swarm_within(self, x: float, y: float, radius: float):
+        self._ensure_swarm()
+        swarm = settings.worker_swarm
+        if swarm is None or not len(self._swarm_keys):
+            return
+        size = self.cell_size
+        cells_x = np.arange(
+            math.floor((x - radius) / size), math.floor((x + radius) / size) + 1
+        )
+        cells_y = np.arange(
+            math.floor((y - radius) / size), math.floor((y + radius) / size) + 1
+        )
+        keys = self._cell_key(cells_x[:, None], cells_y[None, :]).ravel()
+        first = np.searchsorted(self._swarm_keys, keys, side="left")
+        end = np.searchsorted(self._swarm_keys, keys, side="right")
+        rows = np.concatenate(
+            [self._swarm_rows[a:b] for a, b in zip(first, end) if b > a]
+            or [np.zeros(0, dtype=np.int64)]
+        )
+        if self._swarm_removed:
+            removed = np.array(self._swarm_removed)
+            rows = rows[~np.isin(rows, removed)]
+            current = rows - np.searchsorted(removed, rows)
+        else:
+            current = rows
+        distance = np.hypot(swarm.x[current] - x, swarm.y[current] - y)
+        close = distance <= radius
+        for row, d in zip(rows[close].tolist(), distance[close].tolist()):
+            yield d, SWARM, SwarmWorker(self, row)
+
+    def within(self, x: float, y: float, radius: float, kinds=ALL):
+        """Yields ``(distance, kind, entity)`` for every entity of ``kinds`` at
+        most ``radius`` cells from (``x``, ``y``)."""
+        if SWARM in kinds:
+            yield from self._swarm_within(x, y, radius)
+            kinds = [kind for kind in kinds if kind != SWARM]
+        self._ensure()
+        size = self.cell_size
+        x0, x1 = math.floor((x - radius) / size), math.floor((x + radius) / size)
+        y0, y1 = math.floor((y - radius) / size), math.floor((y + radius) / size)
+        buckets = self.buckets
+        for kind in kinds:
+            for cx in range(x0, x1 + 1):
+                for cy in range(y0, y1 + 1):
+                    bucket = buckets.get((kind, cx, cy))
+                    if bucket is None:
+                        continue
+                    for entity in bucket:
+                        distance = math.hypot(entity.x - x, entity.y - y)
+                        if distance <= radius:
+                            yield distance, kind, entity
+
+    def nearest(self, x: float, y: float, radius: float, kinds=ALL):
+        """The closest entity of ``kinds`` within ``radius``, or None."""
+        found = min(
+            self.within(x, y, radius, kinds), key=lambda hit: hit[0], default=None
+        )
+        return None if found is None else found[2]
+
+    def in_cone(
+        self,
+        x: float,
+        y: float,
+        angle: float,
+        radius: float,
+        cone: float,
+        kinds=ALL,
+    ) -> list:
+        """``(distance, kind, entity)`` for entities within ``radius`` and
+        ``cone / 2`` radians of ``angle``, nearest first."""
+        hits = []
+        for hit in self.within(x, y, radius, kinds):
+            entity = hit[2]
+            direction = math.atan2(entity.y - y, entity.x - x)
+            difference = (direction - angle + math.pi) % (2 * math.pi) - math.pi
+            if abs(difference) <= cone / 2:
+                hits.append(hit)
+        hits.sort(key=lambda hit: hit[0])
+        return hits
+
+
+index = SpatialHash()
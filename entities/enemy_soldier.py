@@ -4,11 +4,11 @@ import random
 import pygame
 
 import settings
-from core import collision, logging
+from core import collision, logging, spatial_hash
 
 
 class EnemySoldier:
-    def __init__(self, x, y, nest_location, pheromone_map, speed):
+    def __init__(self, x, y, nest_location, speed):
         self.x = x
         self.y = y
         self.color = pygame.Color(settings.ENEMY_COLOR)
@@ -16,44 +16,32 @@ class EnemySoldier:
         self.speed = speed
         self.vision_range = 10
         self.vision_angle = math.pi / 3
-        logging.debug(f"Enemy spawned at ({self.x}, {self.y})")
+        logging.debug("Enemy spawned at (%s, %s)", self.x, self.y)
 
     def check_ants_in_vision(self):
+        """The nearest worker, soldier or queen in the vision cone that is not
+        behind a wall, or None; swarm workers come as
+        ``spatial_hash.SwarmWorker``s."""
         try:
-            entities = [
-                ("ant", settings.ants),
-                ("soldier", settings.soldiers),
-                ("queen", settings.queen),
-            ]
-            for name, entity_list in entities:
-                for entity in entity_list.copy():
-                    dx = entity.x - self.x
-                    dy = entity.y - self.y
-                    distance = math.hypot(dx, dy)
-                    if distance <= self.vision_range:
-                        angle = math.atan2(dy, dx)
-                        angle_diff = (angle - self.angle + math.pi) % (
-                            2 * math.pi
-                        ) - math.pi
-                        if abs(angle_diff) <= self.vision_angle / 2:
-                            if not self.check_line_of_sight(entity):
-                                return entity
-                    return None
+            for _, _, entity in spatial_hash.index.in_cone(
+                self.x,
+                self.y,
+                self.angle,
+                self.vision_range,
+                self.vision_angle,
+                spatial_hash.PREY,
+            ):
+                if not self.check_line_of_sight(entity):
+                    return entity
+            return None
         except AttributeError as e:
-            logging.error("Error while checking ants in vision: " + str(e))
+            logging.error("Error while checking ants in vision: %s", e)
             return None
 
     def check_line_of_sight(self, target):
-        dx = target.x - self.x
-        dy = target.y - self.y
-        distance = math.hypot(dx, dy)
-        steps = int(distance * 10)
-        for i in range(1, steps):
-            x = self.x + dx * i / steps
-            y = self.y + dy * i / steps
-            if collision.check_collision(x, y, True):
-                return True
-        return False
+        return collision.line_blocked(
+            self.x, self.y, target.x, target.y, collision.ENEMY
+        )
 
     def move(self):
         ant_in_vision = self.check_ants_in_vision()
@@ -96,14 +84,10 @@ class EnemySoldier:
 
     def find_ant(self):
         try:
-            entities = [
-                ("ant", settings.ants),
-                ("soldier", settings.soldiers),
-                ("queen", settings.queen),
-            ]
-            for name, entity_list in entities:
-                for entity in entity_list.copy():
-                    if math.hypot(self.x - entity.x, self.y - entity.y) < 1:
-                        entity_list.remove(entity)
+            for distance, kind, entity in list(
+                spatial_hash.index.within(self.x, self.y, 1, spatial_hash.PREY)
+            ):
+                if distance < 1:
+                    spatial_hash.index.remove(kind, entity)
         except Exception as e:
-            logging.error("Error while finding ants: " + str(e))
+            logging.error("Error while finding ants: %s", e)
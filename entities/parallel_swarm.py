@@ -0,0 +1,344 @@
+import atexit
+import multiprocessing
+import os
+
+import numpy as np
+
+import settings
+from core import collision, food_index, logging, map, perlin, pheromone, shared
+from entities import worker_swarm
+
+STATE_FIELDS = (
+    ("x", np.float64),
+    ("y", np.float64),
+    ("angle", np.float64),
+    ("speed", np.float64),
+    ("has_food", np.bool_),
+    ("assignment", np.int8),
+)
+
+# Whole-map grids strips only ever read
+WORLD_GRIDS = (
+    "terrain",
+    "dirt",
+    "worker_blocked",
+    "digger_blocked",
+    "food",
+    "food_buckets",
+    "pheromones",
+)
+
+# Shared blocks attached in this process, by name
+_attached = {}
+_dug = []
+
+
+class _SharedFood:
+    """Read-only food view for a strip, over grids the main process keeps."""
+
+    def __init__(self, grid: np.ndarray, bucket_counts: np.ndarray, count: int):
+        self.grid = grid
+        self.bucket_counts = bucket_counts
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def difference_update(self, cells):
+        # Pickups are claims, settled by the main process at the tick barrier
+        pass
+
+
+class _SharedPheromones:
+    """Read-only pheromone view for a strip; deposits are recorded, to be
+    replayed by the main process at the tick barrier."""
+
+    def __init__(self, data: np.ndarray):
+        self.data = data
+        self.deposits = []
+
+    @property
+    def food(self) -> np.ndarray:
+        width, height = settings.MAP_WIDTH, settings.MAP_HEIGHT
+        return self.data[pheromone.FOOD_TRAIL, :width, :height]
+
+    def deposit(self, channel: int, x, y, strength: float = 1.0):
+        self.deposits.append((channel, np.copy(x), np.copy(y), strength))
+
+
+class _StripSwarm(worker_swarm.WorkerSwarm):
+    """One strip's workers; digs and pickups are recorded, not applied."""
+
+    claims = {}
+
+    def _apply_digs(self, xs, ys):
+        solid = map.data[xs, ys] == 1
+        _record_dig(xs[solid], ys[solid])
+
+    def _pick_up_food(self, idx, food_locations) -> dict:
+        self.claims = super()._pick_up_food(idx, food_locations)
+        return self.claims
+
+
+def _attach(specs: dict) -> dict:
+    """Arrays for ``{key: spec}``, dropping blocks the task no longer uses."""
+    names = {spec[0] for spec in specs.values()}
+    for name in set(_attached) - names:
+        _attached.pop(name).close()
+    for name, shape, dtype in specs.values():
+        if name not in _attached:
+            _attached[name] = shared.SharedArray(shape, dtype, name)
+    return {key: _attached[spec[0]].array for key, spec in specs.items()}
+
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+def _record_dig(xs, ys):
+    _dug.append((np.atleast_1d(xs).copy(), np.atleast_1d(ys).copy()))
+
+
+def _step_strip(task):
+    specs, nest_location, start, end, food_count, seed = task
+    arrays = _attach(specs)
+    # Point this process's world at read-only views of the shared copies, so
+    # nothing a strip does mid-tick can reach the others
+    world = {key: _read_only(arrays[key]) for key in WORLD_GRIDS}
+    perlin.perlin_settings.map_data = world["terrain"]
+    map.data = world["dirt"]
+    collision.attach(world["worker_blocked"], world["digger_blocked"])
+    settings.pheromones = _SharedPheromones(world["pheromones"])
+    food = _SharedFood(world["food"], world["food_buckets"], food_count)
+
+    state = {field: arrays[field][start:end] for field, _ in STATE_FIELDS}
+    swarm = _StripSwarm(nest_location, seed=seed)
+    for field, _ in STATE_FIELDS:
+        setattr(swarm, field, state[field].copy())
+
+    del _dug[:]
+    delivered = swarm.step(food)
+    for field, _ in STATE_FIELDS:
+        state[field][:] = getattr(swarm, field)
+
+    none = np.zeros(0, dtype=np.int64)
+    dug_x = np.concatenate([xs for xs, _ in _dug] or [none])
+    dug_y = np.concatenate([ys for _, ys in _dug] or [none])
+    claims = swarm.claims
+    claim_x = np.array([cell[0] for cell in claims], dtype=np.int64)
+    claim_y = np.array([cell[1] for cell in claims], dtype=np.int64)
+    claimed_by = start + np.array(list(claims.values()), dtype=np.int64)
+    return (
+        delivered,
+        (claim_x, claim_y, claimed_by),
+        (dug_x, dug_y),
+        settings.pheromones.deposits,
+    )
+
+
+class ParallelSwarm(worker_swarm.WorkerSwarm):
+    """``WorkerSwarm`` whose ticks are split across a process pool.
+
+    The map is cut into ``processes`` vertical strips, each stepped by a pool
+    process. Strip edges are re-cut at every tick barrier from where the
+    workers are, so each strip holds the same number of workers even when
+    they crowd round the nest. A worker that walked over an edge is handed to
+    the neighbouring strip. Terrain, dirt, food, the passability masks and
+    pheromones live in shared memory, mirrored from the main process as they
+    change, so strips read the world without copying or rebuilding it. Worker
+    state is written to shared memory each tick, strip by strip.
+
+    Strips never write the world: their digs, food pickups and trail marks
+    are sent back and applied to ``map``/``food_locations``/``pheromones`` at
+    the tick barrier, so ticks do not depend on how strips are scheduled. The
+    whole swarm sees them next tick, and when strips pick up the same food
+    cell the lowest-indexed worker keeps it while the others go on searching.
+
+    The pool is forked so it inherits the already-loaded modules; platforms
+    without ``fork`` cannot use this engine.
+    """
+
+    def __init__(self, nest_location, processes: int = None, seed=None):
+        super().__init__(nest_location, seed)
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise ValueError("The parallel engine needs the 'fork' start method")
+
+        self.processes = (
+            processes or settings.PARALLEL_PROCESSES or os.cpu_count() or 1
+        )
+        self.tick = 0
+        self._seed = int(self.rng.integers(2**62))
+        self._state = {}
+        self._capacity = 0
+        self._closed = False
+
+        terrain = perlin.perlin_settings.map_data
+        blocked = collision.passability(collision.WORKER)
+        food = settings.food_locations
+        pheromones = settings.pheromones
+        self._world = {
+            "terrain": shared.SharedArray(terrain.shape, terrain.dtype),
+            "dirt": shared.SharedArray(map.data.shape, map.data.dtype),
+            "worker_blocked": shared.SharedArray(blocked.shape, bool),
+            "digger_blocked": shared.SharedArray(blocked.shape, bool),
+            "food": shared.SharedArray(food.grid.shape, bool),
+            "food_buckets": shared.SharedArray(
+                food.bucket_counts.shape, food.bucket_counts.dtype
+            ),
+            "pheromones": shared.SharedArray(
+                pheromones.data.shape, pheromones.data.dtype
+            ),
+            "active": shared.SharedArray(pheromones.active.shape, bool),
+        }
+        self._mirror(None, None)
+        self._mirror_food(None, None)
+        pheromones.attach(self._world["pheromones"].array, self._world["active"].array)
+        # Subscribed after ``collision``, so its masks are current by the time
+        # ``_mirror`` copies them
+        map.subscribe(self._mirror)
+        food.subscribe(self._mirror_food)
+
+        self._pool = multiprocessing.get_context("fork").Pool(self.processes)
+        atexit.register(self.close)
+        logging.info("Parallel swarm started with %s processes", self.processes)
+
+    def _mirror(self, xs, ys):
+        """Copies changed terrain and dirt, and their passability, to the
+        shared world."""
+        world = {key: block.array for key, block in self._world.items()}
+        grids = (
+            (world["terrain"], perlin.perlin_settings.map_data),
+            (world["dirt"], map.data),
+        )
+        masks = (
+            (world["worker_blocked"], collision.passability(collision.WORKER)),
+            (world["digger_blocked"], collision.passability(collision.DIGGER)),
+        )
+        if xs is None:
+            for target, source in grids + masks:
+                np.copyto(target, source)
+            return
+
+        for target, source in grids:
+            target[xs, ys] = source[xs, ys]
+        rows = ys + collision.SKY_ROWS
+        for target, source in masks:
+            target[xs, rows] = source[xs, rows]
+
+    def _mirror_food(self, x, y):
+        food = settings.food_locations
+        grid = self._world["food"].array
+        buckets = self._world["food_buckets"].array
+        if x is None:
+            np.copyto(grid, food.grid)
+            np.copyto(buckets, food.bucket_counts)
+            return
+
+        grid[x, y] = food.grid[x, y]
+        bucket = (x // food_index.BUCKET_SIZE, y // food_index.BUCKET_SIZE)
+        buckets[bucket] = food.bucket_counts[bucket]
+
+    def _ensure_capacity(self, count: int):
+        if count <= self._capacity:
+            return
+        for block in self._state.values():
+            block.close(unlink=True)
+        self._capacity = max(count, self._capacity * 2, 1024)
+        self._state = {
+            field: shared.SharedArray((self._capacity,), dtype)
+            for field, dtype in STATE_FIELDS
+        }
+
+    def _strips(self):
+        """Worker indices ordered strip by strip, and each strip's
+        ``(first, end)`` range in that order.
+
+        Strips take equal runs of the workers sorted by x, so each covers a
+        band of the map; workers at the very x an edge falls on are split at it
+        by index. Within a strip workers keep their index order.
+        """
+        count = len(self)
+        processes = min(self.processes, count)
+        edges = [i * count // processes for i in range(processes + 1)]
+        by_x = np.argsort(self.x, kind="stable")
+        strip = np.empty(count, dtype=np.int64)
+        for i, (first, end) in enumerate(zip(edges[:-1], edges[1:])):
+            strip[by_x[first:end]] = i
+        order = np.argsort(strip, kind="stable")
+        return order, list(zip(edges[:-1], edges[1:]))
+
+    def step(self, food_locations):
+        count = len(self)
+        if not count or self._closed:
+            return 0
+
+        self._ensure_capacity(count)
+        order, strips = self._strips()
+        for field, _ in STATE_FIELDS:
+            self._state[field].array[:count] = getattr(self, field)[order]
+
+        blocks = {**self._world, **self._state}
+        specs = {key: block.spec for key, block in blocks.items()}
+        tasks = [
+            (
+                specs,
+                self.nest_location,
+                first,
+                end,
+                len(food_locations),
+                (self._seed, self.tick, i),
+            )
+            for i, (first, end) in enumerate(strips)
+        ]
+        results = self._pool.map(_step_strip, tasks, chunksize=1)
+
+        for field, _ in STATE_FIELDS:
+            values = np.empty_like(getattr(self, field))
+            values[order] = self._state[field].array[:count]
+            setattr(self, field, values)
+
+        delivered = sum(result[0] for result in results)
+        claim_x, claim_y, claimed_by = (
+            np.concatenate(parts) for parts in zip(*(result[1] for result in results))
+        )
+        dug_x, dug_y = (
+            np.concatenate(parts) for parts in zip(*(result[2] for result in results))
+        )
+        self._settle_claims(food_locations, claim_x, claim_y, order[claimed_by])
+        map.dig_many(dug_x, dug_y)
+        for result in results:
+            for deposit in result[3]:
+                settings.pheromones.deposit(*deposit)
+        self.tick += 1
+        return delivered
+
+    def _settle_claims(self, food_locations, claim_x, claim_y, claimed_by):
+        """Takes the claimed food cells; a cell claimed by several strips goes
+        to the lowest-indexed worker and the rest are left searching."""
+        order = np.argsort(claimed_by, kind="stable")
+        claim_x, claim_y, claimed_by = claim_x[order], claim_y[order], claimed_by[order]
+        _, first = np.unique(claim_x * settings.MAP_HEIGHT + claim_y, return_index=True)
+        lost = np.ones(len(claimed_by), dtype=bool)
+        lost[first] = False
+        self.has_food[claimed_by[lost]] = False
+        food_locations.difference_update(
+            zip(claim_x[first].tolist(), claim_y[first].tolist())
+        )
+
+    def close(self):
+        """Stops the pool and moves pheromones back to private memory."""
+        if self._closed:
+            return
+        self._closed = True
+        self._pool.terminate()
+        self._pool.join()
+        map.unsubscribe(self._mirror)
+        settings.food_locations.unsubscribe(self._mirror_food)
+
+        pheromones = settings.pheromones
+        pheromones.attach(pheromones.data.copy(), pheromones.active.copy(), copy=False)
+        for block in list(self._world.values()) + list(self._state.values()):
+            block.close(unlink=True)
+        atexit.unregister(self.close)
@@ -8,18 +8,17 @@ from core import collision, logging, map
 
 
 class Queen:
-    def __init__(self, x, y, nest_location, pheromone_map, speed):
+    def __init__(self, x, y, nest_location, speed):
         self.x = x
         self.y = y
         self.nest_location = nest_location
         self.has_food = False
-        self.pheromone_map = pheromone_map
         self.color = pygame.Color(settings.ANT_COLOR)
         self.angle = random.uniform(0, 2 * math.pi)
         self.speed = speed
         self.vision_range = 15
         self.vision_angle = math.pi / 3
-        logging.debug(f"Soldier spawned at ({self.x}, {self.y})")
+        logging.debug("Queen spawned at (%s, %s)", self.x, self.y)
 
     def move(self):
         self.random_walk()
@@ -27,10 +26,14 @@ class Queen:
 
         try:
             if self.y >= 0:
-                map.data[round(self.x), round(self.y)] = 0
+                map.dig(round(self.x), round(self.y))
         except IndexError:
             logging.error(
-                f"Invalid grid position: ({self.x}, {self.y}) | Camera: ({settings.camera_x}, {settings.camera_y}) | Entity: Queen"
+                "Invalid grid position: (%s, %s) | Camera: (%s, %s) | Entity: Queen",
+                self.x,
+                self.y,
+                settings.camera_x,
+                settings.camera_y,
             )
 
     def stay_within_range(self):
@@ -4,22 +4,21 @@ import random
 import pygame
 
 import settings
-from core import collision, logging, map
+from core import collision, logging, map, spatial_hash
 
 
 class Soldier:
-    def __init__(self, x, y, nest_location, pheromone_map, speed):
+    def __init__(self, x, y, nest_location, speed):
         self.x = x
         self.y = y
         self.nest_location = nest_location
         self.has_food = False
-        self.pheromone_map = pheromone_map
         self.color = pygame.Color(settings.ANT_COLOR)
         self.angle = random.uniform(0, 2 * math.pi)
         self.speed = speed
         self.vision_range = 30
         self.vision_angle = math.pi / 3
-        logging.debug(f"Soldier spawned at ({self.x}, {self.y})")
+        logging.debug("Soldier spawned at (%s, %s)", self.x, self.y)
 
     def move(self):
         self.random_walk()
@@ -27,10 +26,14 @@ class Soldier:
 
         try:
             if self.y >= 0:
-                map.data[round(self.x), round(self.y)] = 0
+                map.dig(round(self.x), round(self.y))
         except IndexError:
             logging.error(
-                f"Invalid grid position: ({self.x}, {self.y}) | Camera: ({settings.camera_x}, {settings.camera_y}) | Entity: Soldier"
+                "Invalid grid position: (%s, %s) | Camera: (%s, %s) | Entity: Soldier",
+                self.x,
+                self.y,
+                settings.camera_x,
+                settings.camera_y,
             )
 
     def stay_within_range(self):
@@ -52,7 +55,7 @@ class Soldier:
                     self.x = queen_x + dx * (radius - 1) / distance
                     self.y = queen_y + dy * (radius - 1) / distance
             except Exception as e:
-                logging.error(f"Error while staying within range: {e}")
+                logging.error("Error while staying within range: %s", e)
 
     def random_walk(self):
         for _ in range(10):
@@ -69,10 +72,10 @@ class Soldier:
 
     def find_ant(self):
         try:
-            entities = [("enemy", settings.enemies)]
-            for name, entity_list in entities:
-                for entity in entity_list.copy():
-                    if math.hypot(self.x - entity.x, self.y - entity.y) < 1:
-                        entity_list.remove(entity)
+            for distance, kind, entity in list(
+                spatial_hash.index.within(self.x, self.y, 1, (spatial_hash.ENEMY,))
+            ):
+                if distance < 1:
+                    spatial_hash.index.remove(kind, entity)
         except Exception as e:
-            logging.error("Error while finding enemies: " + str(e))
+            logging.error("Error while finding enemies: %s", e)
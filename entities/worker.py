@@ -4,48 +4,39 @@ import random
 import pygame
 
 import settings
-from core import collision, logging, map
+from core import collision, logging, map, pheromone
 
 
 class Ant:
-    def __init__(self, x, y, nest_location, pheromone_map, speed, assignment):
+    def __init__(self, x, y, nest_location, speed, assignment):
         self.x = x
         self.y = y
         self.assignment = assignment
         self.nest_location = nest_location
         self.has_food = False
-        self.pheromone_map = pheromone_map
         self.color = pygame.Color(settings.ANT_COLOR)
         self.angle = random.uniform(0, 2 * math.pi)
         self.speed = speed
         self.vision_range = 10
         self.vision_angle = math.pi / 3
-        logging.debug(f"Ant spawned at ({self.x}, {self.y})")
+        logging.debug("Ant spawned at (%s, %s)", self.x, self.y)
 
     def check_food_in_vision(self, food_locations):
-        for food in food_locations:
-            dx = food[0] - self.x
-            dy = food[1] - self.y
-            distance = math.hypot(dx, dy)
-            if distance <= self.vision_range:
-                angle = math.atan2(dy, dx)
-                angle_diff = (angle - self.angle + math.pi) % (2 * math.pi) - math.pi
-                if abs(angle_diff) <= self.vision_angle / 2:
-                    if not self.check_line_of_sight(food):
-                        return food
+        for food in food_locations.in_vision(
+            self.x, self.y, self.angle, self.vision_range, self.vision_angle
+        ):
+            if not self.check_line_of_sight(food):
+                return food
         return None
 
     def check_line_of_sight(self, target):
-        dx = target[0] - self.x
-        dy = target[1] - self.y
-        distance = math.hypot(dx, dy)
-        steps = int(distance * 2)
-        for i in range(1, steps):
-            x = self.x + dx * i / steps
-            y = self.y + dy * i / steps
-            if collision.check_collision(x, y, None, self.assignment):
-                return True
-        return False
+        return collision.line_blocked(
+            self.x,
+            self.y,
+            target[0],
+            target[1],
+            collision.mode_for(None, self.assignment),
+        )
 
     def move(self):
         food_in_vision = self.check_food_in_vision(settings.food_locations)
@@ -60,7 +51,7 @@ class Ant:
         try:
             if 0 <= x < settings.MAP_WIDTH and 0 <= y < settings.MAP_HEIGHT:
                 if self.assignment == 1:
-                    map.data[x, y] = 0
+                    map.dig(x, y)
                 elif self.assignment == 2:
                     for dx in range(-1, 1):
                         for dy in range(-1, 1):
@@ -69,14 +60,24 @@ class Ant:
                                 0 <= nx < settings.MAP_WIDTH
                                 and 0 <= ny < settings.MAP_HEIGHT
                             ):
-                                map.data[nx, ny] = 0
+                                map.dig(nx, ny)
             else:
                 logging.warn(
-                    f"Ant position out of bounds: ({x}, {y}) | Camera: ({settings.camera_x}, {settings.camera_y}) | Entity: Worker | Assignment: {self.assignment}"
+                    "Ant position out of bounds: (%s, %s) | Camera: (%s, %s) | Entity: Worker | Assignment: %s",
+                    x,
+                    y,
+                    settings.camera_x,
+                    settings.camera_y,
+                    self.assignment,
                 )
         except IndexError:
             logging.error(
-                f"Invalid grid position: ({x}, {y}) | Camera: ({settings.camera_x}, {settings.camera_y}) | Entity: Worker | Assignment: {self.assignment}"
+                "Invalid grid position: (%s, %s) | Camera: (%s, %s) | Entity: Worker | Assignment: %s",
+                x,
+                y,
+                settings.camera_x,
+                settings.camera_y,
+                self.assignment,
             )
 
     def move_towards(self, target):
@@ -132,9 +133,9 @@ class Ant:
             x = int(self.x + dx)
             y = int(self.y + dy)
             if 0 <= x < settings.MAP_WIDTH and 0 <= y < settings.MAP_HEIGHT:
-                pheromone = self.pheromone_map[x][y]
-                if pheromone > strongest_pheromone:
-                    strongest_pheromone = pheromone
+                strength = settings.pheromones.strength(pheromone.FOOD_TRAIL, x, y)
+                if strength > strongest_pheromone:
+                    strongest_pheromone = strength
                     strongest_direction = (dx, dy)
 
         if strongest_direction:
@@ -142,14 +143,18 @@ class Ant:
             self.angle = self.angle + (target_angle - self.angle) * 0.1
 
     def get_pheromone_strength(self, x, y):
-        return self.pheromone_map[x % settings.MAP_WIDTH][y % settings.MAP_HEIGHT]
+        return settings.pheromones.strength(
+            pheromone.FOOD_TRAIL, x % settings.MAP_WIDTH, y % settings.MAP_HEIGHT
+        )
 
     def leave_pheromone(self):
         x, y = int(self.x), int(self.y)
-        self.pheromone_map[x % settings.MAP_WIDTH][y % settings.MAP_HEIGHT] = 1
+        settings.pheromones.deposit(
+            pheromone.FOOD_TRAIL, x % settings.MAP_WIDTH, y % settings.MAP_HEIGHT
+        )
 
     def find_food(self, food_locations):
-        for food in food_locations:
+        for food in food_locations.in_radius(self.x, self.y, 1):
             if math.hypot(self.x - food[0], self.y - food[1]) < 1:
                 food_locations.remove(food)
                 self.has_food = True
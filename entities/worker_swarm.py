@@ -0,0 +1,434 @@
+import math
+import random
+
+import numpy as np
+
+import settings
+from core import collision, food_index, logging, map, pheromone
+
+VISION_RANGE = 10
+VISION_ANGLE = math.pi / 3
+WALK_ATTEMPTS = 10
+WALK_JITTER = 0.5
+PHEROMONE_TURN_RATE = 0.1
+ASSIGNMENT_WEIGHTS = (4, 2, 1)
+NEIGHBOURS = np.array(
+    [(0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1), (-1, 0), (-1, 1)]
+)
+CHUNK_SIZE = 4096
+HEADING_BINS = 64
+
+
+def _vision_offsets():
+    # For each heading bin, every cell offset (from the worker's floored
+    # position) that a worker anywhere in that cell, facing anywhere in the
+    # bin, could see. Only the offsets holding food then get the exact cone
+    # test. Bins are padded out to the same width.
+    reach = VISION_RANGE + 1
+    ox, oy = np.meshgrid(np.arange(-reach, reach + 1), np.arange(-reach, reach + 1))
+    ox, oy = ox.ravel(), oy.ravel()
+    # Workers look at a food cell's corner, from somewhere in [0, 1) x [0, 1)
+    gap_x = np.maximum(np.maximum(-ox, ox - 1), 0)
+    gap_y = np.maximum(np.maximum(-oy, oy - 1), 0)
+    in_range = np.hypot(gap_x, gap_y) <= VISION_RANGE
+    on_cell = (ox >= 0) & (ox <= 1) & (oy >= 0) & (oy <= 1)
+    centre = np.arctan2(oy - 0.5, ox - 0.5)
+    spread = np.array(
+        [
+            (np.arctan2(oy - cy, ox - cx) - centre + math.pi) % (2 * math.pi)
+            - math.pi
+            for cx in (0, 1)
+            for cy in (0, 1)
+        ]
+    )
+    low, high = spread.min(axis=0), spread.max(axis=0)
+
+    bins = []
+    half_width = math.pi / HEADING_BINS + VISION_ANGLE / 2 + 1e-9
+    for b in range(HEADING_BINS):
+        heading = (b + 0.5) * 2 * math.pi / HEADING_BINS
+        diff = (centre - heading + math.pi) % (2 * math.pi) - math.pi
+        facing = (diff + high >= -half_width) & (diff + low <= half_width)
+        bins.append(np.flatnonzero(in_range & (on_cell | facing)))
+
+    width = max(len(b) for b in bins)
+    offsets_x = np.zeros((HEADING_BINS, width), dtype=np.int64)
+    offsets_y = np.zeros((HEADING_BINS, width), dtype=np.int64)
+    valid = np.zeros((HEADING_BINS, width), dtype=bool)
+    for b, cells in enumerate(bins):
+        offsets_x[b, : len(cells)] = ox[cells]
+        offsets_y[b, : len(cells)] = oy[cells]
+        valid[b, : len(cells)] = True
+    return offsets_x, offsets_y, valid
+
+
+VISION_OFFSETS_X, VISION_OFFSETS_Y, VISION_OFFSETS_VALID = _vision_offsets()
+# Food grid border wide enough for any offset from a worker in the sky band
+VISION_MARGIN = VISION_RANGE + 6
+
+
+class WorkerSwarm:
+    """Struct-of-arrays worker engine.
+
+    Holds every worker's state in NumPy arrays and advances all of them at once,
+    following the same rules as ``worker.Ant``: random walk with pheromone
+    following, moving towards visible food, digging by assignment, picking up
+    food and carrying it back to the nest while laying a trail.
+
+    Workers are updated against the world as it was at the start of the tick,
+    so unlike the object engine one worker's digging is only seen by the others
+    on the next tick. When several workers reach the same food cell in a tick
+    the lowest index wins. Otherwise a lone worker sees, chases and picks up
+    exactly the food an ``Ant`` in its place would.
+    """
+
+    def __init__(self, nest_location, seed=None):
+        self.nest_location = nest_location
+        self.rng = np.random.default_rng(
+            seed if seed is not None else random.getrandbits(64)
+        )
+        self.x = np.zeros(0)
+        self.y = np.zeros(0)
+        self.angle = np.zeros(0)
+        self.speed = np.zeros(0)
+        self.has_food = np.zeros(0, dtype=bool)
+        self.assignment = np.zeros(0, dtype=np.int8)
+
+    def __len__(self):
+        return len(self.x)
+
+    def spawn(self, count, x, y, speed, assignment=None):
+        if assignment is None:
+            weights = np.array(ASSIGNMENT_WEIGHTS, dtype=float)
+            assignments = self.rng.choice(3, size=count, p=weights / weights.sum())
+        else:
+            assignments = np.full(count, assignment)
+
+        self.x = np.concatenate([self.x, np.full(count, float(x))])
+        self.y = np.concatenate([self.y, np.full(count, float(y))])
+        self.angle = np.concatenate(
+            [self.angle, self.rng.uniform(0, 2 * math.pi, count)]
+        )
+        self.speed = np.concatenate([self.speed, np.full(count, float(speed))])
+        self.has_food = np.concatenate([self.has_food, np.zeros(count, dtype=bool)])
+        self.assignment = np.concatenate(
+            [self.assignment, assignments.astype(np.int8)]
+        )
+        logging.debug("%s workers spawned at (%s, %s)", count, x, y)
+
+    def remove(self, mask):
+        keep = ~mask
+        for name in ("x", "y", "angle", "speed", "has_food", "assignment"):
+            setattr(self, name, getattr(self, name)[keep])
+        return int(mask.sum())
+
+    def attract(self, x, y, radius, target_x, target_y):
+        pulled = np.hypot(self.x - x, self.y - y) <= radius
+        self.x[pulled] = target_x
+        self.y[pulled] = target_y
+        return int(pulled.sum())
+
+    def step(self, food_locations):
+        """Advances every worker by one tick and returns the food delivered."""
+        carrying = np.flatnonzero(self.has_food)
+        searching = np.flatnonzero(~self.has_food)
+
+        delivered = self._return_to_nest(carrying)
+        self._search(searching, food_locations)
+        return delivered
+
+    # Terrain
+
+    def _blocked(self, xs, ys, idx):
+        return collision.check_collision_many(xs, ys, self._modes(idx))
+
+    def _modes(self, idx):
+        return np.where(self.assignment[idx] == 0, collision.WORKER, collision.DIGGER)
+
+    def _dig(self, idx):
+        x = np.rint(self.x[idx]).astype(np.int64)
+        y = np.rint(self.y[idx]).astype(np.int64)
+        assignment = self.assignment[idx]
+        diggers = assignment > 0
+        wide = assignment == 2
+        dug_x, dug_y = [], []
+        for ox, oy, mask in ((0, 0, diggers), (-1, 0, wide), (0, -1, wide), (-1, -1, wide)):
+            nx, ny = x + ox, y + oy
+            hit = (
+                mask
+                & (nx >= 0)
+                & (nx < settings.MAP_WIDTH)
+                & (ny >= 0)
+                & (ny < settings.MAP_HEIGHT)
+            )
+            dug_x.append(nx[hit])
+            dug_y.append(ny[hit])
+        self._apply_digs(np.concatenate(dug_x), np.concatenate(dug_y))
+
+    def _apply_digs(self, xs, ys):
+        map.dig_many(xs, ys)
+
+    # Movement
+
+    def _random_walk(self, idx):
+        pending = idx
+        for _ in range(WALK_ATTEMPTS):
+            if not len(pending):
+                break
+            self.angle[pending] += self.rng.uniform(
+                -WALK_JITTER, WALK_JITTER, len(pending)
+            )
+            new_x = self.x[pending] + np.cos(self.angle[pending]) * self.speed[pending]
+            new_y = self.y[pending] + np.sin(self.angle[pending]) * self.speed[pending]
+            free = ~self._blocked(new_x, new_y, pending)
+            self.x[pending[free]] = new_x[free]
+            self.y[pending[free]] = new_y[free]
+            pending = pending[~free]
+
+        self._follow_pheromone(idx)
+
+    def _follow_pheromone(self, idx):
+        pheromone_map = settings.pheromones.food
+        x = np.trunc(self.x[idx]).astype(np.int64)
+        y = np.trunc(self.y[idx]).astype(np.int64)
+        on_trail = pheromone_map[x % settings.MAP_WIDTH, y % settings.MAP_HEIGHT] > 0
+        idx = idx[on_trail]
+        if not len(idx):
+            return
+
+        x = self.x[idx][:, None] + NEIGHBOURS[None, :, 0]
+        y = self.y[idx][:, None] + NEIGHBOURS[None, :, 1]
+        gx = np.trunc(x).astype(np.int64)
+        gy = np.trunc(y).astype(np.int64)
+        inside = (
+            (gx >= 0)
+            & (gx < settings.MAP_WIDTH)
+            & (gy >= 0)
+            & (gy < settings.MAP_HEIGHT)
+        )
+        strength = np.zeros(gx.shape)
+        strength[inside] = pheromone_map[gx[inside], gy[inside]]
+
+        best = np.argmax(strength, axis=1)
+        turning = strength[np.arange(len(idx)), best] > 0
+        direction = NEIGHBOURS[best[turning]]
+        target_angle = np.arctan2(direction[:, 1], direction[:, 0])
+        turning_idx = idx[turning]
+        self.angle[turning_idx] += (
+            target_angle - self.angle[turning_idx]
+        ) * PHEROMONE_TURN_RATE
+
+    def _move_towards(self, idx, tx, ty):
+        dx = tx - self.x[idx]
+        dy = ty - self.y[idx]
+        distance = np.hypot(dx, dy)
+        speed = self.speed[idx]
+        far = distance > speed
+        dx[far] = dx[far] / distance[far] * speed[far]
+        dy[far] = dy[far] / distance[far] * speed[far]
+
+        new_x = self.x[idx] + dx
+        new_y = self.y[idx] + dy
+        free = ~self._blocked(new_x, new_y, idx)
+        moved = idx[free]
+        self.x[moved] = new_x[free]
+        self.y[moved] = new_y[free]
+        self.angle[moved] = np.arctan2(dy[free], dx[free])
+        self._random_walk(idx[~free])
+
+    def _leave_pheromone(self, idx):
+        x = np.trunc(self.x[idx]).astype(np.int64) % settings.MAP_WIDTH
+        y = np.trunc(self.y[idx]).astype(np.int64) % settings.MAP_HEIGHT
+        settings.pheromones.deposit(pheromone.FOOD_TRAIL, x, y)
+
+    def _return_to_nest(self, idx):
+        nest_x, nest_y = self.nest_location
+        distance = np.hypot(nest_x - self.x[idx], nest_y - self.y[idx])
+        arrived = idx[distance < 1]
+        self.has_food[arrived] = False
+
+        travelling = idx[distance >= 1]
+        self._move_towards(
+            travelling,
+            np.full(len(travelling), float(nest_x)),
+            np.full(len(travelling), float(nest_y)),
+        )
+        self._leave_pheromone(travelling)
+        return len(arrived)
+
+    # Foraging
+
+    def _search(self, idx, food_locations):
+        seen, tx, ty = self._food_in_vision(idx, food_locations)
+        self._move_towards(idx[seen], tx, ty)
+        self._random_walk(idx[~seen])
+
+        self.x[idx] = np.clip(self.x[idx], 0, settings.MAP_WIDTH - 1)
+        self.y[idx] = np.clip(self.y[idx], 0, settings.MAP_HEIGHT - 1)
+        self._dig(idx)
+        self._pick_up_food(idx, food_locations)
+
+    def _food_in_vision(self, idx, food_locations):
+        seen = np.zeros(len(idx), dtype=bool)
+        tx = np.zeros(len(idx))
+        ty = np.zeros(len(idx))
+        if not food_locations or not len(idx):
+            return seen, tx[:0], ty[:0]
+
+        # Coarse pass: only workers with food in a nearby bucket look closer
+        food_grid = food_locations.grid
+        width, height = food_grid.shape
+        buckets = food_locations.bucket_counts > 0
+        bw, bh = buckets.shape
+        reach = -(-(VISION_RANGE + 1) // food_index.BUCKET_SIZE)
+        near = np.zeros((bw + 2 * reach, bh + 2 * reach), dtype=bool)
+        for ox in range(2 * reach + 1):
+            for oy in range(2 * reach + 1):
+                near[ox : ox + bw, oy : oy + bh] |= buckets
+        bx = np.floor(self.x[idx]).astype(np.int64) // food_index.BUCKET_SIZE + reach
+        by = np.floor(self.y[idx]).astype(np.int64) // food_index.BUCKET_SIZE + reach
+        bx = np.clip(bx, 0, near.shape[0] - 1)
+        by = np.clip(by, 0, near.shape[1] - 1)
+        candidates = np.flatnonzero(near[bx, by])
+
+        margin = VISION_MARGIN
+        bordered = np.zeros((width + 2 * margin, height + 2 * margin), dtype=bool)
+        bordered[margin:-margin, margin:-margin] = food_grid
+        stride = bordered.shape[1]
+        food = bordered.ravel()
+        offsets = VISION_OFFSETS_X * stride + VISION_OFFSETS_Y
+
+        # Workers sharing a cell and heading bin have the same food cells in
+        # range, so each such group gathers them once
+        workers = idx[candidates]
+        cell_x = np.floor(self.x[workers]).astype(np.int64)
+        cell_y = np.floor(self.y[workers]).astype(np.int64)
+        heading = (
+            (self.angle[workers] % (2 * math.pi)) / (2 * math.pi) * HEADING_BINS
+        ).astype(np.int64) % HEADING_BINS
+        keys = ((cell_x + margin) * stride + cell_y + margin) * HEADING_BINS + heading
+        _, first, group = np.unique(keys, return_index=True, return_inverse=True)
+
+        hit_group, hit_x, hit_y = [], [], []
+        for start in range(0, len(first), CHUNK_SIZE):
+            rows = first[start : start + CHUNK_SIZE]
+            bins = heading[rows]
+            base = (cell_x[rows] + margin) * stride + cell_y[rows] + margin
+            has_food = food[base[:, None] + offsets[bins]]
+            has_food &= VISION_OFFSETS_VALID[bins]
+            hit, cols = np.nonzero(has_food)
+            hit_group.append(start + hit)
+            hit_x.append(cell_x[rows[hit]] + VISION_OFFSETS_X[bins[hit], cols])
+            hit_y.append(cell_y[rows[hit]] + VISION_OFFSETS_Y[bins[hit], cols])
+        hit_group, hit_x, hit_y = (
+            np.concatenate(parts) for parts in (hit_group, hit_x, hit_y)
+        )
+
+        # Hand each worker its group's food cells
+        group = group.ravel()
+        counts = np.bincount(hit_group, minlength=len(first))
+        per_worker = counts[group]
+        rows = np.repeat(np.arange(len(workers)), per_worker)
+        skip = np.cumsum(counts)[group] - np.cumsum(per_worker)
+        hits = np.repeat(skip, per_worker) + np.arange(len(rows))
+
+        found, fx, fy = self._nearest_visible_food(
+            workers, rows, hit_x[hits], hit_y[hits]
+        )
+        seen[candidates[found]] = True
+        tx[candidates[found]] = fx[found]
+        ty[candidates[found]] = fy[found]
+        return seen, tx[seen], ty[seen]
+
+    def _nearest_visible_food(self, workers, rows, fx, fy):
+        """Nearest food each of ``workers`` can see, by the same rule as
+        ``worker.Ant.check_food_in_vision``, out of the food cells ``fx``/``fy``
+        near ``workers[rows]``; returns whether any was found and where, per
+        worker."""
+        x, y, angle = self.x[workers], self.y[workers], self.angle[workers]
+        modes = self._modes(workers)
+
+        # The exact cone test, from the worker's own position and heading
+        dx, dy = fx - x[rows], fy - y[rows]
+        distance = np.hypot(dx, dy)
+        diff = (np.arctan2(dy, dx) - angle[rows] + math.pi) % (2 * math.pi) - math.pi
+        visible = (distance <= VISION_RANGE) & (np.abs(diff) <= VISION_ANGLE / 2)
+        rows, fx, fy = rows[visible], fx[visible], fy[visible]
+        distance = distance[visible]
+        # Nearest first, ties going to the lower cell as in ``FoodIndex.in_vision``
+        order = np.lexsort((fy, fx, distance, rows))
+        rows, fx, fy = rows[order], fx[order], fy[order]
+
+        found = np.zeros(len(workers), dtype=bool)
+        target_x = np.zeros(len(workers), dtype=np.int64)
+        target_y = np.zeros(len(workers), dtype=np.int64)
+        # Test line of sight one round at a time, so walls only cost extra
+        # rounds where they exist
+        while len(rows):
+            first = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+            clear = ~collision.line_blocked_many(
+                x[rows[first]],
+                y[rows[first]],
+                fx[first],
+                fy[first],
+                modes[rows[first]],
+            )
+            hits = first[clear]
+            found[rows[hits]] = True
+            target_x[rows[hits]] = fx[hits]
+            target_y[rows[hits]] = fy[hits]
+
+            keep = ~found[rows]
+            keep[first] = False
+            rows, fx, fy = rows[keep], fx[keep], fy[keep]
+        return found, target_x, target_y
+
+    def _pick_up_food(self, idx, food_locations) -> dict:
+        """Gives food within reach to the workers in ``idx``; returns the cells
+        taken, each mapped to the worker that took it."""
+        if not food_locations:
+            return {}
+
+        food_grid = food_locations.grid
+        # Food within reach sits in one of the four cells around the floor
+        width, height = food_grid.shape
+        padded = np.zeros((width + 1, height + 1), dtype=bool)
+        padded[:width, :height] = food_grid
+        nearby = padded[:-1, :-1] | padded[1:, :-1] | padded[:-1, 1:] | padded[1:, 1:]
+        fx0 = np.floor(self.x[idx]).astype(np.int64)
+        fy0 = np.floor(self.y[idx]).astype(np.int64)
+        close = nearby[fx0, fy0]
+        idx, fx0, fy0 = idx[close], fx0[close], fy0[close]
+        x, y = self.x[idx], self.y[idx]
+
+        workers, cells_x, cells_y, distances = [], [], [], []
+        for ox in (0, 1):
+            for oy in (0, 1):
+                fx, fy = fx0 + ox, fy0 + oy
+                inside = (fx < settings.MAP_WIDTH) & (fy < settings.MAP_HEIGHT)
+                reach = np.zeros(len(idx), dtype=bool)
+                reach[inside] = food_grid[fx[inside], fy[inside]]
+                distance = np.hypot(x - fx, y - fy)
+                reach &= distance < 1
+                workers.append(idx[reach])
+                cells_x.append(fx[reach])
+                cells_y.append(fy[reach])
+                distances.append(distance[reach])
+        workers, cells_x, cells_y, distances = (
+            np.concatenate(parts) for parts in (workers, cells_x, cells_y, distances)
+        )
+
+        # Like the object engine's workers taking turns, each worker in index
+        # order takes the nearest food the ones before it left
+        taken = {}
+        for row in np.lexsort((cells_y, cells_x, distances, workers)):
+            worker = workers[row]
+            cell = (int(cells_x[row]), int(cells_y[row]))
+            if self.has_food[worker] or cell in taken:
+                continue
+            taken[cell] = worker
+            self.has_food[worker] = True
+
+        food_locations.difference_update(taken)
+        self._leave_pheromone(np.array(list(taken.values()), dtype=np.int64))
+        return taken
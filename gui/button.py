@@ -3,6 +3,7 @@ from typing import Callable, Optional, Tuple
 import pygame
 
 import settings
+from gui import text as labels
 
 DEFAULT_FONT_SIZE = 40
 BORDER_WIDTH = 2
@@ -26,9 +27,14 @@ class Button:
         self.text = text
         self.color = color
         self.text_color = text_color
-        self.font = pygame.font.Font(None, font_size)
+        self.font = labels.get_font(font_size)
         self.on_click = on_click
         self.is_hovered = False
+        self.dirty = True
+
+    @property
+    def bounds(self) -> pygame.Rect:
+        return self.rect.inflate(BORDER_WIDTH * 2, BORDER_WIDTH * 2)
 
     def draw(self, surface: pygame.Surface):
         pygame.draw.rect(
@@ -36,13 +42,16 @@ class Button:
         )
         pygame.draw.rect(surface, self._get_current_color(), self.rect)
 
-        text_surface = self.font.render(self.text, True, self.text_color)
+        text_surface = labels.none(self.text, self.text_color, self.font)
         text_rect = text_surface.get_rect(center=self.rect.center)
         surface.blit(text_surface, text_rect)
 
     def handle_event(self, event: pygame.event.Event) -> bool:
         if event.type == pygame.MOUSEMOTION:
-            self.is_hovered = self.rect.collidepoint(event.pos)
+            hovered = self.rect.collidepoint(event.pos)
+            if hovered != self.is_hovered:
+                self.is_hovered = hovered
+                self.dirty = True
         elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
             if self.rect.collidepoint(event.pos) and self.on_click:
                 settings.drawing_food = False
@@ -59,9 +68,11 @@ class Button:
 
     def set_text(self, text: str):
         self.text = text
+        self.dirty = True
 
     def set_color(self, color: Tuple[int, int, int]):
         self.color = color
+        self.dirty = True
 
     def set_on_click(self, on_click: Optional[Callable[[], None]]):
         self.on_click = on_click
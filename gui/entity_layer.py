@@ -0,0 +1,97 @@
+import numpy as np
+import pygame
+
+import settings
+from core import mirror
+from gui import viewport
+
+# Colour and radius of each ``mirror`` entity kind
+SPRITES = {
+    mirror.WORKER: (settings.ANT_COLOR, 4),
+    mirror.WORKER_WITH_FOOD: (settings.FOOD_COLOR, 4),
+    mirror.SOLDIER: (settings.SOLDIER_COLOR, 6),
+    mirror.QUEEN: (settings.QUEEN_COLOR, 10),
+    mirror.ENEMY: (settings.ENEMY_COLOR, 6),
+}
+# Transparent sprite background; no entity is this colour
+COLORKEY = (255, 0, 255)
+
+
+def _sprite(color, radius: int) -> pygame.Surface:
+    """A circle the same as ``pygame.draw.circle`` draws, to blit at its
+    top-left corner."""
+    sprite = pygame.Surface((radius * 2, radius * 2))
+    sprite.fill(COLORKEY)
+    pygame.draw.circle(sprite, color, (radius, radius), radius)
+    sprite.set_colorkey(COLORKEY, pygame.RLEACCEL)
+    return sprite
+
+
+class EntityLayer:
+    """Food and entities at full detail, limited to the camera rectangle.
+
+    Food is read from the food grid window under the camera. Entities are
+    gathered as position arrays, masked to the screen with NumPy and drawn
+    from one pre-rendered sprite per kind, so nothing off screen costs a draw
+    call and nothing on screen builds a colour or a circle.
+    """
+
+    def __init__(self, grid_size: int = settings.GRID_SIZE):
+        self.grid_size = grid_size
+        self.food_tile = pygame.Surface((grid_size, grid_size))
+        self.food_tile.fill(settings.FOOD_COLOR)
+        self.sprites = [_sprite(*SPRITES[kind]) for kind in range(len(SPRITES))]
+        self.radii = np.array([SPRITES[kind][1] for kind in range(len(SPRITES))])
+        # What the last draws covered, for reporting what changed
+        self._food = set()
+        self._sprites = []
+
+    def draw_food(self, surface: pygame.Surface) -> list:
+        """Draws the food on screen; returns the screen rects of food tiles
+        that appeared or went since the last draw."""
+        x0, y0, x1, y1 = viewport.cells()
+        xs, ys = np.nonzero(settings.food_locations.grid[x0:x1, y0:y1])
+        size = self.grid_size
+        tile = self.food_tile
+        positions = list(
+            zip(
+                ((x0 + xs) * size - settings.camera_x).tolist(),
+                ((y0 + ys) * size - settings.camera_y).tolist(),
+            )
+        )
+        surface.blits([(tile, position) for position in positions], doreturn=False)
+
+        food = set(positions)
+        changed = food.symmetric_difference(self._food)
+        self._food = food
+        return [pygame.Rect(x, y, size, size) for x, y in changed]
+
+    def draw(self, surface: pygame.Surface) -> list:
+        """Draws every entity on screen with a single ``blits`` call; returns
+        the screen rects entities covered in this draw and the last one."""
+        x0, y0, x1, y1 = viewport.bounds()
+        size = self.grid_size
+        xs, ys, kinds = [], [], []
+        for x, y, kind in mirror.entities():
+            on_screen = np.flatnonzero((x >= x0) & (x < x1) & (y >= y0) & (y < y1))
+            xs.append(x[on_screen])
+            ys.append(y[on_screen])
+            kinds.append(kind[on_screen])
+        if not kinds:
+            rects, self._sprites = self._sprites, []
+            return rects
+
+        kinds = np.concatenate(kinds)
+        radii = self.radii[kinds]
+        xs = (np.concatenate(xs) * size).astype(int) - settings.camera_x - radii
+        ys = (np.concatenate(ys) * size).astype(int) - settings.camera_y - radii
+        sprites = self.sprites
+        drawn = surface.blits(
+            [
+                (sprites[kind], (x, y))
+                for kind, x, y in zip(kinds.tolist(), xs.tolist(), ys.tolist())
+            ]
+        )
+        rects = self._sprites + drawn
+        self._sprites = drawn
+        return rects
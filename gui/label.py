@@ -0,0 +1,39 @@
+from typing import Optional, Tuple
+
+import pygame
+
+from gui import text as labels
+
+TEXT_COLOR = (255, 255, 255)
+
+
+class Label:
+    """Outlined HUD text that only marks itself dirty when it changes."""
+
+    def __init__(self, x: int, y: int, color: Tuple[int, int, int] = TEXT_COLOR):
+        self.x = x
+        self.y = y
+        self.default_color = color
+        self.color = color
+        self.text = ""
+        self.surface = None
+        self.dirty = True
+
+    def set_text(self, text: str, color: Optional[Tuple[int, int, int]] = None):
+        color = self.default_color if color is None else color
+        if text == self.text and color == self.color:
+            return
+        self.text = text
+        self.color = color
+        self.surface = labels.border(text, color) if text else None
+        self.dirty = True
+
+    @property
+    def bounds(self) -> pygame.Rect:
+        if self.surface is None:
+            return pygame.Rect(self.x, self.y, 0, 0)
+        return self.surface.get_rect(topleft=(self.x, self.y))
+
+    def draw(self, surface: pygame.Surface):
+        if self.surface is not None:
+            surface.blit(self.surface, (self.x, self.y))
@@ -0,0 +1,100 @@
+import numpy as np
+import pygame
+
+import settings
+from core import map, mirror, perlin
+from gui import pheromone_layer, viewport
+
+# Ants sharing an overview pixel before it shows the full ant colour
+DENSITY_FULL = 8
+
+
+def _rgb(color) -> np.ndarray:
+    return np.array(pygame.Color(color)[:3], dtype=np.float32)
+
+
+class OverviewLayer:
+    """The world zoomed out, drawn as one image instead of cells and circles.
+
+    The cells under the camera are sampled down to at most one per screen
+    pixel, so the cost follows the screen size however much of the world is
+    in view. Pheromones and food keep the strongest cell of each pixel, and
+    entities are counted per pixel and shaded by density, so trails and
+    crowds stay visible once a single ant would be smaller than a pixel.
+    """
+
+    def __init__(self, grid_size: int = settings.GRID_SIZE):
+        self.grid_size = grid_size
+        self.palette = np.array(
+            [settings.BG_COLOR, settings.WALL_COLOR, settings.STONE_COLOR],
+            dtype=np.float32,
+        )
+        self.food_color = _rgb(settings.FOOD_COLOR)
+        self.pheromone_color = _rgb(pheromone_layer.PHEROMONE_COLOR)
+        self.ant_color = _rgb(settings.ANT_COLOR)
+        self.enemy_color = _rgb(settings.ENEMY_COLOR)
+        self.cells = None
+        self.surface = None
+
+    def _image(self, x0: int, y0: int, x1: int, y1: int, step: int, pheromone_map):
+        terrain = perlin.perlin_settings.map_data[x0:x1:step, y0:y1:step]
+        dirt = map.data[x0:x1:step, y0:y1:step]
+        image = self.palette[np.where(terrain == 1, 2, np.where(dirt == 1, 1, 0))]
+        shape = terrain.shape
+
+        food = _strongest(settings.food_locations.grid[x0:x1, y0:y1], step, shape)
+        image[food] = self.food_color
+
+        strength = _strongest(pheromone_map[x0:x1, y0:y1], step, shape)
+        alpha = np.clip(strength, 0, 1)[..., None]
+        image += (self.pheromone_color - image) * alpha
+
+        ants = np.zeros(shape, dtype=np.int64)
+        enemies = np.zeros(shape, dtype=np.int64)
+        for x, y, kind in mirror.entities():
+            x = np.floor(x).astype(np.int64)
+            y = np.floor(y).astype(np.int64)
+            inside = (x >= x0) & (x < x1) & (y >= y0) & (y < y1)
+            cells = ((x[inside] - x0) // step) * shape[1] + (y[inside] - y0) // step
+            enemy = kind[inside] == mirror.ENEMY
+            ants.flat += np.bincount(cells[~enemy], minlength=ants.size)
+            enemies.flat += np.bincount(cells[enemy], minlength=enemies.size)
+        for counts, color in ((ants, self.ant_color), (enemies, self.enemy_color)):
+            alpha = np.where(counts > 0, 0.4 + 0.6 * counts / DENSITY_FULL, 0)
+            alpha = np.minimum(alpha, 1)[..., None]
+            image += (color - image) * alpha
+        return image.astype(np.uint8)
+
+    def draw(self, surface: pygame.Surface, pheromone_map: np.ndarray):
+        zoom = settings.zoom
+        size = self.grid_size
+        step = max(1, zoom // size)  # cells per image pixel
+        scale = max(1, size // zoom)  # screen pixels per image pixel
+        x0, y0, x1, y1 = viewport.cells()
+        x0 -= x0 % step
+        y0 -= y0 % step
+        if x1 <= x0 or y1 <= y0:
+            return
+
+        pixels = self._image(x0, y0, x1, y1, step, pheromone_map)
+        width, height = pixels.shape[:2]
+        if self.cells is None or self.cells.get_size() != (width, height):
+            self.cells = pygame.Surface((width, height))
+            self.surface = pygame.Surface((width * scale, height * scale))
+        pygame.surfarray.blit_array(self.cells, pixels)
+        if scale == 1:
+            image = self.cells
+        else:
+            pygame.transform.scale(self.cells, self.surface.get_size(), self.surface)
+            image = self.surface
+        surface.blit(image, viewport.to_screen(x0 * size, y0 * size))
+
+
+def _strongest(window: np.ndarray, step: int, shape) -> np.ndarray:
+    """The largest value of each ``step`` x ``step`` block of ``window``,
+    padded out to ``shape`` blocks."""
+    if step == 1:
+        return window
+    padded = np.zeros((shape[0] * step, shape[1] * step), dtype=window.dtype)
+    padded[: window.shape[0], : window.shape[1]] = window
+    return padded.reshape(shape[0], step, shape[1], step).max(axis=(1, 3))
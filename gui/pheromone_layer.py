@@ -0,0 +1,72 @@
+import numpy as np
+import pygame
+
+import settings
+
+PHEROMONE_COLOR = (255, 255, 0)
+# Changed cells are reported as blocks this many cells across
+CHANGE_BLOCK = 8
+
+
+class PheromoneLayer:
+    """Pheromone overlay built straight from the pheromone array.
+
+    Strengths for the cells on screen are written into the alpha channel of a
+    one-pixel-per-cell surface in a single upload, then scaled up to
+    ``grid_size`` into a reused surface, so the cost depends on the screen
+    size rather than the world size or how many cells are marked. The alpha
+    last uploaded is kept, so ``draw`` can report which blocks changed.
+    """
+
+    def __init__(self, grid_size: int = settings.GRID_SIZE):
+        self.grid_size = grid_size
+        # One spare cell each way covers a camera between cell edges
+        self.columns = settings.MONITOR_WIDTH // grid_size + 2
+        self.rows = settings.MONITOR_HEIGHT // grid_size + 2
+        self.cells = pygame.Surface((self.columns, self.rows), pygame.SRCALPHA)
+        self.cells.fill((*PHEROMONE_COLOR, 0))
+        self.surface = pygame.Surface(
+            (self.columns * grid_size, self.rows * grid_size), pygame.SRCALPHA
+        )
+        self._alpha = np.zeros((self.columns, self.rows))
+        self._shown = np.zeros((self.columns, self.rows), dtype=np.uint8)
+        self.origin = (0, 0)
+
+    def update(self, pheromone_map: np.ndarray) -> np.ndarray:
+        """Uploads the strengths under the camera; returns which cells of the
+        overlay changed."""
+        x0 = max(0, settings.camera_x // self.grid_size)
+        y0 = max(0, settings.camera_y // self.grid_size)
+        window = pheromone_map[x0 : x0 + self.columns, y0 : y0 + self.rows]
+        width, height = window.shape
+        self._alpha[width:] = 0
+        self._alpha[:, height:] = 0
+        np.multiply(window, 255, out=self._alpha[:width, :height])
+        np.clip(self._alpha, 0, 255, out=self._alpha)
+        alpha = pygame.surfarray.pixels_alpha(self.cells)
+        alpha[...] = self._alpha
+        changed = alpha != self._shown
+        self._shown[...] = alpha
+        del alpha
+        pygame.transform.scale(self.cells, self.surface.get_size(), self.surface)
+        self.origin = (x0 * self.grid_size, y0 * self.grid_size)
+        return changed
+
+    def draw(self, surface: pygame.Surface, pheromone_map: np.ndarray) -> list:
+        """Draws the overlay; returns the screen rects of blocks that changed
+        since the last draw."""
+        changed = self.update(pheromone_map)
+        left = self.origin[0] - settings.camera_x
+        top = self.origin[1] - settings.camera_y
+        surface.blit(self.surface, (left, top))
+
+        block = CHANGE_BLOCK
+        columns, rows = -(-self.columns // block), -(-self.rows // block)
+        padded = np.zeros((columns * block, rows * block), dtype=bool)
+        padded[: self.columns, : self.rows] = changed
+        blocks = padded.reshape(columns, block, rows, block).any(axis=(1, 3))
+        size = block * self.grid_size
+        return [
+            pygame.Rect(left + x * size, top + y * size, size, size)
+            for x, y in zip(*np.nonzero(blocks))
+        ]
@@ -0,0 +1,58 @@
+import pygame
+
+import settings
+
+# Past this share of the screen changed, one flip is cheaper than the rects
+FULL_FLIP_AREA = 0.5
+# Past this many changed rects, one flip is cheaper than the rects
+FULL_FLIP_RECTS = 400
+
+
+class Presenter:
+    """Puts each drawn frame on the display, pushing only what changed.
+
+    Layers report the screen rects they repainted through ``add`` and
+    ``present`` hands just those to ``pygame.display.update``. Anything that
+    moves the whole picture (the camera, the zoom or ``invalidate``), or a
+    frame where too much changed, falls back to ``pygame.display.flip``, as
+    does every frame when ``enabled`` is off.
+    """
+
+    def __init__(self, enabled: bool = settings.DIRTY_RECTS):
+        self.enabled = enabled
+        self.rects = []
+        self.full = True
+        self.camera = None
+
+    def add(self, rects):
+        if self.enabled and not self.full:
+            self.rects.extend(rects)
+
+    def invalidate(self):
+        """Makes the next frame a full flip."""
+        self.full = True
+        self.rects = []
+
+    def _changed(self, screen: pygame.Rect):
+        # The changed rects, or None when a flip is cheaper
+        camera = (settings.camera_x, settings.camera_y, settings.zoom)
+        if camera != self.camera:
+            self.camera = camera
+            return None
+        if self.full or not self.enabled or len(self.rects) > FULL_FLIP_RECTS:
+            return None
+        rects = [rect.clip(screen) for rect in self.rects]
+        rects = [rect for rect in rects if rect.width and rect.height]
+        area = sum(rect.width * rect.height for rect in rects)
+        if area > FULL_FLIP_AREA * screen.width * screen.height:
+            return None
+        return rects
+
+    def present(self):
+        rects = self._changed(pygame.display.get_surface().get_rect())
+        if rects is None:
+            pygame.display.flip()
+        elif rects:
+            pygame.display.update(rects)
+        self.full = False
+        self.rects = []
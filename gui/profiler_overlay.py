@@ -0,0 +1,74 @@
+import pygame
+
+from core import profiling
+
+BACKGROUND = (0, 0, 0, 170)
+TEXT_COLOR = (255, 255, 255)
+SLOW_COLOR = (255, 96, 96)
+PADDING = 6
+# Frames between text refreshes; rendering text every frame would skew ui_draw
+REFRESH_FRAMES = 15
+
+
+class ProfilerOverlay:
+    """Table of rolling mean/p95/p99 phase times, toggled with ``toggle``."""
+
+    def __init__(
+        self,
+        profiler: profiling.FrameProfiler,
+        x: int,
+        y: int,
+        frame_budget_ms: float = 1000 / 60,
+    ):
+        self.profiler = profiler
+        self.x = x
+        self.y = y
+        self.frame_budget_ms = frame_budget_ms
+        self.visible = False
+        self.font = pygame.font.SysFont("monospace", 14)
+        self.surface = None
+        self._rendered_at = None
+        self._shown = None  # screen rect of the table as last drawn
+
+    def toggle(self):
+        self.visible = not self.visible
+        self._rendered_at = None
+
+    def _render(self) -> pygame.Surface:
+        stats = self.profiler.stats()
+        rows = [f"{'phase':<16}{'avg':>8}{'p95':>8}{'p99':>8}"]
+        colors = [TEXT_COLOR]
+        for name in ("frame",) + self.profiler.phases:
+            mean, p95, p99 = stats[name]
+            rows.append(f"{name:<16}{mean:8.2f}{p95:8.2f}{p99:8.2f}")
+            slow = name == "frame" and p95 > self.frame_budget_ms
+            colors.append(SLOW_COLOR if slow else TEXT_COLOR)
+
+        lines = [self.font.render(row, True, color) for row, color in zip(rows, colors)]
+        line_height = self.font.get_linesize()
+        width = max(line.get_width() for line in lines) + PADDING * 2
+        height = line_height * len(lines) + PADDING * 2
+
+        surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        surface.fill(BACKGROUND)
+        for i, line in enumerate(lines):
+            surface.blit(line, (PADDING, PADDING + i * line_height))
+        return surface
+
+    def draw(self, surface: pygame.Surface) -> list:
+        """Draws the table; returns the screen rects that look different from
+        the last draw."""
+        previous, self._shown = self._shown, None
+        if not self.visible:
+            return [] if previous is None else [previous]
+        frames = self.profiler.frames
+        refreshed = (
+            self._rendered_at is None or frames - self._rendered_at >= REFRESH_FRAMES
+        )
+        if refreshed:
+            self.surface = self._render()
+            self._rendered_at = frames
+        self._shown = surface.blit(self.surface, (self.x, self.y))
+        if not refreshed:
+            return []
+        return [self._shown] if previous is None else [previous, self._shown]
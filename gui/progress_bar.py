@@ -3,6 +3,7 @@ from typing import Tuple
 import pygame
 
 from core import logging
+from gui import text
 
 PROGRESSBAR_HEIGHT = 20
 BORDER_WIDTH = 2
@@ -30,15 +31,24 @@ class ProgressBar:
         self.max_value = max_value
         self.value = self._clamp_value(initial_value)
         self.label = label
-        self.font = pygame.font.Font(None, 24)
+        self.font = text.get_font(24)
+        self.dirty = True
 
         logging.info(
-            f"ProgressBar '{label}' initialized at ({x}, {y}) with value {self.value}"
+            "ProgressBar '%s' initialized at (%s, %s) with value %s",
+            label,
+            x,
+            y,
+            self.value,
         )
 
     def _clamp_value(self, value: float) -> float:
         return max(self.min_value, min(self.max_value, value))
 
+    @property
+    def bounds(self) -> pygame.Rect:
+        return self.rect.inflate(BORDER_WIDTH * 2, BORDER_WIDTH * 2)
+
     def draw(self, surface: pygame.Surface):
         pygame.draw.rect(
             surface,
@@ -61,12 +71,16 @@ class ProgressBar:
         )
 
     def set_value(self, value: float):
-        old_value = self.value
-        self.value = self._clamp_value(value)
-        if old_value != self.value:
-            logging.debug(
-                f"ProgressBar '{self.label}' value updated to {self.value:.2f}"
-            )
+        value = self._clamp_value(value)
+        if value != self.value:
+            self.value = value
+            self.dirty = True
+
+    def set_max_value(self, max_value: float):
+        if max_value != self.max_value:
+            self.max_value = max_value
+            self.value = self._clamp_value(self.value)
+            self.dirty = True
 
     def get_value(self) -> float:
         return self.value
@@ -34,8 +34,9 @@ class Slider:
         self.handle_rect = self._calculate_handle_rect()
         self.dragging = False
         self.is_hovered = False
+        self.dirty = True
 
-        logging.info(f"Slider initialized at ({x}, {y}) with value {self.value:.2f}")
+        logging.info("Slider initialized at (%s, %s) with value %.2f", x, y, self.value)
 
     def _clamp_value(self, value: float) -> float:
         return max(self.min_value, min(self.max_value, value))
@@ -51,6 +52,13 @@ class Slider:
             handle_x - HANDLE_WIDTH // 2, self.rect.y, HANDLE_WIDTH, SLIDER_HEIGHT
         )
 
+    @property
+    def bounds(self) -> pygame.Rect:
+        """Everything ``draw`` covers; the handle overhangs the ends."""
+        return self.rect.inflate(BORDER_WIDTH * 2, BORDER_WIDTH * 2).union(
+            self.handle_rect
+        )
+
     def draw(self, surface: pygame.Surface):
         pygame.draw.rect(
             surface,
@@ -70,7 +78,7 @@ class Slider:
             return True
         elif event.type == pygame.MOUSEBUTTONUP and self.dragging:
             self.dragging = False
-            logging.info(f"Slider value set to {self.value:.2f}")
+            logging.info("Slider value set to %.2f", self.value)
             return True
         elif event.type == pygame.MOUSEMOTION and self.dragging:
             self.is_hovered = self.rect.collidepoint(event.pos)
@@ -84,6 +92,7 @@ class Slider:
             self.max_value - self.min_value
         )
         self.handle_rect = self._calculate_handle_rect()
+        self.dirty = True
 
     def get_value(self) -> float:
         return self.value
@@ -91,6 +100,7 @@ class Slider:
     def set_value(self, value: float):
         self.value = self._clamp_value(value)
         self.handle_rect = self._calculate_handle_rect()
+        self.dirty = True
 
     def get_dimensions(self) -> Tuple[int, int, int, int]:
         return self.rect.x, self.rect.y, self.rect.width, self.rect.height
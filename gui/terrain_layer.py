@@ -0,0 +1,151 @@
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+
+import settings
+from core import logging, map, perlin
+
+# Past this many changed cells one region upload beats per-cell fills
+PARTIAL_FILL_LIMIT = 256
+# Strip surfaces kept beyond the ones on screen, for scrolling back
+SPARE_STRIPS = 4
+
+
+class TerrainLayer:
+    """Rendered terrain, cached as one surface per ``CHUNK_WIDTH`` strip.
+
+    Strips are rendered when they first come into view, and the least
+    recently drawn ones beyond ``SPARE_STRIPS`` off screen are dropped, so
+    memory follows the screen rather than the world. Listens for terrain
+    changes through ``map.subscribe`` and only repaints the cells that
+    changed, so drawing the terrain each frame is one blit per visible strip.
+    """
+
+    def __init__(self, grid_size: int = settings.GRID_SIZE):
+        self.grid_size = grid_size
+        self.strip_width = settings.CHUNK_WIDTH
+        self.strips = OrderedDict()
+        self.dirty = np.zeros((settings.MAP_WIDTH, settings.MAP_HEIGHT), dtype=bool)
+        self.dirty_strips = set()
+        self.palette = np.array(
+            [settings.BG_COLOR, settings.WALL_COLOR, settings.STONE_COLOR],
+            dtype=np.uint8,
+        )
+        map.subscribe(self._on_terrain_changed)
+
+    def _on_terrain_changed(self, xs, ys):
+        if xs is None:
+            self.strips.clear()
+            self.dirty_strips.clear()
+            self.dirty[:] = False
+        else:
+            self.dirty[xs, ys] = True
+            self.dirty_strips.update(
+                np.unique(np.atleast_1d(xs) // self.strip_width).tolist()
+            )
+
+    def _colors(self, region=(slice(None), slice(None))) -> np.ndarray:
+        # Stone is drawn over dirt, dirt over the background
+        stone = perlin.perlin_settings.map_data[region] == 1
+        dirt = map.data[region] == 1
+        return self.palette[np.where(stone, 2, np.where(dirt, 1, 0))]
+
+    def _upload(self, strip, x0: int, y0: int, colors: np.ndarray):
+        size = self.grid_size
+        pixels = colors.repeat(size, axis=0).repeat(size, axis=1)
+        target = strip.subsurface(
+            (x0 * size, y0 * size, pixels.shape[0], pixels.shape[1])
+        )
+        pygame.surfarray.blit_array(target, pixels)
+
+    def _columns(self, index: int):
+        x0 = index * self.strip_width
+        return x0, min(x0 + self.strip_width, settings.MAP_WIDTH)
+
+    def _render(self, index: int) -> pygame.Surface:
+        x0, x1 = self._columns(index)
+        size = self.grid_size
+        strip = pygame.Surface(((x1 - x0) * size, settings.MAP_HEIGHT * size))
+        self._upload(strip, 0, 0, self._colors((slice(x0, x1), slice(None))))
+        self.dirty[x0:x1] = False
+        self.dirty_strips.discard(index)
+        logging.debug("Terrain strip %s rendered", index)
+        return strip
+
+    def _repaint(self, index: int) -> list:
+        x0, x1 = self._columns(index)
+        xs, ys = np.nonzero(self.dirty[x0:x1])
+        self.dirty_strips.discard(index)
+        if not len(xs):
+            return []
+        self.dirty[x0 + xs, ys] = False
+
+        strip = self.strips[index]
+        size = self.grid_size
+        if len(xs) <= PARTIAL_FILL_LIMIT:
+            colors = self._colors((x0 + xs, ys))
+            rects = []
+            for x, y, color in zip(xs, ys, colors):
+                rect = pygame.Rect(x * size, y * size, size, size)
+                strip.fill(color, rect)
+                rects.append(rect.move(x0 * size, 0))
+            return rects
+
+        left, right = xs.min(), xs.max() + 1
+        top, bottom = ys.min(), ys.max() + 1
+        colors = self._colors((slice(x0 + left, x0 + right), slice(top, bottom)))
+        self._upload(strip, left, top, colors)
+        return [
+            pygame.Rect(
+                (x0 + left) * size,
+                top * size,
+                (right - left) * size,
+                (bottom - top) * size,
+            )
+        ]
+
+    def visible_strips(self) -> range:
+        size = self.grid_size * self.strip_width
+        first = max(0, settings.camera_x // size)
+        last = min(
+            -(-settings.MAP_WIDTH // self.strip_width),
+            -(-(settings.camera_x + settings.MONITOR_WIDTH) // size),
+        )
+        return range(first, last)
+
+    def update(self):
+        """Renders strips coming into view and repaints changed cells; returns
+        the repainted areas as world-pixel rects."""
+        rects = []
+        size = self.grid_size
+        for index in self.visible_strips():
+            if index not in self.strips:
+                self.strips[index] = self._render(index)
+                x0, x1 = self._columns(index)
+                rects.append(
+                    pygame.Rect(
+                        x0 * size, 0, (x1 - x0) * size, settings.MAP_HEIGHT * size
+                    )
+                )
+            elif index in self.dirty_strips:
+                rects.extend(self._repaint(index))
+            self.strips.move_to_end(index)
+
+        visible = len(self.visible_strips())
+        while len(self.strips) > visible + SPARE_STRIPS:
+            self.strips.popitem(last=False)
+        return rects
+
+    def draw(self, surface: pygame.Surface) -> list:
+        """Draws the strips on screen; returns the screen rects repainted since
+        the last draw."""
+        rects = self.update()
+        size = self.grid_size
+        for index in self.visible_strips():
+            x0, _ = self._columns(index)
+            surface.blit(
+                self.strips[index],
+                (x0 * size - settings.camera_x, -settings.camera_y),
+            )
+        return [rect.move(-settings.camera_x, -settings.camera_y) for rect in rects]
@@ -1,19 +1,61 @@
+from collections import OrderedDict
+
 import pygame
 
+DEFAULT_FONT_SIZE = 36
+# Rendered labels kept; covers every HUD label with room for changing values
+TEXT_CACHE_SIZE = 256
+_fonts = {}
+_rendered = OrderedDict()
+
+
+def get_font(size: int = DEFAULT_FONT_SIZE, name: str = None) -> pygame.font.Font:
+    """The shared font ``name`` (the default font if None) at ``size``, created
+    on first use."""
+    key = (name, size)
+    if key not in _fonts:
+        _fonts[key] = pygame.font.Font(name, size)
+    return _fonts[key]
+
+
+def _cached(key, render) -> pygame.Surface:
+    if key in _rendered:
+        _rendered.move_to_end(key)
+        return _rendered[key]
+    surface = render()
+    _rendered[key] = surface
+    if len(_rendered) > TEXT_CACHE_SIZE:
+        _rendered.popitem(last=False)
+    return surface
+
+
+def none(text, color, font=None):
+    """``text`` rendered in ``color``.
+
+    Surfaces are cached and shared between callers, so blit them but never
+    draw on them.
+    """
+    font = font or get_font()
+    color = tuple(pygame.Color(color))
+    return _cached(
+        ("none", text, color, font), lambda: font.render(text, True, color)
+    )
+
 
-def none(text, color, font=pygame.font.Font(None, 36)):
-    text_surface = font.render(text, True, color)
-    return text_surface
+def border(text, color, border_color=(0, 0, 0), border_size=2, font=None):
+    """``text`` in ``color`` outlined in ``border_color``; cached like
+    ``none``."""
+    font = font or get_font()
+    color = tuple(pygame.Color(color))
+    border_color = tuple(pygame.Color(border_color))
 
+    def render():
+        text_surface = font.render(text, True, color)
+        outline = font.render(text, True, border_color)
+        border_surface = pygame.Surface(text_surface.get_size(), pygame.SRCALPHA)
+        for dx, dy in [(-1, -1), (-1, 1), (1, -1), (1, 1)]:
+            border_surface.blit(outline, (dx * border_size, dy * border_size))
+        border_surface.blit(text_surface, (0, 0))
+        return border_surface
 
-def border(
-    text, color, border_color=(0, 0, 0), border_size=2, font=pygame.font.Font(None, 36)
-):
-    text_surface = font.render(text, True, color)
-    border_surface = pygame.Surface(text_surface.get_size(), pygame.SRCALPHA)
-    for dx, dy in [(-1, -1), (-1, 1), (1, -1), (1, 1)]:
-        border_surface.blit(
-            font.render(text, True, border_color), (dx * border_size, dy * border_size)
-        )
-    border_surface.blit(text_surface, (0, 0))
-    return border_surface
+    return _cached(("border", text, color, border_color, border_size, font), render)
@@ -0,0 +1,90 @@
+import pygame
+
+import settings
+
+CLEAR = (0, 0, 0, 0)
+
+
+class UILayer:
+    """Retained widgets composited onto one cached overlay.
+
+    A widget is anything with a ``bounds`` rect, a ``dirty`` flag it sets when
+    it looks different and a ``draw(surface)``. Only dirty widgets, and
+    whatever shares their area, are redrawn onto the overlay, clipped to the
+    changed area so nothing is blended twice; a frame where nothing changed
+    costs one ``blits`` call copying the widget areas of the overlay.
+    """
+
+    def __init__(self, size=None):
+        size = size or (settings.MONITOR_WIDTH, settings.MONITOR_HEIGHT)
+        self.overlay = pygame.Surface(size, pygame.SRCALPHA)
+        self.overlay.fill(CLEAR)
+        self.widgets = []
+        self.visible = {}
+        self.drawn = {}  # widget -> bounds when it was last composited
+        self.regions = []  # disjoint rects covering everything on the overlay
+
+    def add(self, *widgets, visible: bool = True):
+        """Adds ``widgets``, drawn in order, over the ones already added."""
+        for widget in widgets:
+            self.widgets.append(widget)
+            self.visible[widget] = visible
+            widget.dirty = True
+
+    def show(self, *widgets, visible: bool = True):
+        for widget in widgets:
+            if self.visible[widget] != visible:
+                self.visible[widget] = visible
+                widget.dirty = True
+
+    def update(self) -> list:
+        """Recomposites changed widgets; returns the screen rects that changed."""
+        changed = []
+        for widget in self.widgets:
+            if not widget.dirty:
+                continue
+            widget.dirty = False
+            old = self.drawn.pop(widget, None)
+            if old is not None:
+                changed.append(old)
+            if self.visible[widget]:
+                self.drawn[widget] = widget.bounds
+                changed.append(self.drawn[widget])
+        if not changed:
+            return []
+
+        area = self.overlay.get_rect()
+        changed = [rect.clip(area) for rect in changed if rect.colliderect(area)]
+        for rect in changed:
+            self.overlay.set_clip(rect)
+            self.overlay.fill(CLEAR)
+            for widget in self.widgets:
+                if self.visible[widget] and widget.bounds.colliderect(rect):
+                    widget.draw(self.overlay)
+        self.overlay.set_clip(None)
+
+        self.regions = _merged(self.drawn.values())
+        return changed
+
+    def draw(self, surface: pygame.Surface) -> list:
+        changed = self.update()
+        overlay = self.overlay
+        surface.blits(
+            [(overlay, rect.topleft, rect) for rect in self.regions], doreturn=False
+        )
+        return changed
+
+
+def _merged(rects) -> list:
+    """``rects`` with overlapping ones joined, so no pixel is covered twice."""
+    merged = []
+    for rect in rects:
+        if not (rect.width and rect.height):
+            continue
+        rect = rect.copy()
+        index = rect.collidelist(merged)
+        while index >= 0:
+            rect.union_ip(merged.pop(index))
+            index = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
@@ -0,0 +1,41 @@
+import settings
+
+
+def bounds(margin: int = 1):
+    """``(x0, y0, x1, y1)``, the map cells on screen plus ``margin`` each way.
+
+    Not clamped to the map, since entities can stand above it, at the nest.
+    """
+    size = settings.GRID_SIZE
+    zoom = settings.zoom
+    return (
+        settings.camera_x // size - margin,
+        settings.camera_y // size - margin,
+        -(-(settings.camera_x + settings.MONITOR_WIDTH * zoom) // size) + margin,
+        -(-(settings.camera_y + settings.MONITOR_HEIGHT * zoom) // size) + margin,
+    )
+
+
+def cells(margin: int = 1):
+    """``bounds`` clamped to the map, for slicing the world arrays."""
+    x0, y0, x1, y1 = bounds(margin)
+    return (
+        max(0, x0),
+        max(0, y0),
+        max(0, min(settings.MAP_WIDTH, x1)),
+        max(0, min(settings.MAP_HEIGHT, y1)),
+    )
+
+
+def to_screen(x: float, y: float):
+    """Screen position of world pixel ``(x, y)``."""
+    return (
+        int(x - settings.camera_x) // settings.zoom,
+        int(y - settings.camera_y) // settings.zoom,
+    )
+
+
+def to_world(pos):
+    """Screen position ``pos`` as world pixels from the camera, the way tools
+    read mouse positions."""
+    return pos[0] * settings.zoom, pos[1] * settings.zoom
@@ -0,0 +1,160 @@
+import argparse
+import os
+import random
+import time
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run the ant colony without a display and report ticks/sec."
+    )
+    parser.add_argument("--width", type=int, default=1920, help="screen width (px)")
+    parser.add_argument("--height", type=int, default=1080, help="screen height (px)")
+    parser.add_argument(
+        "--world-width", type=int, default=None, help="world width in cells"
+    )
+    parser.add_argument(
+        "--world-height", type=int, default=None, help="world height in cells"
+    )
+    parser.add_argument("--ticks", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=50)
+    parser.add_argument("--soldiers", type=int, default=10)
+    parser.add_argument("--queens", type=int, default=1)
+    parser.add_argument("--enemies", type=int, default=0)
+    parser.add_argument("--food", type=int, default=0)
+    parser.add_argument("--speed", type=float, default=0.5)
+    parser.add_argument("--threshold", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument(
+        "--engine", default="objects", choices=["objects", "vector", "parallel"]
+    )
+    parser.add_argument(
+        "--processes", type=int, default=None, help="pool size for --engine parallel"
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="CSV",
+        help="write per-tick phase timings to CSV and print a summary",
+    )
+    parser.add_argument("--load", metavar="PATH", help="resume from a save file")
+    parser.add_argument("--save", metavar="PATH", help="save the colony when done")
+    parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        default=0,
+        metavar="TICKS",
+        help="also save to --save every TICKS ticks",
+    )
+    parser.add_argument("--record", metavar="PATH", help="record a replay to PATH")
+    parser.add_argument(
+        "--keyframe-every",
+        type=int,
+        default=None,
+        metavar="TICKS",
+        help="ticks between full frames in --record (default: settings)",
+    )
+    parser.add_argument(
+        "--log-level", default="INFO", choices=["DEBUG", "INFO", "WARN", "ERROR"]
+    )
+    args = parser.parse_args(argv)
+    if args.checkpoint_every and not args.save:
+        parser.error("--checkpoint-every needs --save")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # Must be set before settings is imported
+    os.environ["ANT_SIM_WIDTH"] = str(args.width)
+    os.environ["ANT_SIM_HEIGHT"] = str(args.height)
+    if args.world_width:
+        os.environ["ANT_SIM_WORLD_WIDTH"] = str(args.world_width)
+    if args.world_height:
+        os.environ["ANT_SIM_WORLD_HEIGHT"] = str(args.world_height)
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+    import settings
+    from core import logging, perlin, profiling
+    from core import simulation as sim
+    from entities import enemy_soldier
+
+    logging.setup(args.log_level)
+    settings.PARALLEL_PROCESSES = args.processes
+
+    seed = args.seed if args.seed is not None else random.randint(0, 2147483647)
+    random.seed(seed)
+
+    profiler = profiling.FrameProfiler(window=args.ticks, csv_path=args.profile)
+    simulation = sim.Simulation(
+        queen_enabled=args.queens > 0,
+        engine=args.engine,
+        profiler=profiler if args.profile else None,
+    )
+    settings.ui_visible = False
+    if args.load:
+        simulation.load(args.load)
+        seed = perlin.perlin_settings.seed
+    else:
+        simulation.generate(seed, args.threshold)
+        simulation.scatter_food(args.food)
+        simulation.populate(args.workers, args.soldiers, args.queens, args.speed)
+
+        for _ in range(args.enemies):
+            settings.enemies.append(
+                enemy_soldier.EnemySoldier(
+                    random.randrange(settings.MAP_WIDTH),
+                    random.randrange(1, settings.MAP_HEIGHT),
+                    (settings.MONITOR_WIDTH // 2, settings.MONITOR_HEIGHT // 2),
+                    args.speed,
+                )
+            )
+
+    if args.record:
+        simulation.start_recording(args.record, args.keyframe_every)
+
+    def advance(ticks):
+        if args.profile:
+            for _ in range(ticks):
+                profiler.begin_frame()
+                simulation.step()
+                profiler.end_frame()
+        else:
+            simulation.step(ticks)
+
+    logging.info(
+        "Running %s ticks on a %sx%s map (seed %s)",
+        args.ticks,
+        settings.MAP_WIDTH,
+        settings.MAP_HEIGHT,
+        seed,
+    )
+    start = time.perf_counter()
+    remaining = args.ticks
+    while remaining > 0:
+        ticks = min(args.checkpoint_every or remaining, remaining)
+        advance(ticks)
+        remaining -= ticks
+        if args.checkpoint_every and remaining > 0:
+            simulation.save(args.save)
+    elapsed = time.perf_counter() - start
+    simulation.stop_recording()
+    if args.save:
+        simulation.save(args.save)
+
+    rate = args.ticks / elapsed if elapsed > 0 else float("inf")
+    print(
+        f"{args.ticks} ticks in {elapsed:.3f}s ({rate:.1f} ticks/sec) | "
+        f"workers: {simulation.worker_count} | food collected: {settings.collected_food}"
+    )
+    if args.profile:
+        profiler.close()
+        stats = profiler.stats()
+        for name in ("frame", "workers", "colony", "enemies", "pheromone_decay"):
+            mean, p95, p99 = stats[name]
+            print(f"{name:<16} avg {mean:7.3f}ms  p95 {p95:7.3f}ms  p99 {p99:7.3f}ms")
+    return rate
+
+
+if __name__ == "__main__":
+    main()
@@ -2,12 +2,13 @@ import os
 import platform
 import random
 import sys
+from datetime import datetime
 
 import pygame
 
 import settings
-from core import logging, map, perlin
-from entities import queen, soldier, worker
+from core import logging, perlin, profiling, replay, scheduler, simulation_process
+from core import simulation as sim
 from tools import (
     ant as ant2,
 )
@@ -29,7 +30,6 @@ logging.setup("DEBUG")
 pygame.init()
 
 logging.info("Pygame initialized.")
-font = pygame.font.Font(None, 36)
 
 pygame.display.set_caption("Ant Simulator")
 screen = pygame.display.set_mode(
@@ -43,57 +43,148 @@ if platform.system() == "Windows":
     os.environ["CUDA_VISIBLE_DEVICES"] = "0"
     os.environ["NVD_BACKEND"] = "dx11"
 
-from gui import button, progress_bar, slider, text
+from gui import (
+    button,
+    entity_layer,
+    label,
+    overview_layer,
+    pheromone_layer,
+    presenter,
+    profiler_overlay,
+    progress_bar,
+    slider,
+    terrain_layer,
+    ui_layer,
+    viewport,
+)
 
 icon = pygame.image.load("assets/icon.png").convert_alpha()
 pygame.display.set_icon(icon)
 logging.info("Window and icon initialized.")
 
 seed_button_value = perlin.perlin_settings.seed
+profiler = profiling.FrameProfiler(
+    csv_path=settings.PROFILE_DIR and profiling.run_csv_path(settings.PROFILE_DIR)
+)
+profiler_hud = profiler_overlay.ProfilerOverlay(
+    profiler, settings.MONITOR_WIDTH - 360, 10, 1000 / settings.FPS
+)
+if settings.REPLAY_PATH:
+    simulation = replay.Player(settings.REPLAY_PATH)
+    tick_scheduler = scheduler.TickScheduler()
+    settings.ui_visible = False
+elif settings.BACKGROUND_SIMULATION:
+    simulation = simulation_process.SimulationProcess(engine=settings.WORKER_ENGINE)
+    tick_scheduler = simulation.scheduler
+else:
+    simulation = sim.Simulation(engine=settings.WORKER_ENGINE, profiler=profiler)
+    tick_scheduler = scheduler.TickScheduler()
+clock = pygame.time.Clock()
+frame_time = 0.0
+terrain = terrain_layer.TerrainLayer()
+pheromones = pheromone_layer.PheromoneLayer()
+display = presenter.Presenter()
+entities = entity_layer.EntityLayer()
+overview = overview_layer.OverviewLayer()
 
 
 def generate_map():
     global seed_button_value
     seed_button_value = random.randint(-2147483647, 2147483647)
-    settings.food_locations = set()
-    perlin.regenerate(seed_button_value, threshold_slider)
+    simulation.generate(seed_button_value, threshold_slider.value)
 
 
-def start():
+def save_colony():
+    os.makedirs(os.path.dirname(settings.SAVE_PATH), exist_ok=True)
+    try:
+        simulation.save(settings.SAVE_PATH)
+    except OSError as e:
+        logging.error("Could not save to %s: %s", settings.SAVE_PATH, e)
+
+
+def load_colony():
+    try:
+        simulation.load(settings.SAVE_PATH)
+    except (OSError, ValueError) as e:
+        logging.error("Could not load %s: %s", settings.SAVE_PATH, e)
+        return
     settings.ui_visible = False
-    settings.ants = [
-        worker.Ant(
-            settings.nest_location[0],
-            settings.nest_location[1],
-            settings.nest_location,
-            settings.pheromone_map,
-            speed_slider.value,
-            random.choices([0, 1, 2], weights=[4, 2, 1])[0],
-        )
-        for _ in range(int(settings.ant_slider.value))
-    ]
-    settings.soldiers = [
-        soldier.Soldier(
-            settings.nest_location[0],
-            settings.nest_location[1],
-            settings.nest_location,
-            settings.pheromone_map,
-            speed_slider.value,
-        )
-        for _ in range(int(soldier_slider.value))
-    ]
-    settings.queen = [
-        queen.Queen(
-            settings.nest_location[0],
-            settings.nest_location[1],
-            settings.nest_location,
-            settings.pheromone_map,
-            speed_slider.value,
+
+
+def toggle_recording():
+    if simulation.recording:
+        simulation.stop_recording()
+        return
+    os.makedirs(settings.REPLAY_DIR, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(settings.REPLAY_DIR, f"{stamp}.antreplay")
+    try:
+        simulation.start_recording(path)
+    except OSError as e:
+        logging.error("Could not record to %s: %s", path, e)
+
+
+def _clamp(position: int, low: int, high: int, visible: int) -> int:
+    # Centres the span when all of it fits on screen
+    if high - low <= visible:
+        return (low + high - visible) // 2
+    return max(low, min(high - visible, position))
+
+
+def scroll(dx: int, dy: int):
+    """Moves the camera by screen pixels, keeping it over the world or the sky
+    above it."""
+    zoom = settings.zoom
+    settings.camera_x = _clamp(
+        settings.camera_x + dx * zoom,
+        0,
+        settings.MAP_WIDTH * settings.GRID_SIZE,
+        settings.MONITOR_WIDTH * zoom,
+    )
+    settings.camera_y = _clamp(
+        settings.camera_y + dy * zoom,
+        -settings.SKY_HEIGHT,
+        settings.MAP_HEIGHT * settings.GRID_SIZE,
+        settings.MONITOR_HEIGHT * zoom,
+    )
+
+
+def zoom_by(steps: int):
+    """Moves ``steps`` along ``settings.ZOOM_LEVELS`` (positive zooms out),
+    keeping the middle of the screen in place."""
+    levels = settings.ZOOM_LEVELS
+    index = max(0, min(len(levels) - 1, levels.index(settings.zoom) + steps))
+    middle_x = settings.camera_x + settings.MONITOR_WIDTH * settings.zoom // 2
+    middle_y = settings.camera_y + settings.MONITOR_HEIGHT * settings.zoom // 2
+    settings.zoom = levels[index]
+    settings.camera_x = middle_x - settings.MONITOR_WIDTH * settings.zoom // 2
+    settings.camera_y = middle_y - settings.MONITOR_HEIGHT * settings.zoom // 2
+    scroll(0, 0)
+
+
+def zoom_levels(image: pygame.Surface) -> dict:
+    """``image`` scaled down for each of ``settings.ZOOM_LEVELS``."""
+    width, height = image.get_size()
+    return {
+        zoom: pygame.transform.smoothscale(
+            image, (max(1, width // zoom), max(1, height // zoom))
         )
-        for _ in range(1)
-    ]
-    settings.total_food = len(settings.food_locations)
-    settings.collected_food = 0
+        for zoom in settings.ZOOM_LEVELS
+    }
+
+
+def seek(seconds: float):
+    simulation.seek(simulation.tick + int(seconds * settings.TICK_RATE))
+
+
+def start():
+    settings.ui_visible = False
+    simulation.populate(
+        int(settings.ant_slider.value),
+        int(soldier_slider.value),
+        1,
+        speed_slider.value,
+    )
 
 
 threshold_slider = slider.Slider(
@@ -129,31 +220,159 @@ start_button = button.Button(
     on_click=start,
 )
 
+threshold_label = label.Label(320, 9)
+seed_label = label.Label(320, 54)
+tool_label = label.Label(10, settings.MONITOR_HEIGHT - 30)
+workers_label = label.Label(320, 99)
+soldiers_label = label.Label(320, 139)
+queen_label = label.Label(320, 179)
+speed_label = label.Label(320, 219)
+food_label = label.Label(320, 99)
+sim_speed_label = label.Label(10, settings.MONITOR_HEIGHT - 60)
+status_label = label.Label(10, settings.MONITOR_HEIGHT - 90)
+
+TOOL_NAMES = {
+    1: "Food",
+    2: "Workers",
+    3: "Soldiers",
+    4: "Enemy",
+    5: "Magnet",
+    6: "Wall",
+    7: "Floor",
+}
+
+# Widgets shown while setting up the colony, and while it runs
+setup_widgets = (
+    settings.ant_slider,
+    soldier_slider,
+    queen_slider,
+    speed_slider,
+    start_button,
+    workers_label,
+    soldiers_label,
+    queen_label,
+    speed_label,
+)
+running_widgets = (food_progressbar, food_label, sim_speed_label, status_label)
+ui = ui_layer.UILayer()
+ui.add(threshold_slider, seed_button, threshold_label, seed_label, tool_label)
+ui.add(*setup_widgets)
+ui.add(*running_widgets, visible=False)
+
 sun_image = pygame.image.load("assets/sun.png").convert_alpha()
-sun_image = pygame.transform.scale(sun_image, (300, 300))
+sun_image = zoom_levels(pygame.transform.scale(sun_image, (300, 300)))
 
 ant_nest = pygame.image.load("assets/nest.png").convert_alpha()
-ant_nest = pygame.transform.scale(ant_nest, (100, 50))
+ant_nest = zoom_levels(pygame.transform.scale(ant_nest, (100, 50)))
 
-logging.info("Game loop started.")
-while settings.running:
+
+def draw_frame():
     screen.fill("#87CEEB")
     pygame.draw.rect(
         screen,
         settings.BG_COLOR,
         (
-            0 - settings.camera_x,
-            0 - settings.camera_y,
-            settings.MONITOR_WIDTH,
-            settings.MONITOR_HEIGHT,
+            viewport.to_screen(0, 0),
+            (
+                settings.MAP_WIDTH * settings.GRID_SIZE // settings.zoom,
+                settings.MAP_HEIGHT * settings.GRID_SIZE // settings.zoom,
+            ),
+        ),
+    )
+
+    detailed = settings.zoom == settings.ZOOM_LEVELS[0]
+    if detailed:
+        display.add(terrain.draw(screen))
+    profiler.lap("terrain_draw")
+
+    if detailed:
+        display.add(entities.draw_food(screen))
+        profiler.lap("entity_draw")
+
+        display.add(pheromones.draw(screen, settings.pheromones.food))
+        profiler.lap("pheromone_draw")
+    else:
+        overview.draw(screen, settings.pheromones.food)
+        display.invalidate()
+        profiler.lap("overview_draw")
+
+    nest_x = settings.nest_location[0] * settings.GRID_SIZE
+    screen.blit(
+        sun_image[settings.zoom],
+        viewport.to_screen(nest_x + settings.MONITOR_WIDTH // 2 - 400, -900),
+    )
+    pygame.draw.rect(
+        screen,
+        "#4F7942",
+        (
+            viewport.to_screen(0, -50),
+            (
+                settings.MAP_WIDTH * settings.GRID_SIZE // settings.zoom,
+                max(1, 50 // settings.zoom),
+            ),
         ),
     )
 
+    if detailed:
+        display.add(entities.draw(screen))
+
+    screen.blit(ant_nest[settings.zoom], viewport.to_screen(nest_x - 100 // 2, -50))
+
+    profiler.lap("entity_draw")
+
+    threshold_label.set_text(f"Threshold: {perlin.perlin_settings.threshold:.2f}")
+    seed_label.set_text(f"Seed: {perlin.perlin_settings.seed}")
+    tool_label.set_text(f"Tool: {TOOL_NAMES.get(settings.selected_tool, 'None')}")
+    ui.show(*setup_widgets, visible=settings.ui_visible)
+    ui.show(*running_widgets, visible=not settings.ui_visible)
+
+    if settings.ui_visible:
+        workers_label.set_text(f"Workers: {int(settings.ant_slider.value)}")
+        soldiers_label.set_text(f"Soldiers: {int(soldier_slider.value)}")
+        queen_label.set_text(
+            f"Enable Queen: {'Yes' if queen_slider.value >= 0.5 else 'No'}"
+        )
+        speed_label.set_text(f"Speed: {speed_slider.value:.2f}")
+    else:
+        sim_speed_label.set_text(tick_scheduler.describe())
+        if settings.REPLAY_PATH:
+            status_label.set_text(simulation.describe())
+        elif simulation.recording:
+            status_label.set_text("Recording (F7 to stop)", (255, 80, 80))
+        else:
+            status_label.set_text("")
+
+        food_progressbar.set_max_value(settings.total_food)
+        food_progressbar.set_value(settings.collected_food)
+        food_label.set_text(
+            f"Food Collected: {settings.collected_food}/{settings.total_food}"
+        )
+
+        if (
+            not settings.food_locations
+            or settings.collected_food == settings.total_food
+        ):
+            settings.total_food = settings.collected_food
+
+    display.add(ui.draw(screen))
+    display.add(profiler_hud.draw(screen))
+    profiler.lap("ui_draw")
+
+    display.present()
+    profiler.lap("flip")
+
+
+logging.info("Game loop started.")
+while settings.running:
+    profiler.begin_frame()
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             settings.running = False
             logging.info("Quit event received.")
 
+        elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+            display.invalidate()
+
         elif event.type == pygame.KEYDOWN:
             if event.key == pygame.K_ESCAPE:
                 sys.exit(1)
@@ -162,6 +381,32 @@ while settings.running:
                 logging.info("Pause event received.")
             elif pygame.K_1 <= event.key <= pygame.K_7:
                 settings.selected_tool = event.key - pygame.K_0
+            elif event.key == pygame.K_F3:
+                profiler_hud.toggle()
+            elif event.key == pygame.K_RIGHTBRACKET:
+                tick_scheduler.faster()
+            elif event.key == pygame.K_LEFTBRACKET:
+                tick_scheduler.slower()
+            elif event.key == pygame.K_F5:
+                tick_scheduler.toggle_auto()
+            elif event.key == pygame.K_F6:
+                tick_scheduler.toggle_render_skip()
+            elif event.key == pygame.K_F9:
+                save_colony()
+            elif event.key == pygame.K_F10:
+                load_colony()
+            elif event.key == pygame.K_F7:
+                toggle_recording()
+            elif event.key in (pygame.K_EQUALS, pygame.K_PLUS, pygame.K_KP_PLUS):
+                zoom_by(-1)
+            elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                zoom_by(1)
+            elif settings.REPLAY_PATH and event.key == pygame.K_LEFT:
+                seek(-10)
+            elif settings.REPLAY_PATH and event.key == pygame.K_RIGHT:
+                seek(10)
+            elif settings.REPLAY_PATH and event.key == pygame.K_HOME:
+                simulation.seek(0)
 
         elif event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
             tool_actions = {
@@ -192,8 +437,9 @@ while settings.running:
             }
             for tool, obj in drawing_tools.items():
                 if getattr(settings, tool, False):
-                    obj.draw(
-                        event.pos,
+                    simulation.use_tool(
+                        obj,
+                        viewport.to_world(event.pos),
                         threshold_slider,
                         seed_button,
                         speed_slider,
@@ -201,10 +447,15 @@ while settings.running:
                     )
 
         elif event.type == pygame.MOUSEWHEEL:
-            settings.camera_y = max(-960, min(0, settings.camera_y - (event.y * 20)))
+            if pygame.key.get_mods() & pygame.KMOD_CTRL:
+                zoom_by(-event.y)
+            elif pygame.key.get_mods() & pygame.KMOD_SHIFT:
+                scroll(-event.y * 20, 0)
+            else:
+                scroll(event.x * 20, -event.y * 20)
 
         if threshold_slider.handle_event(event):
-            perlin.regenerate(seed_button_value, threshold_slider)
+            simulation.regenerate(seed_button_value, threshold_slider.value)
 
         settings.ant_slider.handle_event(event)
         soldier_slider.handle_event(event)
@@ -213,193 +464,30 @@ while settings.running:
         seed_button.handle_event(event)
         start_button.handle_event(event)
 
-    if not settings.ui_visible:
-        for Ant in settings.ants:
-            if Ant.has_food:
-                if Ant.return_to_nest():
-                    settings.collected_food += 1
-            else:
-                Ant.move()
-                if Ant.find_food(settings.food_locations):
-                    Ant.leave_pheromone()
-
-        if queen_slider.value >= 0.5:
-            for Soldier in settings.soldiers:
-                Soldier.move()
-                Soldier.find_ant()
-            for Queen in settings.queen:
-                Queen.move()
-
-        for Enemy in settings.enemies:
-            Enemy.move()
-            Enemy.find_ant()
-
-        settings.pheromone_map *= 0.99
-
-    for x in range(settings.MAP_WIDTH):
-        for y in range(settings.MAP_HEIGHT):
-            if map.data[x, y] == 1:
-                pygame.draw.rect(
-                    screen,
-                    settings.WALL_COLOR,
-                    (
-                        (x * 10) - settings.camera_x,
-                        (y * 10) - settings.camera_y,
-                        10,
-                        10,
-                    ),
-                )
-            if perlin.perlin_settings.map_data[x, y] == 1:
-                pygame.draw.rect(
-                    screen,
-                    settings.STONE_COLOR,
-                    (
-                        (x * 10) - settings.camera_x,
-                        (y * 10) - settings.camera_y,
-                        10,
-                        10,
-                    ),
-                )
-
-    for x in range(settings.MAP_WIDTH):
-        if x < settings.MAP_WIDTH // 2 - 4 or x > settings.MAP_WIDTH // 2 + 4:
-            perlin.perlin_settings.map_data[x, 0] = 1
-
-    for food in settings.food_locations:
-        pygame.draw.rect(
-            screen,
-            pygame.Color(settings.FOOD_COLOR),
-            (
-                (food[0] * 10) - settings.camera_x,
-                (food[1] * 10) - settings.camera_y,
-                10,
-                10,
-            ),
-        )
-
-    pheromone_surface = pygame.Surface(
-        (settings.MAP_WIDTH * 10, settings.MAP_HEIGHT * 10), pygame.SRCALPHA
-    )
-    for x in range(settings.MAP_WIDTH):
-        for y in range(settings.MAP_HEIGHT):
-            intensity = int(settings.pheromone_map[x, y] * 255)
-            if intensity > 0:
-                pygame.draw.rect(
-                    pheromone_surface,
-                    (255, 255, 0, intensity),
-                    ((x * 10), (y * 10), 10, 10),
-                )
+    keys = pygame.key.get_pressed()
+    scroll((keys[pygame.K_d] - keys[pygame.K_a]) * settings.camera_speed, 0)
+    view_x0, _, view_x1, _ = viewport.cells(margin=0)
+    simulation.set_view(view_x0, view_x1)
 
-    screen.blit(pheromone_surface, (-settings.camera_x, -settings.camera_y))
+    profiler.lap("events")
 
-    screen.blit(
-        sun_image,
-        ((settings.MONITOR_WIDTH - 400) - settings.camera_x, -900 - settings.camera_y),
-    )
-    pygame.draw.rect(
-        screen,
-        "#4F7942",
-        (0 - settings.camera_x, -50 - settings.camera_y, settings.MONITOR_WIDTH, 50),
-    )
-
-    entity_groups = (
-        (
-            settings.ants,
-            lambda ant: settings.FOOD_COLOR if ant.has_food else settings.ANT_COLOR,
-            4,
-        ),
-        (settings.soldiers, lambda _: settings.SOLDIER_COLOR, 6),
-        (settings.queen, lambda _: settings.QUEEN_COLOR, 10),
-        (settings.enemies, lambda _: settings.ENEMY_COLOR, 6),
-    )
-
-    for entity_list, color_func, size in entity_groups:
-        for entity in entity_list:
-            entity_color = pygame.Color(color_func(entity))
-            pygame.draw.circle(
-                screen,
-                entity_color,
-                (
-                    int(entity.x * 10) - settings.camera_x,
-                    int(entity.y * 10) - settings.camera_y,
-                ),
-                size,
-            )
-
-    screen.blit(
-        ant_nest,
-        (
-            ((settings.MONITOR_WIDTH // 2) - (100 // 2)) - settings.camera_x,
-            -50 - settings.camera_y,
-        ),
-    )
-
-    threshold_slider.draw(screen)
-    seed_button.draw(screen)
-
-    text_threshold = text.border(
-        f"Threshold: {perlin.perlin_settings.threshold:.2f}", (255, 255, 255)
-    )
-    text_seed = text.border(f"Seed: {perlin.perlin_settings.seed}", (255, 255, 255))
-
-    tool_names = {
-        1: "Food",
-        2: "Workers",
-        3: "Soldiers",
-        4: "Enemy",
-        5: "Magnet",
-        6: "Wall",
-        7: "Floor",
-    }
-    selected_tool_name = tool_names.get(settings.selected_tool, "None")
-    text_selected_tool = text.border(f"Tool: {selected_tool_name}", (255, 255, 255))
-
-    screen.blit(text_threshold, (320, 9))
-    screen.blit(text_seed, (320, 54))
-    screen.blit(text_selected_tool, (10, settings.MONITOR_HEIGHT - 30))
-
-    if settings.ui_visible:
-        settings.ant_slider.draw(screen)
-        soldier_slider.draw(screen)
-        queen_slider.draw(screen)
-        speed_slider.draw(screen)
-        start_button.draw(screen)
-
-        text_ants = text.border(
-            f"Workers: {int(settings.ant_slider.value)}", (255, 255, 255)
-        )
-        text_soldiers = text.border(
-            f"Soldiers: {int(soldier_slider.value)}", (255, 255, 255)
-        )
-        text_queen = text.border(
-            f"Enable Queen: {'Yes' if queen_slider.value >= 0.5 else 'No'}",
-            (255, 255, 255),
-        )
-        text_speed = text.border(f"Speed: {speed_slider.value:.2f}", (255, 255, 255))
-
-        screen.blit(text_ants, (320, 99))
-        screen.blit(text_soldiers, (320, 139))
-        screen.blit(text_queen, (320, 179))
-        screen.blit(text_speed, (320, 219))
-    else:
-        food_progressbar.draw(screen)
-        food_progressbar.set_value(settings.collected_food)
-        food_progressbar.max_value = settings.total_food
-
-        text_food = text.border(
-            f"Food Collected: {settings.collected_food}/{settings.total_food}",
-            (255, 255, 255),
-        )
-        screen.blit(text_food, (320, 99))
-
-        if (
-            not settings.food_locations
-            or settings.collected_food == settings.total_food
-        ):
-            settings.total_food = settings.collected_food
-
-    pygame.display.flip()
-    settings.clock.tick(settings.FPS)
+    if settings.BACKGROUND_SIMULATION and not settings.REPLAY_PATH:
+        # Setup edits (new maps, threshold, food) show up before Start too
+        simulation.sync()
+        profiler.lap("sync")
 
+    if not settings.ui_visible:
+        simulation.queen_enabled = queen_slider.value >= 0.5
+        tick_scheduler.advance(simulation, frame_time)
+    # Render skip leaves most frames undrawn but still timed and paced
+    drawn = settings.ui_visible or tick_scheduler.should_render()
+    if drawn:
+        draw_frame()
+    profiler.end_frame()
+    tick_scheduler.end_frame(drawn)
+    frame_time = clock.tick(0 if tick_scheduler.render_skip else settings.FPS) / 1000
+
+simulation.close()
+profiler.close()
 pygame.quit()
 logging.info("Game closed.")
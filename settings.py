@@ -1,12 +1,25 @@
-import numpy as np
-import pygame
-import screeninfo
+import os
 
+from core import food_index, pheromone
 from gui import slider
 
 # General
 FPS = 60
-view_log_level = "INFO"
+TICK_RATE = 60  # simulation ticks per second at x1
+# "objects", "vector" or "parallel"
+WORKER_ENGINE = os.environ.get("ANT_SIM_ENGINE", "objects")
+# Run the colony in its own process and draw from its snapshots
+BACKGROUND_SIMULATION = os.environ.get("ANT_SIM_BACKGROUND", "0") == "1"
+PARALLEL_PROCESSES = None  # pool size for the parallel engine; None uses every core
+SAVE_PATH = "saves/quicksave.antsim"  # F9 saves here, F10 loads
+REPLAY_DIR = "replays"  # F7 records here
+REPLAY_KEYFRAME_INTERVAL = 600  # ticks between full frames in a replay
+# Play this replay instead of running a colony
+REPLAY_PATH = os.environ.get("ANT_SIM_REPLAY")
+# Write per-run frame timing CSVs to this directory
+PROFILE_DIR = os.environ.get("ANT_SIM_PROFILE_DIR")
+# Push only the changed parts of each frame to the display instead of flipping
+DIRTY_RECTS = os.environ.get("ANT_SIM_DIRTY_RECTS", "0") == "1"
 
 # Colors
 BG_COLOR = (118, 97, 77)
@@ -19,34 +32,65 @@ NEST_COLOR = "#9c8065"
 FOOD_COLOR = "#D2042D"
 STONE_COLOR = (88, 67, 47)
 
+
+def _screen_size():
+    # ANT_SIM_WIDTH/ANT_SIM_HEIGHT let headless runs skip monitor detection
+    width = os.environ.get("ANT_SIM_WIDTH")
+    height = os.environ.get("ANT_SIM_HEIGHT")
+    if width and height:
+        return int(width), int(height)
+
+    import screeninfo
+
+    monitor = screeninfo.get_monitors()[0]
+    return monitor.width, monitor.height
+
+
 # Screen
-MONITOR_WIDTH = screeninfo.get_monitors()[0].width
-MONITOR_HEIGHT = screeninfo.get_monitors()[0].height
-MAP_WIDTH = MONITOR_WIDTH // 10
-MAP_HEIGHT = MONITOR_HEIGHT // 10
+MONITOR_WIDTH, MONITOR_HEIGHT = _screen_size()
 GRID_SIZE = 10
 
-# Camera
-camera_x, camera_y = 0, 0
-camera_speed = 10
+# World, in cells; one screen unless ANT_SIM_WORLD_WIDTH/HEIGHT say otherwise
+MAP_WIDTH = int(os.environ.get("ANT_SIM_WORLD_WIDTH", MONITOR_WIDTH // GRID_SIZE))
+MAP_HEIGHT = int(os.environ.get("ANT_SIM_WORLD_HEIGHT", MONITOR_HEIGHT // GRID_SIZE))
+CHUNK_WIDTH = 64  # columns per world chunk; a multiple of pheromone.TILE_SIZE
+MAX_RESIDENT_CHUNKS = 64  # chunks kept in memory before the coldest go to disk
+CHUNK_DIR = None  # where evicted chunks go; None uses a temporary directory
 
 # Locations
 nest_location = (MAP_WIDTH // 2, -3)
-food_locations = set()
+
+# Camera, in pixels; starts over the nest
+SKY_HEIGHT = 960  # pixels of sky the camera can scroll up into
+camera_x = max(
+    0,
+    min(
+        nest_location[0] * GRID_SIZE - MONITOR_WIDTH // 2,
+        MAP_WIDTH * GRID_SIZE - MONITOR_WIDTH,
+    ),
+)
+camera_y = 0
+camera_speed = 20  # pixels per frame while A/D are held
+# World pixels per screen pixel; past the first level the overview is drawn
+ZOOM_LEVELS = (1, 2, 5, 10, 20)
+zoom = 1
+food_locations = food_index.FoodIndex(MAP_WIDTH, MAP_HEIGHT)
 
 # Entities
 ants = []
+worker_swarm = None
 soldiers = []
 queen = []
 enemies = []
 enemies_found = False
-pheromone_map = np.zeros((MAP_WIDTH, MAP_HEIGHT))
+pheromones = pheromone.PheromoneField(MAP_WIDTH, MAP_HEIGHT)
 
 # UI
-ant_slider = slider.Slider(10, 100, 300, 1, 1000, 50)
+ant_slider = slider.Slider(
+    10, 100, 300, 1, 1000 if WORKER_ENGINE == "objects" else 100_000, 50
+)
 
 # Game Loop
-clock = pygame.time.Clock()
 running = True
 paused = False
 ui_visible = True
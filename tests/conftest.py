@@ -0,0 +1,42 @@
+import os
+import random
+import sys
+
+# Must be set before settings is imported
+os.environ.setdefault("ANT_SIM_WIDTH", "1920")
+os.environ.setdefault("ANT_SIM_HEIGHT", "1080")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+import settings  # noqa: E402
+from core import chunks, logging, perlin  # noqa: E402
+from core import simulation as sim  # noqa: E402
+
+logging.setup("WARN")
+
+
+@pytest.fixture
+def colony():
+    """Builds seeded colonies on freshly generated worlds; closes them after."""
+    simulations = []
+
+    def build(workers=200, engine="objects", food=100, seed=1):
+        random.seed(seed)
+        settings.enemies = []
+        settings.pheromones.clear()
+        simulation = sim.Simulation(engine=engine)
+        settings.food_locations.clear()
+        perlin.regenerate(seed, perlin.perlin_settings.threshold)
+        chunks.store.reset()
+        simulation.scatter_food(food)
+        simulation.populate(workers, 5, 1, 0.5)
+        settings.ui_visible = False
+        simulations.append(simulation)
+        return simulation
+
+    yield build
+    for simulation in simulations:
+        simulation.close()
@@ -0,0 +1,83 @@
+import math
+
+import numpy as np
+import pytest
+
+import settings
+from core import collision, map
+
+SKY = collision.SKY_ROWS
+
+
+@pytest.fixture
+def walls():
+    """Random WORKER/DIGGER masks in place of the map's own."""
+    rng = np.random.default_rng(3)
+    shape = (settings.MAP_WIDTH, settings.MAP_HEIGHT + SKY)
+    worker = rng.random(shape) < 0.2
+    digger = worker & (rng.random(shape) < 0.3)
+    collision.attach(worker, digger)
+    yield {collision.WORKER: worker, collision.DIGGER: digger}
+    # Drops the masks so they are rebuilt from the map
+    map.changed()
+
+
+def _crossed_cells(x0, y0, x1, y1):
+    """Cells the segment passes through, in order, found by cutting it at
+    every grid line it crosses."""
+    cuts = {0.0, 1.0}
+    for start, end in ((x0, x1), (y0, y1)):
+        low, high = sorted((start, end))
+        for line in range(math.floor(low) + 1, math.ceil(high)):
+            cuts.add((line - start) / (end - start))
+    cuts = sorted(cuts)
+    return [
+        (math.floor(x0 + t * (x1 - x0)), math.floor(y0 + t * (y1 - y0)))
+        for t in ((a + b) / 2 for a, b in zip(cuts, cuts[1:]))
+    ]
+
+
+def _reference(mask, x0, y0, x1, y1):
+    for x, y in _crossed_cells(x0, y0, x1, y1)[1:-1]:
+        if not (0 <= x < settings.MAP_WIDTH and -SKY <= y < settings.MAP_HEIGHT):
+            return True
+        if mask[x, y + SKY]:
+            return True
+    return False
+
+
+def _segments(count, seed=11):
+    rng = np.random.default_rng(seed)
+    x0 = rng.uniform(-3, settings.MAP_WIDTH + 3, count)
+    y0 = rng.uniform(-SKY - 2, settings.MAP_HEIGHT + 2, count)
+    x1 = x0 + rng.uniform(-15, 15, count)
+    y1 = y0 + rng.uniform(-15, 15, count)
+    return x0, y0, x1, y1
+
+
+@pytest.mark.parametrize("mode", [collision.WORKER, collision.DIGGER])
+def test_line_blocked_walks_crossed_cells(walls, mode):
+    for x0, y0, x1, y1 in zip(*_segments(2000)):
+        expected = _reference(walls[mode], x0, y0, x1, y1)
+        assert collision.line_blocked(x0, y0, x1, y1, mode) == expected
+
+
+def test_line_blocked_ignores_end_cells(walls):
+    mask = walls[collision.WORKER]
+    x, y = np.argwhere(mask[1:-1, SKY + 1 : -1])[0] + (1, 1)
+    # Only the cells in between count, so a blocked start or end cell does not
+    assert not collision.line_blocked(x + 0.5, y + 0.5, x + 1.5, y + 0.5)
+    assert not collision.line_blocked(x - 0.5, y + 0.5, x + 0.5, y + 0.5)
+
+
+def test_line_blocked_many_matches_scalar(walls):
+    x0, y0, x1, y1 = _segments(2000, seed=12)
+    modes = np.random.default_rng(13).choice(
+        [collision.WORKER, collision.DIGGER], len(x0)
+    )
+    blocked = collision.line_blocked_many(x0, y0, x1, y1, modes)
+    expected = [
+        collision.line_blocked(*segment, mode)
+        for *segment, mode in zip(x0, y0, x1, y1, modes)
+    ]
+    np.testing.assert_array_equal(blocked, expected)
@@ -0,0 +1,94 @@
+import math
+
+import numpy as np
+
+from core.food_index import BUCKET_SIZE, FoodIndex
+
+WIDTH, HEIGHT = 50, 40
+
+
+def _inside(cells):
+    return {(x, y) for x, y in cells if 0 <= x < WIDTH and 0 <= y < HEIGHT}
+
+
+def _assert_consistent(food, expected):
+    assert set(food) == expected
+    assert len(food) == len(expected)
+    assert food.grid.sum() == len(expected)
+    for x, y in expected:
+        assert food.grid[x, y]
+        assert food.bucket_counts[x // BUCKET_SIZE, y // BUCKET_SIZE] > 0
+    assert food.bucket_counts.sum() == len(expected)
+
+
+def test_behaves_like_a_set():
+    food = FoodIndex(WIDTH, HEIGHT, [(1, 2)])
+    assert food.add((1, 2)) is None
+    assert food.add((3, 4)) is None
+    assert food.insert((3, 4)) is False
+    assert food.insert((5, 6)) is True
+    assert food == {(1, 2), (3, 4), (5, 6)}
+    assert (3, 4) in food and (4, 3) not in food
+    assert (-1, 0) not in food and (WIDTH, 0) not in food
+
+    food.discard((3, 4))
+    food.discard((3, 4))
+    food -= {(1, 2)}
+    food |= {(7, 8)}
+    assert food == {(5, 6), (7, 8)}
+    assert food.pop() in {(5, 6), (7, 8)}
+    food.clear()
+    _assert_consistent(food, set())
+
+
+def test_ignores_cells_off_the_grid():
+    food = FoodIndex(WIDTH, HEIGHT)
+    assert food.insert((-1, 0)) is False
+    assert food.update([(WIDTH, 0), (0, HEIGHT), (0, -3)]) == 0
+    _assert_consistent(food, set())
+
+
+def test_matches_builtin_set():
+    rng = np.random.default_rng(7)
+    food = FoodIndex(WIDTH, HEIGHT)
+    expected = set()
+    for _ in range(300):
+        count = int(rng.integers(0, 30))
+        cells = [tuple(int(v) for v in c) for c in rng.integers(-2, 52, (count, 2))]
+        if rng.random() < 0.5:
+            assert food.update(cells) == len(_inside(cells) - expected)
+            expected |= _inside(cells)
+        else:
+            food.difference_update(cells)
+            expected -= set(cells)
+        _assert_consistent(food, expected)
+
+
+def test_listeners_hear_every_change():
+    food = FoodIndex(WIDTH, HEIGHT)
+    marked = np.zeros((WIDTH, HEIGHT), dtype=bool)
+
+    def listener(x, y):
+        if x is None:
+            marked[:] = food.grid
+        else:
+            marked[x, y] = food.grid[x, y]
+
+    food.subscribe(listener)
+    food.update([(1, 1), (2, 2), (2, 2), (30, 20)])
+    food.add((4, 4))
+    food.discard((1, 1))
+    np.testing.assert_array_equal(marked, food.grid)
+    food.clear()
+    np.testing.assert_array_equal(marked, food.grid)
+
+    food.unsubscribe(listener)
+    food.add((5, 5))
+    assert not marked[5, 5]
+
+
+def test_queries_return_nearest_first():
+    food = FoodIndex(WIDTH, HEIGHT, [(10, 10), (13, 10), (10, 16), (30, 30)])
+    assert food.in_radius(10, 10, 6) == [(10, 10), (13, 10), (10, 16)]
+    # Facing +x with a 90 degree cone only sees the cells ahead
+    assert food.in_vision(9, 10, 0.0, 10, math.pi / 2) == [(10, 10), (13, 10)]
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from core import perlin
+
+POINTS = [(0.25, 0.5), (1.5, 2.75), (3.1, 0.2), (7.9, 4.4), (12.3, 9.6), (0.0, 0.0)]
+# perlin_noise.PerlinNoise(octaves=1, seed=seed)([x, y]) at POINTS
+REFERENCE = {
+    1: [
+        0.01791990449210712,
+        -0.17775973832327283,
+        -0.22172740534813465,
+        -0.1342412839079325,
+        -0.200528147097356,
+        0.0,
+    ],
+    1234: [
+        0.26718690015900964,
+        0.06587392830321886,
+        0.04810930400727437,
+        -0.010405245485264863,
+        0.2537156016821719,
+        0.0,
+    ],
+}
+
+
+@pytest.mark.parametrize("seed", sorted(REFERENCE))
+def test_gradient_noise_matches_reference(seed):
+    xs, ys = np.array(POINTS).T
+    values = perlin.gradient_noise(xs, ys, seed)
+    np.testing.assert_allclose(values, REFERENCE[seed], rtol=0, atol=1e-12)
+
+
+def test_gradient_noise_is_pointwise():
+    xs, ys = np.array(POINTS).T
+    together = perlin.gradient_noise(xs, ys, 1)
+    alone = [
+        perlin.gradient_noise(np.array([x]), np.array([y]), 1)[0] for x, y in POINTS
+    ]
+    np.testing.assert_array_equal(together, alone)
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+import settings
+from core import map, perlin, replay
+
+
+def _world():
+    x, y, kind = replay._positions()
+    return {
+        "header": replay._header(),
+        "terrain": perlin.perlin_settings.map_data.copy(),
+        "dirt": map.data.copy(),
+        "food": settings.food_locations.grid.copy(),
+        "pheromones": settings.pheromones.data.copy(),
+        "pheromone_tiles": settings.pheromones.active.copy(),
+        "x": x,
+        "y": y,
+        "kind": kind,
+    }
+
+
+@pytest.fixture
+def recording(colony, tmp_path):
+    """A 35 tick recording with keyframes every 10 ticks, and the world it
+    ended on."""
+    simulation = colony(workers=500, engine="vector", food=200)
+    path = str(tmp_path / "run.antreplay")
+    simulation.start_recording(path, keyframe_interval=10)
+    simulation.step(35)
+    simulation.stop_recording()
+    return path, _world()
+
+
+@pytest.mark.parametrize("first", [None, 0, 12, 20])
+def test_seek_reproduces_final_state(recording, first):
+    path, final = recording
+    player = replay.Player(path)
+    try:
+        if first is not None:
+            player.seek(first)
+        player.seek(int(player.ticks[-1]))
+        assert player.finished
+        world = _world()
+        for name, expected in final.items():
+            np.testing.assert_array_equal(world[name], expected, err_msg=name)
+    finally:
+        player.close()
+
+
+def test_step_matches_seek(recording):
+    path, final = recording
+    player = replay.Player(path)
+    try:
+        player.seek(5)
+        player.step(len(player.ticks))
+        world = _world()
+        for name, expected in final.items():
+            np.testing.assert_array_equal(world[name], expected, err_msg=name)
+    finally:
+        player.close()
@@ -0,0 +1,55 @@
+import numpy as np
+
+import settings
+from core import perlin, spatial_hash
+
+
+def _swarm_hits(x, y, radius):
+    return sorted(
+        (round(distance, 9), entity.index)
+        for distance, _, entity in spatial_hash.index.within(
+            x, y, radius, (spatial_hash.SWARM,)
+        )
+    )
+
+
+def test_finds_swarm_workers(colony):
+    simulation = colony(workers=2000, engine="vector")
+    simulation.step(40)
+    swarm = settings.worker_swarm
+    for x, y in zip(swarm.x[::97], swarm.y[::97]):
+        distance = np.hypot(swarm.x - x, swarm.y - y)
+        expected = sorted(
+            (round(d, 9), i) for i, d in enumerate(distance.tolist()) if d <= 3
+        )
+        assert _swarm_hits(x, y, 3) == expected
+
+
+def test_removes_swarm_workers_found_together(colony):
+    simulation = colony(workers=2000, engine="vector")
+    simulation.step(40)
+    swarm = settings.worker_swarm
+    x, y = swarm.x[0], swarm.y[0]
+    hits = list(spatial_hash.index.within(x, y, 2, (spatial_hash.SWARM,)))
+    assert len(hits) > 2
+    kept = np.ones(len(swarm), dtype=bool)
+    kept[[entity.index for _, _, entity in hits]] = False
+    expected_x = swarm.x[kept]
+
+    for _, kind, entity in hits:
+        spatial_hash.index.remove(kind, entity)
+    np.testing.assert_array_equal(settings.worker_swarm.x, expected_x)
+    assert not list(spatial_hash.index.within(x, y, 2, (spatial_hash.SWARM,)))
+
+
+def test_regenerating_sends_everyone_home(colony):
+    simulation = colony(workers=500, engine="vector")
+    simulation.step(40)
+    terrain = perlin.perlin_settings
+    perlin.regenerate(terrain.seed + 1, terrain.threshold)
+
+    nest_x, nest_y = settings.nest_location
+    found = spatial_hash.index.within(nest_x, nest_y, 0, spatial_hash.PREY)
+    kinds = [kind for _, kind, _ in found]
+    assert kinds.count(spatial_hash.SWARM) == 500
+    assert kinds.count(spatial_hash.SOLDIER) == len(settings.soldiers)
@@ -0,0 +1,113 @@
+import math
+
+import numpy as np
+import pytest
+
+import settings
+from core import map, perlin, spatial_hash
+from entities import enemy_soldier, worker
+
+TICKS = 600
+SPEED = 0.5
+
+
+class _Random:
+    """Stands in for an ``Ant``'s ``random`` module, drawing from a NumPy
+    generator so it gets the same numbers as a swarm seeded alike."""
+
+    def __init__(self, seed):
+        self.rng = np.random.default_rng(seed)
+
+    def uniform(self, low, high):
+        return float(self.rng.uniform(low, high))
+
+
+def _world(colony, engine):
+    """A colony with no workers, its dirt dug out under the nest (deeper on
+    the left, so plain workers reach food too) and food scattered there."""
+    simulation = colony(workers=0, engine=engine, food=0, seed=5)
+    simulation.queen_enabled = False
+    settings.soldiers = []
+    nest_x = settings.nest_location[0]
+    x0, x1 = nest_x - 30, nest_x + 30
+    map.data[x0:x1, :6] = 0
+    map.data[x0:nest_x, :20] = 0
+    map.changed()
+
+    rng = np.random.default_rng(9)
+    xs = rng.integers(x0, x1, 200)
+    ys = rng.integers(4, 20, 200)
+    floor = perlin.perlin_settings.map_data[xs, ys] == 0
+    settings.food_locations.update(zip(xs[floor], ys[floor]))
+    return simulation
+
+
+def _run(colony, monkeypatch, engine, seed, assignment):
+    """Steps one worker for ``TICKS`` ticks; returns its path, whether it
+    carried food each tick, and the world it left behind."""
+    simulation = _world(colony, engine)
+    x, y = settings.nest_location[0], 5
+    if engine == "objects":
+        monkeypatch.setattr(worker, "random", _Random(seed))
+        ant = worker.Ant(x, y, settings.nest_location, SPEED, assignment)
+        settings.ants = [ant]
+
+        def position():
+            return ant.x, ant.y, ant.has_food
+
+    else:
+        swarm = settings.worker_swarm
+        swarm.spawn(1, x, y, SPEED, assignment)
+        swarm.rng = np.random.default_rng(seed)
+        swarm.angle[:] = swarm.rng.uniform(0, 2 * math.pi, 1)
+
+        def position():
+            return swarm.x[0], swarm.y[0], bool(swarm.has_food[0])
+
+    path = []
+    for _ in range(TICKS):
+        simulation.step()
+        path.append(position())
+    return {
+        "path": path,
+        "collected": settings.collected_food,
+        "food": sorted(settings.food_locations),
+        "dirt": map.data.copy(),
+    }
+
+
+# One worker at a time: the engines draw random numbers for several workers in
+# different orders, and swarm workers see each other's digging a tick later
+@pytest.mark.parametrize("assignment", [0, 1, 2])
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_swarm_matches_ant(colony, monkeypatch, seed, assignment):
+    ant = _run(colony, monkeypatch, "objects", seed, assignment)
+    swarm = _run(colony, monkeypatch, "vector", seed, assignment)
+
+    assert ant["collected"] > 0
+    assert swarm["collected"] == ant["collected"]
+    for tick, (got, expected) in enumerate(zip(swarm["path"], ant["path"])):
+        assert got[2] == expected[2], tick
+        assert got[:2] == pytest.approx(expected[:2], abs=1e-9), tick
+    assert swarm["food"] == ant["food"]
+    np.testing.assert_array_equal(swarm["dirt"], ant["dirt"])
+
+
+def test_enemies_hunt_swarm_workers(colony):
+    simulation = colony(workers=300, engine="vector")
+    simulation.queen_enabled = False
+    simulation.step(20)
+    swarm = settings.worker_swarm
+    x, y = swarm.x[0], swarm.y[0]
+    enemy = enemy_soldier.EnemySoldier(x - 0.5, y, settings.nest_location, 0.5)
+    enemy.angle = 0.0
+    settings.enemies = [enemy]
+
+    prey = enemy.check_ants_in_vision()
+    assert isinstance(prey, spatial_hash.SwarmWorker)
+    assert math.hypot(prey.x - enemy.x, prey.y - enemy.y) <= 0.5
+
+    distance = np.hypot(swarm.x - enemy.x, swarm.y - enemy.y)
+    survivors = len(swarm) - int((distance < 1).sum())
+    enemy.find_ant()
+    assert len(settings.worker_swarm) == survivors
@@ -20,17 +20,23 @@ def draw(event_pos, threshold_slider, seed_button, speed_slider, start_button):
             and not map.data[grid_x][grid_y]
         ):
             settings.ant_slider.value += 1
+            if settings.worker_swarm is not None:
+                settings.worker_swarm.spawn(1, grid_x, grid_y, speed_slider.value)
+                return
             settings.ants.append(
                 worker.Ant(
                     grid_x,
                     grid_y,
                     settings.nest_location,
-                    settings.pheromone_map,
                     speed_slider.value,
                     random.choices([0, 1, 2], weights=[4, 2, 1])[0],
                 )
             )
     except IndexError:
         logging.error(
-            f"Invalid grid position: ({grid_x}, {grid_y}) | Camera: ({settings.camera_x}, {settings.camera_y})"
+            "Invalid grid position: (%s, %s) | Camera: (%s, %s)",
+            grid_x,
+            grid_y,
+            settings.camera_x,
+            settings.camera_y,
         )
@@ -1,5 +1,5 @@
 import settings
-from core import logging, perlin
+from core import logging, map, perlin
 
 
 def draw(event_pos, threshold_slider, seed_button, speed_slider, start_button):
@@ -10,7 +10,12 @@ def draw(event_pos, threshold_slider, seed_button, speed_slider, start_button):
     try:
         if grid_y >= 0:
             perlin.perlin_settings.map_data[grid_x, grid_y] = 0
+            map.changed(grid_x, grid_y)
     except IndexError:
         logging.error(
-            f"Invalid grid position: ({grid_x}, {grid_y}) | Camera: ({settings.camera_x}, {settings.camera_y})"
+            "Invalid grid position: (%s, %s) | Camera: (%s, %s)",
+            grid_x,
+            grid_y,
+            settings.camera_x,
+            settings.camera_y,
         )
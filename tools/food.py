@@ -9,9 +9,13 @@ def draw(event_pos, threshold_slider, seed_button, speed_slider, start_button):
 
     try:
         if not perlin.perlin_settings.map_data[grid_x][grid_y] and grid_y >= 0:
-            settings.food_locations.add((grid_x, grid_y))
-            settings.total_food += 1
+            if settings.food_locations.insert((grid_x, grid_y)):
+                settings.total_food += 1
     except IndexError:
         logging.error(
-            f"Invalid grid position: ({grid_x}, {grid_y}) | Camera: ({settings.camera_x}, {settings.camera_y})"
+            "Invalid grid position: (%s, %s) | Camera: (%s, %s)",
+            grid_x,
+            grid_y,
+            settings.camera_x,
+            settings.camera_y,
         )
@@ -1,32 +1,35 @@
-import math
-
 import settings
-from core import logging
+from core import logging, spatial_hash
+
+NAMES = ("Ant", "Soldier", "Queen", "Enemy")
 
 
 def draw(event_pos, threshold_slider, seed_button, speed_slider, start_button):
     mouse_x, mouse_y = event_pos
     radius = 10 * settings.GRID_SIZE
+    world_x = (mouse_x + settings.camera_x) / settings.GRID_SIZE
+    world_y = (mouse_y + settings.camera_y) / settings.GRID_SIZE
+    cell_x = (mouse_x + settings.camera_x) // settings.GRID_SIZE
+    cell_y = (mouse_y + settings.camera_y) // settings.GRID_SIZE
 
-    entities = [
-        ("ant", settings.ants),
-        ("soldier", settings.soldiers),
-        ("queen", settings.queen),
-        ("enemy", settings.enemies),
-    ]
-
-    for entity_type, entity_list in entities:
-        for entity in entity_list.copy():
-            try:
-                dx = (mouse_x + settings.camera_x) - (entity.x * settings.GRID_SIZE)
-                dy = (mouse_y + settings.camera_y) - (entity.y * settings.GRID_SIZE)
-                distance = math.hypot(dx, dy)
+    if settings.worker_swarm is not None:
+        attracted = settings.worker_swarm.attract(
+            world_x, world_y, radius / settings.GRID_SIZE, cell_x, cell_y
+        )
+        if attracted:
+            spatial_hash.index.swarm_moved()
+            logging.debug("%s workers attracted", attracted)
 
-                if distance <= radius:
-                    logging.debug(
-                        f"{entity_type.capitalize()} at ({entity.x}, {entity.y}) attracted"
-                    )
-                    entity.x = (mouse_x + settings.camera_x) // settings.GRID_SIZE
-                    entity.y = (mouse_y + settings.camera_y) // settings.GRID_SIZE
-            except Exception as e:
-                logging.error(f"Error processing entity: {e}")
+    for _, kind, entity in list(
+        spatial_hash.index.within(
+            world_x, world_y, radius / settings.GRID_SIZE, spatial_hash.OBJECTS
+        )
+    ):
+        try:
+            logging.debug("%s at (%s, %s) attracted", NAMES[kind], entity.x, entity.y)
+            x, y = entity.x, entity.y
+            entity.x = cell_x
+            entity.y = cell_y
+            spatial_hash.index.move(kind, entity, x, y)
+        except Exception as e:
+            logging.error("Error processing entity: %s", e)
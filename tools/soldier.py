@@ -22,11 +22,14 @@ def draw(event_pos, threshold_slider, seed_button, speed_slider, start_button):
                     grid_x,
                     grid_y,
                     settings.nest_location,
-                    settings.pheromone_map,
                     speed_slider.value,
                 )
             )
     except IndexError:
         logging.error(
-            f"Invalid grid position: ({grid_x}, {grid_y}) | Camera: ({settings.camera_x}, {settings.camera_y})"
+            "Invalid grid position: (%s, %s) | Camera: (%s, %s)",
+            grid_x,
+            grid_y,
+            settings.camera_x,
+            settings.camera_y,
         )